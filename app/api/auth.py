@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from ..services import auth_service as auth_srv
 from ..schemas.login import UserLogin, Token
 from ..core.settings import get_settings
@@ -16,3 +17,10 @@ async def login_endpoint(login_data: UserLogin):
             status_code=500,
             detail=f"{type(e).__name__}: {e}"
         )
+
+@router.post("/logout")
+async def logout_endpoint(token: str = Depends(auth_srv.oauth2_scheme),
+                          user=Depends(auth_srv.get_current_user)):
+    # Writes the shared revocation store
+    await run_in_threadpool(auth_srv.revoke_token, token)
+    return {"detail": "Token revoked"}
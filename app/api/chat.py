@@ -1,18 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from ..services.auth_service import get_current_user
-from ..services.rag_service import RAGService
-from ..schemas.chat import ChatRequest, ChatResponse
+from ..services.resources import get_rag_service
+from ..schemas.chat import BatchQueryRequest, ChatRequest, ChatResponse, SearchHit, SearchResponse
 from ..core.settings import get_settings
 from fastapi import HTTPException
 
 settings = get_settings()
 router = APIRouter(prefix=f"{settings.API_V1_STR}/chat", tags=["chat"])
-rag_service = RAGService()
 
 @router.post("/query", response_model=ChatResponse)
-async def chat_query(request: ChatRequest, user=Depends(get_current_user)):
+async def chat_query(request: ChatRequest, user=Depends(get_current_user),
+                     rag_service=Depends(get_rag_service)):
     try:
         return await rag_service.answer(request, user["role"])
     except Exception as e:
         # return the real error in JSON
-        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+
+@router.post("/query/stream")
+async def chat_query_stream(request: ChatRequest, user=Depends(get_current_user),
+                            rag_service=Depends(get_rag_service)):
+    """Server-Sent Events variant of /query: `sources`, then `token`s, then `done`."""
+    async def event_stream():
+        try:
+            async for event in rag_service.answer_stream(request, user["role"]):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            detail = json.dumps({"detail": f"{type(e).__name__}: {e}"})
+            yield f"event: error\ndata: {detail}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/batch")
+async def chat_batch(request: BatchQueryRequest, user=Depends(get_current_user),
+                     rag_service=Depends(get_rag_service)):
+    """
+    Answer many questions in one request. Streams NDJSON: one line per question
+    as soon as its answer is ready (`index` gives its position in `questions`).
+    """
+    if len(request.questions) > settings.BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=413,
+                            detail=f"At most {settings.BATCH_MAX_QUESTIONS} questions per batch")
+
+    async def result_lines():
+        try:
+            async for result in rag_service.answer_batch(request.questions, user["role"], request.k):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": f"{type(e).__name__}: {e}"}) + "\n"
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson",
+                             headers={"X-Accel-Buffering": "no"})
+
+@router.get("/search", response_model=SearchResponse)
+async def chat_search(q: str = Query(..., min_length=1), department: Optional[str] = None,
+                      offset: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100),
+                      user=Depends(get_current_user), rag_service=Depends(get_rag_service)):
+    """Role-filtered chunks with scores and metadata, no LLM call. `facets` counts hits per department."""
+    try:
+        result = await run_in_threadpool(rag_service.search, q, user["role"], offset, limit, department)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    results = [
+        SearchHit(id=hit["id"], text=hit["text"], score=hit["score"], source=hit["metadata"].get("source"),
+                  department=hit["metadata"].get("department"), metadata=hit["metadata"])
+        for hit in result["hits"]
+    ]
+    return SearchResponse(query=q, total=result["total"], offset=offset, limit=limit,
+                          results=results, facets=result["facets"])
+
+@router.get("/cache/stats")
+async def cache_stats(user=Depends(get_current_user),
+                      rag_service=Depends(get_rag_service)):
+    """Hit/miss counters of the answer cache."""
+    if rag_service.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **rag_service.cache.stats()}
@@ -0,0 +1,40 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ..services.auth_service import get_current_user
+from ..services.tabular_service import get_tabular_service
+from ..schemas.tables import AggregateRequest, DatasetInfo, LookupRequest, TableResult
+from ..core.settings import get_settings
+
+settings = get_settings()
+router = APIRouter(prefix=f"{settings.API_V1_STR}/tables", tags=["tables"])
+
+async def _run(fn, *args, **kwargs):
+    # SQLite scans run in the threadpool; access and validation errors map to 403/400
+    try:
+        return await run_in_threadpool(fn, *args, **kwargs)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("", response_model=List[DatasetInfo])
+async def list_tables(user=Depends(get_current_user)):
+    """Ingested CSV datasets the caller's role may query."""
+    return await _run(get_tabular_service().datasets, user["role"])
+
+@router.post("/{name}/aggregate", response_model=TableResult)
+async def aggregate_table(name: str, request: AggregateRequest, user=Depends(get_current_user)):
+    """count/sum/avg/min/max over a dataset, optionally grouped and filtered."""
+    return await _run(
+        get_tabular_service().aggregate, name, user["role"], request.metric,
+        column=request.column, group_by=request.group_by, filters=request.filters, limit=request.limit,
+    )
+
+@router.post("/{name}/rows", response_model=TableResult)
+async def lookup_rows(name: str, request: LookupRequest, user=Depends(get_current_user)):
+    """Rows matching exact-value filters, e.g. {"filters": {"employee_id": "FINEMP1000"}}."""
+    return await _run(
+        get_tabular_service().lookup, name, user["role"],
+        filters=request.filters, columns=request.columns, limit=request.limit,
+    )
@@ -0,0 +1,146 @@
+import json
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple, Union
+
+# A user's roles: one role name, a comma-separated list ("engineering,finance"),
+# or any iterable of role names
+Roles = Union[str, Iterable[str]]
+
+
+class AccessPolicyError(ValueError):
+    """The policy file is malformed (unknown department or role, inheritance cycle, ...)."""
+
+
+class RoleAccess:
+    """
+    The compiled access of one role combination. Instances are interned per
+    department bitmask, so every caller shares the same frozenset and where
+    clause; treat them as read-only.
+    """
+
+    __slots__ = ("mask", "departments", "where_filter")
+
+    def __init__(self, mask: int, departments: FrozenSet[str]):
+        self.mask = mask
+        self.departments = departments
+        self.where_filter: Dict[str, Any] = {"department": {"$in": sorted(departments)}}
+
+    def __repr__(self) -> str:
+        return f"RoleAccess({sorted(self.departments)!r})"
+
+
+class AccessPolicy:
+    """
+    Role -> department access compiled from a declarative policy:
+
+        {
+          "departments": ["general", "engineering", ...],
+          "default_role": "user",
+          "roles": {
+            "user": {"departments": ["general"]},
+            "engineering": {"inherits": ["user"], "departments": ["engineering"]},
+            "admin": {"inherits": ["engineering", "finance", "hr", "marketing"]}
+          }
+        }
+
+    Each department gets one bit and each role's inherited closure is folded
+    into a single int when the policy is loaded. Resolving a user's roles is
+    then an OR of masks (memoized per role combination) mapped to an interned
+    RoleAccess, and checking a retrieved hit is a single frozenset probe.
+    Unknown roles get the default role's access.
+    """
+
+    def __init__(self, departments: List[str], role_masks: Dict[str, int], default_role: str):
+        self.departments: Tuple[str, ...] = tuple(departments)
+        self.department_bits: Dict[str, int] = {d: 1 << i for i, d in enumerate(self.departments)}
+        self.role_masks = role_masks
+        self.default_role = default_role
+        self._by_mask: Dict[int, RoleAccess] = {}
+        self._by_roles: Dict[Any, RoleAccess] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "AccessPolicy":
+        roles: Mapping[str, Mapping[str, Any]] = data.get("roles", {})
+        departments: List[str] = list(data.get("departments") or sorted(
+            {d for spec in roles.values() for d in spec.get("departments", [])}
+        ))
+        bits = {d: 1 << i for i, d in enumerate(departments)}
+        masks: Dict[str, int] = {}
+
+        def compile_role(role: str, path: Tuple[str, ...]) -> int:
+            if role in masks:
+                return masks[role]
+            if role in path:
+                raise AccessPolicyError(f"Role inheritance cycle: {' -> '.join(path + (role,))}")
+            if role not in roles:
+                raise AccessPolicyError(f"Role {path[-1]!r} inherits unknown role {role!r}")
+            mask = 0
+            for department in roles[role].get("departments", []):
+                if department not in bits:
+                    raise AccessPolicyError(f"Role {role!r} grants unknown department {department!r}")
+                mask |= bits[department]
+            for parent in roles[role].get("inherits", []):
+                mask |= compile_role(parent, path + (role,))
+            masks[role] = mask
+            return mask
+
+        for role in roles:
+            compile_role(role, ())
+
+        default_role = data.get("default_role", "user")
+        if default_role not in masks:
+            raise AccessPolicyError(f"Default role {default_role!r} is not defined")
+        return cls(departments, masks, default_role)
+
+    @classmethod
+    def load(cls, path: str) -> "AccessPolicy":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @staticmethod
+    def parse_roles(roles: Roles) -> FrozenSet[str]:
+        if isinstance(roles, str):
+            roles = roles.split(",")
+        return frozenset(r.strip() for r in roles if r and r.strip())
+
+    def is_known_role(self, role: str) -> bool:
+        return role in self.role_masks
+
+    def _intern(self, mask: int) -> RoleAccess:
+        access = self._by_mask.get(mask)
+        if access is None:
+            departments = frozenset(d for d, bit in self.department_bits.items() if mask & bit)
+            access = self._by_mask.setdefault(mask, RoleAccess(mask, departments))
+        return access
+
+    def resolve(self, roles: Roles) -> RoleAccess:
+        """Access for a user holding `roles` (the union of every role's departments)."""
+        key = roles if isinstance(roles, str) else frozenset(roles)
+        access = self._by_roles.get(key)
+        if access is not None:
+            return access
+        mask = 0
+        for role in self.parse_roles(roles):
+            mask |= self.role_masks.get(role, 0)
+        if not mask:
+            mask = self.role_masks[self.default_role]
+        with self._lock:
+            access = self._intern(mask)
+            # Role strings come from signed tokens, so this stays bounded by the
+            # number of role combinations actually assigned to users
+            self._by_roles[key] = access
+        return access
+
+    def restrict(self, access: RoleAccess, department: str) -> RoleAccess:
+        """`access` narrowed to one department it covers (no departments if it doesn't)."""
+        with self._lock:
+            return self._intern(access.mask & self.department_bits.get(department, 0))
+
+    def allows(self, access: RoleAccess, department: Optional[str]) -> bool:
+        return (department or "general") in access.departments
+
+    def filter_allowed(self, access: RoleAccess, items: Iterable[Any], department_of) -> List[Any]:
+        """Keep the items whose department `access` covers; one frozenset probe per item."""
+        allowed = access.departments
+        return [item for item in items if (department_of(item) or "general") in allowed]
@@ -0,0 +1,251 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for metrics with a fixed set of label names; one child per label combination."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> List[list]:
+        """JSON-serializable copy of every child's value."""
+        raise NotImplementedError
+
+    def merged(self, snapshots: Iterable[List[list]]) -> Dict[Tuple[str, ...], Any]:
+        """This process's values plus those in `snapshots` (from other processes)."""
+        raise NotImplementedError
+
+    def samples(self, values: Optional[Dict[Tuple[str, ...], Any]] = None) -> List[str]:
+        raise NotImplementedError
+
+    def render(self, values: Optional[Dict[Tuple[str, ...], Any]] = None) -> str:
+        return "\n".join([f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}",
+                          *self.samples(values)])
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. cache hits."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merged(self, snapshots: Iterable[List[list]]) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            values = dict(self._values)
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                values[tuple(key)] = values.get(tuple(key), 0) + value
+        return values
+
+    def samples(self, values: Optional[Dict[Tuple[str, ...], float]] = None) -> List[str]:
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+                for key, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies) over fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(key), [list(counts), total, n]] for key, (counts, total, n) in self._values.items()]
+
+    def merged(self, snapshots: Iterable[List[list]]) -> Dict[Tuple[str, ...], list]:
+        values = {tuple(key): entry for key, entry in self.snapshot()}
+        for snapshot in snapshots:
+            for key, (counts, total, n) in snapshot:
+                entry = values.get(tuple(key))
+                if entry is None:
+                    values[tuple(key)] = [list(counts), total, n]
+                elif len(counts) == len(entry[0]):
+                    entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                    entry[1] += total
+                    entry[2] += n
+        return values
+
+    def samples(self, values: Optional[Dict[Tuple[str, ...], list]] = None) -> List[str]:
+        if values is None:
+            values = {tuple(key): entry for key, entry in self.snapshot()}
+        lines = []
+        for key, (counts, total, n) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {n}")
+        return lines
+
+
+class Registry:
+    """
+    Metrics exposed together in the Prometheus text format.
+
+    Under the pre-fork server every worker has its own values, and a scrape
+    reaches whichever worker accepts it. With `enable_multiprocess` each
+    worker writes a snapshot of its values into a shared directory every
+    `interval` seconds, and `render` adds the other workers' snapshots to its
+    own live values. Snapshots of exited workers are kept, so counters never
+    go backwards when a worker is replaced.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self.multiprocess_dir: Optional[Path] = None
+        self._stop: Optional[threading.Event] = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _snapshot_path(self, pid: int) -> Path:
+        return self.multiprocess_dir / f"metrics_{pid}.json"
+
+    def enable_multiprocess(self, directory: str, interval: float = 1.0) -> None:
+        """Start writing this process's snapshot into `directory`; call in each worker after fork."""
+        self.multiprocess_dir = Path(directory)
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        self._stop = threading.Event()
+
+        def flush_periodically(stop: threading.Event):
+            while not stop.wait(interval):
+                self.flush()
+
+        threading.Thread(target=flush_periodically, args=(self._stop,), name="metrics-flush", daemon=True).start()
+
+    def flush(self) -> None:
+        """Write this process's current values to its snapshot file."""
+        if self.multiprocess_dir is None:
+            return
+        path = self._snapshot_path(os.getpid())
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({name: m.snapshot() for name, m in self._metrics.items()}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _other_snapshots(self) -> List[Dict[str, List[list]]]:
+        own = self._snapshot_path(os.getpid())
+        snapshots = []
+        for path in self.multiprocess_dir.glob("metrics_*.json"):
+            if path == own:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue  # removed or replaced mid-read; picked up on the next scrape
+        return snapshots
+
+    def render(self) -> str:
+        if self.multiprocess_dir is None:
+            return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+        snapshots = self._other_snapshots()
+        return "\n".join(
+            metric.render(metric.merged(s.get(name, []) for s in snapshots))
+            for name, metric in self._metrics.items()
+        ) + "\n"
+
+
+REGISTRY = Registry()
+
+# Per-stage latency of the query path. Stages: auth_decode, cache_lookup,
+# embed_query, embed_batch (POST /chat/batch), rbac_filter, vector_search, lexical_search, rerank,
+# context_assembly, prompt_build, llm
+STAGE_SECONDS: Histogram = REGISTRY.register(Histogram(
+    "rag_stage_seconds", "Latency of each query-path stage in seconds.", ["stage"]))
+REQUEST_SECONDS: Histogram = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds by route.", ["method", "route", "status"]))
+CACHE_LOOKUPS: Counter = REGISTRY.register(Counter(
+    "rag_cache_lookups_total", "Cache lookups by cache and result (hit, semantic_hit, miss).", ["cache", "result"]))
+LLM_FALLBACKS: Counter = REGISTRY.register(Counter(
+    "rag_llm_fallbacks_total", "Answers produced without the LLM, by reason.", ["reason"]))
+FILTERED_HITS: Counter = REGISTRY.register(Counter(
+    "rag_filtered_hits_total",
+    "Retrieved chunks kept out of the prompt, by role and reason (rbac, duplicate, budget).", ["role", "reason"]))
@@ -1,13 +1,17 @@
-from typing import Dict, List, Set
+from typing import Any, Dict, Set
 
-# Department to role mapping
+from .access_policy import AccessPolicy, Roles
+from .settings import get_settings
+
+settings = get_settings()
+
+# Compiled once at import from the declarative policy file (role inheritance,
+# multi-role users); see access_policy.py
+ACCESS_POLICY = AccessPolicy.load(settings.ACCESS_POLICY_PATH)
+
+# Department to role mapping, derived from the policy (inherited departments included)
 ROLE_DEPARTMENTS: Dict[str, Set[str]] = {
-    "admin": {"engineering", "finance", "hr", "marketing", "general"},
-    "engineering": {"engineering", "general"},
-    "finance": {"finance", "general"},
-    "hr": {"hr", "general"},
-    "marketing": {"marketing", "general"},
-    "user": {"general"}
+    role: set(ACCESS_POLICY.resolve(role).departments) for role in ACCESS_POLICY.role_masks
 }
 
 # Department to data directory mapping
@@ -19,10 +23,14 @@ DEPARTMENT_DIRS: Dict[str, str] = {
     "general": "general"
 }
 
-def get_allowed_departments(role: str) -> Set[str]:
-    """Get the set of departments a role can access."""
-    return ROLE_DEPARTMENTS.get(role, {"general"})
+def get_allowed_departments(role: Roles) -> Set[str]:
+    """Get the set of departments a role (or comma-separated roles) can access."""
+    return ACCESS_POLICY.resolve(role).departments
 
-def is_department_allowed(role: str, department: str) -> bool:
+def is_department_allowed(role: Roles, department: str) -> bool:
     """Check if a role has access to a specific department."""
-    return department in get_allowed_departments(role) 
\ No newline at end of file
+    return ACCESS_POLICY.allows(ACCESS_POLICY.resolve(role), department)
+
+def get_department_filter(role: Roles) -> Dict[str, Any]:
+    """Chroma metadata `where` clause restricting hits to the role's departments (shared; do not mutate)."""
+    return ACCESS_POLICY.resolve(role).where_filter
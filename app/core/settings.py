@@ -16,22 +16,153 @@ class Settings(BaseSettings):
     )
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Verified-token cache used by get_current_user; size 0 disables it
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: float = 60.0
+    # Revoked tokens (logout), shared by every API worker on the host
+    REVOCATION_DB_PATH: str = "data/revocations.sqlite3"
+    # How often each worker reloads revocations made by other workers
+    REVOCATION_REFRESH_SECONDS: float = 1.0
+
+    # ── Access Control Settings ──
+    # Declarative role -> department policy with role inheritance
+    ACCESS_POLICY_PATH: str = "data/access_policy.json"
+
+    # ── User Store Settings ──
+    # "json" (small, read-only demo set) or "sqlite" (indexed, pooled, bulk-importable)
+    USER_STORE_BACKEND: str = "json"
+    # JSON file of users with precomputed bcrypt hashes
+    USER_STORE_PATH: str = "data/users.json"
+    USER_DB_PATH: str = "data/users.sqlite3"
+    USER_STORE_POOL_SIZE: int = 4
+    # Read-through lookup cache in front of the SQLite store; size 0 disables it
+    USER_STORE_CACHE_SIZE: int = 10000
+    USER_STORE_CACHE_TTL_SECONDS: float = 60.0
+    # Threads used for bcrypt verification (bounds concurrent hashing)
+    AUTH_HASH_WORKERS: int = 4
 
     # ── Database Settings ──
     CHROMA_PERSIST_DIRECTORY: str = "data/chroma"
+    CHROMA_COLLECTION_NAME: str = "rbac"
+    CHROMA_DISTANCE: str = "cosine"
+    # "single" (one collection, RBAC as a where filter) or "partitioned" (one
+    # collection per department; searches fan out to the allowed partitions)
+    CHROMA_LAYOUT: str = "single"
+    # Per-file and per-chunk hashes of what has been ingested (for incremental runs)
+    INGEST_MANIFEST_PATH: str = "data/ingest_manifest.json"
+    # Rows of ingested CSV files, queryable through /api/v1/tables
+    TABULAR_DB_PATH: str = "data/tables.sqlite3"
+
+    # ── Retrieval Settings ──
+    # "where" pushes the RBAC department filter into the Chroma query;
+    # "overfetch" is the legacy k*3 search followed by post-filtering.
+    RETRIEVAL_FILTER_MODE: str = "where"
+    # "vector" (embedding search only) or "hybrid" (fuse with BM25 over the
+    # lexical index via reciprocal rank fusion)
+    RETRIEVAL_MODE: str = "vector"
+    # SQLite FTS5 index kept in sync by scripts/ingest.py
+    LEXICAL_INDEX_PATH: str = "data/lexical.sqlite3"
+    # Candidates taken from each side before fusion
+    HYBRID_CANDIDATES: int = 20
+    HYBRID_RRF_K: int = 60
+    # Optional cross-encoder re-ranking of RERANK_CANDIDATES hits down to k.
+    # Candidates that don't fit the time budget keep their retrieval order.
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL_NAME: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20
+    RERANK_TIME_BUDGET_MS: float = 150.0
+    RERANK_MAX_LENGTH: int = 256
+    # Drop re-ranked chunks scoring below this (model logits), and candidates
+    # the time budget left unscored; None keeps all
+    RERANK_MIN_SCORE: Optional[float] = None
+    # Max prompt tokens spent on retrieved context; 0 disables trimming
+    CONTEXT_TOKEN_BUDGET: int = 0
+    # Max tokens for the whole prompt (template, question and context); 0 disables
+    PROMPT_TOKEN_BUDGET: int = 0
+    # Drop duplicate chunks and trim spans shared between chunks (e.g. the
+    # chunker's overlap) before packing the context
+    CONTEXT_DEDUPE: bool = True
+    CONTEXT_MIN_OVERLAP_CHARS: int = 40
+    # HuggingFace tokenizer name or tokenizer.json path used to count prompt
+    # tokens; empty uses a fast word-piece estimate
+    PROMPT_TOKENIZER: str = ""
+
+    # ── Query Cache Settings ──
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_CACHE_TTL_SECONDS: float = 900.0
+    # Cosine similarity at which a cached question answers a new one; 0 disables
+    QUERY_CACHE_SIMILARITY_THRESHOLD: float = 0.0
+    # Ingestion touches this file when the collection changes; caches are dropped on change
+    INGEST_STAMP_PATH: str = "data/ingest.stamp"
+    QUERY_CACHE_STAMP_CHECK_SECONDS: float = 2.0
 
     # ── API Settings ──
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "RBAC Chatbot"
     PROJECT_VERSION: str = "0.1.0"
+    # POST /chat/batch: questions per request, and LLM calls one batch may have
+    # in flight (within LLM_MAX_CONCURRENCY), so a batch can't starve live chat
+    BATCH_MAX_QUESTIONS: int = 500
+    BATCH_LLM_CONCURRENCY: int = 4
+    # GET /chat/search pages through (and counts facets over) the top hits
+    SEARCH_MAX_RESULTS: int = 100
+    SEARCH_EMBEDDING_CACHE_SIZE: int = 2048
 
     # ── LLM / Groq Settings ──
     GROQ_API_KEY: Optional[str] = None
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_API_URL: str = "https://api.groq.com/openai/v1/chat/completions"
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_CONCURRENCY: int = 16          # in-flight completions per process
+    LLM_MAX_CONNECTIONS: int = 32          # pooled keep-alive connections
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    LLM_MAX_RETRIES: int = 3               # retries on 429/5xx and transport errors
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_MAX_BACKOFF_SECONDS: float = 8.0
 
     # ── HuggingFace Settings ──
     HUGGINGFACE_API_KEY: Optional[str] = None
 
+    # ── Embedding Settings ──
+    # Shared by ingestion and query; stamped into the collection metadata at
+    # ingest time and verified when the RAG service starts.
+    EMBEDDING_MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_NORMALIZE: bool = True
+    EMBEDDING_DEVICE: str = "cpu"
+
+    # ── Model Lifecycle Settings ──
+    # "local" loads the embedding model in each worker; "onnx" runs its ONNX
+    # export (scripts/export_onnx.py) with onnxruntime instead of torch;
+    # "remote" uses the shared embedding sidecar (python -m app.services.embedding_server)
+    EMBEDDING_BACKEND: str = "local"
+    EMBEDDING_ONNX_PATH: str = "models/onnx"
+    # Run the int8 dynamically quantized model instead of the fp32 export
+    EMBEDDING_ONNX_QUANTIZED: bool = False
+    # onnxruntime intra-op threads; 0 lets onnxruntime use every core
+    EMBEDDING_ONNX_THREADS: int = 0
+    EMBEDDING_ONNX_BATCH_SIZE: int = 32
+    # Lowest cosine similarity to the PyTorch model's vectors, measured at export,
+    # for an ONNX model to be used against a collection built with PyTorch
+    EMBEDDING_ONNX_MIN_COSINE: float = 0.98
+    EMBEDDING_SERVICE_URL: str = "http://127.0.0.1:8001"
+    # Load models in the background at startup instead of on the first request
+    WARMUP_ON_STARTUP: bool = True
+
+    # ── Server Settings (python -m app.server / start_servers.py --prod) ──
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    API_WORKERS: int = 1
+    # Load the local embedding model in the parent before forking workers, so
+    # they share its memory pages copy-on-write
+    PRELOAD_EMBEDDINGS: bool = True
+    # Seconds workers get to finish in-flight requests on shutdown before being killed
+    GRACEFUL_TIMEOUT_SECONDS: float = 30.0
+    # Workers' metric snapshots, merged by /metrics; empty uses a temporary directory
+    METRICS_MULTIPROC_DIR: str = ""
+    # How often each worker writes its snapshot (how stale other workers' values can be)
+    METRICS_FLUSH_SECONDS: float = 1.0
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,26 +1,71 @@
-from fastapi import FastAPI, HTTPException
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from .core.metrics import REGISTRY, REQUEST_SECONDS
 from .core.settings import get_settings
-from .api import auth, chat
-from fastapi.responses import JSONResponse
+from .api import auth, chat, tables
+from .services.llm_client import close_llm_client
+from .services.resources import resources
+from fastapi.responses import JSONResponse, Response
 
 # Load settings
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Models load in the background; /health answers right away, /ready once loaded
+    if settings.WARMUP_ON_STARTUP:
+        resources.start_warmup()
+    yield
+    # Release pooled LLM connections on shutdown
+    await close_llm_client()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
-# Health check endpoint
+# Health check endpoint (liveness)
 @app.get("/health", tags=["health"])
 def health_check():
     return {"status": "ok"}
 
+# Readiness endpoint: 503 until the embedding model and vector store are loaded
+@app.get("/ready", tags=["health"])
+def readiness_check():
+    status = resources.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+# Prometheus scrape endpoint; under app.server it covers every worker
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+def metrics():
+    return Response(content=REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
+# Request latency by route template, so path parameters don't multiply series
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
 # Include API routers
 app.include_router(auth.router)
 app.include_router(chat.router)
+app.include_router(tables.router)
 
 # Exception handler for HTTP exceptions
 @app.exception_handler(HTTPException)
@@ -29,4 +74,3 @@ async def http_exception_handler(request, exc):
         status_code=exc.status_code,
         content={"message": exc.detail},
     )
-
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class Message(BaseModel):
@@ -11,6 +11,37 @@ class ChatRequest(BaseModel):
     message: str
     context: Optional[List[str]] = None
 
+class BatchQueryRequest(BaseModel):
+    questions: List[str] = Field(..., min_length=1)
+    k: int = Field(5, ge=1, le=50)
+
+class ContextUsage(BaseModel):
+    """How much retrieved context was sent to the LLM, and what assembly saved."""
+    chunks_retrieved: int
+    chunks_used: int
+    duplicates_removed: int
+    overlap_chars_removed: int
+    tokens_retrieved: int
+    tokens_used: int
+    tokens_saved: int
+
 class ChatResponse(BaseModel):
     response: str
-    sources: Optional[List[str]] = None 
\ No newline at end of file
+    sources: Optional[List[str]] = None
+    context_usage: Optional[ContextUsage] = None 
+
+class SearchHit(BaseModel):
+    id: str
+    text: str
+    score: float
+    source: Optional[str] = None
+    department: Optional[str] = None
+    metadata: Dict[str, Any] = {}
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    offset: int
+    limit: int
+    results: List[SearchHit]
+    facets: Dict[str, int]
@@ -19,12 +19,3 @@ class UserCreate(BaseModel):
     username: str
     password: str
     full_name: str
-
-USERS = {
-    "Tony": {"password": "password123", "role": "engineering"},
-    "Bruce": {"password": "securepass", "role": "marketing"},
-    "Sam": {"password": "financepass", "role": "finance"},
-    "Peter": {"password": "pete123", "role": "engineering"},
-    "Sid": {"password": "sidpass123", "role": "marketing"},
-    "Natasha": {"password": "hrpass123", "role": "hr"},
-} 
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Union
+
+Scalar = Union[str, int, float, bool]
+
+class DatasetInfo(BaseModel):
+    name: str
+    source: str
+    department: str
+    columns: List[str]
+    row_count: int
+
+class AggregateRequest(BaseModel):
+    metric: str  # count, sum, avg, min or max
+    column: Optional[str] = None
+    group_by: Optional[str] = None
+    filters: Dict[str, Scalar] = {}
+    limit: int = Field(100, ge=1, le=1000)
+
+class LookupRequest(BaseModel):
+    filters: Dict[str, Scalar] = {}
+    columns: Optional[List[str]] = None
+    limit: int = Field(20, ge=1, le=1000)
+
+class TableResult(BaseModel):
+    columns: List[str]
+    rows: List[List[Any]]
@@ -0,0 +1,181 @@
+"""
+Production API server: one listening socket shared by several forked
+uvicorn workers.
+
+    python -m app.server --workers 4 --port 8000
+
+The parent binds the socket, imports the app and (with a local embedding
+backend) loads the embedding model once, then forks the workers, so the
+model's memory pages are shared copy-on-write instead of loaded per
+worker. The parent restarts workers that die, and on SIGINT/SIGTERM asks
+every worker to finish its in-flight requests, killing any still running
+after GRACEFUL_TIMEOUT_SECONDS. Where fork is unavailable it runs a single
+in-process worker.
+"""
+import argparse
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import uvicorn
+
+from .core.metrics import REGISTRY
+from .core.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("app.server")
+
+# A worker that dies sooner than this after starting is not restarted right away
+MIN_WORKER_UPTIME_SECONDS = 5.0
+RESTART_BACKOFF_SECONDS = 1.0
+
+
+class PreforkServer:
+    def __init__(self, config: uvicorn.Config, workers: int, graceful_timeout: float):
+        self.config = config
+        self.workers = max(1, workers)
+        self.graceful_timeout = graceful_timeout
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+        self.socket = None
+        self.metrics_dir: Optional[Path] = None
+
+    def _run_worker(self) -> None:
+        # Drop the parent's handlers; uvicorn installs its own for SIGINT/SIGTERM
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGALRM):
+            signal.signal(sig, signal.SIG_DFL)
+        # /metrics answers for every worker, whichever one accepts the scrape
+        REGISTRY.enable_multiprocess(str(self.metrics_dir), settings.METRICS_FLUSH_SECONDS)
+        code = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[self.socket])
+        except BaseException:
+            logger.exception("Worker %s crashed", os.getpid())
+            code = 1
+        finally:
+            REGISTRY.flush()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %s", pid)
+
+    def _signal_workers(self, sig: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _handle_stop(self, signum, frame) -> None:
+        if not self.stopping:
+            self.stopping = True
+            logger.info("Shutting down %d worker(s); waiting up to %.0fs", len(self.children), self.graceful_timeout)
+            signal.alarm(max(1, int(self.graceful_timeout)))
+        self._signal_workers(signal.SIGTERM)
+
+    def _handle_timeout(self, signum, frame) -> None:
+        logger.warning("Graceful timeout expired; killing %d worker(s)", len(self.children))
+        self._signal_workers(signal.SIGKILL)
+
+    def _prepare_metrics_dir(self) -> bool:
+        """Set up the workers' shared metrics directory; True if it is a temporary one to remove."""
+        if settings.METRICS_MULTIPROC_DIR:
+            self.metrics_dir = Path(settings.METRICS_MULTIPROC_DIR)
+            self.metrics_dir.mkdir(parents=True, exist_ok=True)
+            # Counters start from zero with each server run
+            for stale in self.metrics_dir.glob("metrics_*.json"):
+                stale.unlink()
+            return False
+        self.metrics_dir = Path(tempfile.mkdtemp(prefix="rbac-metrics-"))
+        return True
+
+    def run(self) -> int:
+        self.config.load()
+        self.socket = self.config.bind_socket()
+        temporary_metrics_dir = self._prepare_metrics_dir()
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGALRM, self._handle_timeout)
+        for _ in range(self.workers):
+            self._spawn()
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            logger.warning("Worker %s exited with %s; restarting", pid, code)
+            if time.monotonic() - started < MIN_WORKER_UPTIME_SECONDS:
+                # Crashing at startup (bad config, port issue); don't spin
+                time.sleep(RESTART_BACKOFF_SECONDS)
+            if not self.stopping:
+                self._spawn()
+        signal.alarm(0)
+        self.socket.close()
+        if temporary_metrics_dir:
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+        logger.info("All workers stopped")
+        return 0
+
+
+def preload(enabled: bool) -> None:
+    # Not for "onnx": an onnxruntime session starts its thread pool when created,
+    # and that would not survive the fork; the session is small and quick to load
+    if not enabled or settings.EMBEDDING_BACKEND != "local":
+        return
+    from .services.resources import resources
+
+    start = time.perf_counter()
+    resources.preload_embeddings()
+    logger.info("Preloaded the embedding model in %.1fs", time.perf_counter() - start)
+
+
+def serve(host: str, port: int, workers: int, preload_embeddings: bool,
+          graceful_timeout: float, log_level: str = "info") -> int:
+    config = uvicorn.Config(
+        "app.main:app", host=host, port=port, log_level=log_level,
+        timeout_graceful_shutdown=int(graceful_timeout),
+    )
+    preload(preload_embeddings)
+    if workers <= 1 or not hasattr(os, "fork"):
+        uvicorn.Server(config).run()
+        return 0
+    return PreforkServer(config, workers, graceful_timeout).run()
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the API with several worker processes.")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--workers", type=int, default=settings.API_WORKERS,
+                        help=f"worker processes (default: API_WORKERS={settings.API_WORKERS})")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="let each worker load the embedding model itself")
+    parser.add_argument("--graceful-timeout", type=float, default=settings.GRACEFUL_TIMEOUT_SECONDS)
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s - %(process)d - %(levelname)s - %(message)s")
+    sys.exit(serve(args.host, args.port, args.workers, not args.no_preload, args.graceful_timeout, args.log_level))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
@@ -5,42 +8,98 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..core.settings import get_settings
+from ..core.metrics import CACHE_LOOKUPS, STAGE_SECONDS
 from ..core.roles import get_allowed_departments
 from ..schemas.login import TokenData, UserLogin, Token
+from .cache import LRUTTLCache
+from .revocation_store import get_revocation_store
+from .user_store import get_user_store
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Dummy user database - this should be replaced with actual database
-users_db = {
-    "Tony": {"password": pwd_context.hash("password123"), "role": "engineering"},
-    "Bruce": {"password": pwd_context.hash("securepass"), "role": "marketing"},
-    "Sam": {"password": pwd_context.hash("financepass"), "role": "finance"},
-    "Peter": {"password": pwd_context.hash("pete123"), "role": "engineering"},
-    "Sid": {"password": pwd_context.hash("sidpass123"), "role": "marketing"},
-    "Natasha": {"password": pwd_context.hash("hrpass123"), "role": "hr"}
-}
+# Verified against when the username is unknown, so failed logins cost the
+# same bcrypt work whether or not the user exists
+_DUMMY_HASH = "$2b$12$0Ka6tuwMILSktI2Wr/Z5d.U3sDurCSkUifN9VextFemG13NbKeQ/G"
+
+# bcrypt is CPU-bound; a small dedicated pool keeps it off the event loop and
+# bounds how many verifications run at once during login storms
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), pwd_context.verify, password, password_hash)
 
 async def authenticate_user(username: str, password: str) -> Optional[dict]:
-    user = users_db.get(username)
-    if not user or not pwd_context.verify(password, user["password"]):
+    user = get_user_store().get(username)
+    valid = await verify_password(password, user["password_hash"] if user else _DUMMY_HASH)
+    if not user or not valid:
         return None
     return {"username": username, "role": user["role"]}
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({ "exp": expire, "sub": data["sub"], "role": data["role"] })
+    to_encode.update({ "exp": expire, "iat": datetime.utcnow(), "sub": data["sub"], "role": data["role"] })
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
+# Verified token -> principal. Entries never outlive the token's `exp`, and are
+# capped at AUTH_TOKEN_CACHE_TTL_SECONDS so user-store changes are picked up.
+# The cache is per process; revocations live in the shared revocation store and
+# are checked on cache hits too (against its in-memory copy, without I/O), so a
+# logout applies to every worker within REVOCATION_REFRESH_SECONDS.
+_token_cache: Optional[LRUTTLCache] = (
+    LRUTTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE) if settings.AUTH_TOKEN_CACHE_SIZE > 0 else None
+)
+
+def _is_revoked(token: str, username: str, issued_at: int) -> bool:
+    return get_revocation_store().is_revoked(token, username, issued_at)
+
+def revoke_token(token: str) -> None:
+    """Reject `token` from now on, even though its signature and `exp` are still valid."""
+    if _token_cache is not None:
+        _token_cache.pop(token)
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp", 0)
+    except JWTError:
+        return
+    if exp > time.time():
+        get_revocation_store().revoke_token(token, exp)
+
+def revoke_user_tokens(username: str) -> None:
+    """Reject every token issued to `username` up to now (e.g. after a role change)."""
+    get_revocation_store().revoke_user(username, int(time.time()))
+    if _token_cache is not None:
+        _token_cache.clear()
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    with STAGE_SECONDS.time(stage="auth_decode"):
+        return _decode_user(token)
+
+def _decode_user(token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if _token_cache is not None:
+        cached = _token_cache.get(token)
+        CACHE_LOOKUPS.inc(cache="token", result="miss" if cached is None else "hit")
+        if cached is not None:
+            if _is_revoked(token, cached["username"], cached["iat"]):
+                raise credentials_exception
+            return {"username": cached["username"], "role": cached["role"]}
+
     try:
         payload = jwt.decode(
             token,
@@ -54,11 +113,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
 
-    user = users_db.get(token_data.username)
+    issued_at = payload.get("iat", 0)
+    if _is_revoked(token, token_data.username, issued_at):
+        raise credentials_exception
+
+    user = get_user_store().get(token_data.username)
     if user is None:
         raise credentials_exception
-    return {"username": token_data.username, "role": user["role"]}
 
+    if _token_cache is not None:
+        ttl = min(payload["exp"] - time.time(), settings.AUTH_TOKEN_CACHE_TTL_SECONDS)
+        if ttl > 0:
+            _token_cache.set(
+                token,
+                {"username": token_data.username, "role": user["role"], "iat": issued_at},
+                ttl=ttl,
+            )
+    return {"username": token_data.username, "role": user["role"]}
 
 
 async def login(login_data: UserLogin) -> Token:
@@ -0,0 +1,237 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.metrics import CACHE_LOOKUPS
+from ..core.settings import get_settings
+
+settings = get_settings()
+
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+
+    Entries expire `ttl` seconds after they were set (a per-call `ttl`
+    overrides the default); the least recently used entry is evicted once
+    `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None, record: bool = True) -> Any:
+        """Return the live value for `key`; `record=False` skips the hit/miss counters."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += record
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += record
+                return default
+            self._data.move_to_end(key)
+            self.hits += record
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> List[Hashable]:
+        """Store `value`; returns the keys evicted to make room."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        evicted = []
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, _ = self._data.popitem(last=False)
+                evicted.append(old_key)
+                self.evictions += 1
+        return evicted
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a question, without trailing punctuation."""
+    return re.sub(r"\s+", " ", query).strip().lower().rstrip("?!. ")
+
+
+def touch_ingest_stamp(path: Optional[str] = None) -> None:
+    """Mark the vector store as changed; running services drop their cached answers."""
+    stamp = Path(path or settings.INGEST_STAMP_PATH)
+    stamp.parent.mkdir(parents=True, exist_ok=True)
+    stamp.write_text(str(time.time_ns()), encoding="utf-8")
+
+
+class QueryCache:
+    """
+    Answer cache in front of `RAGService.answer`.
+
+    Keys combine the caller's allowed-department set with the normalized
+    question, so roles with the same visibility share entries and no answer
+    ever crosses an RBAC boundary. With a similarity threshold > 0, a miss
+    can still be served by a cached question whose embedding is close enough
+    (within the same department set).
+
+    The cache is cleared whenever the ingest stamp file changes.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        stamp_path: Optional[str] = None,
+    ):
+        self._entries = LRUTTLCache(
+            maxsize=maxsize or settings.QUERY_CACHE_MAX_ENTRIES,
+            ttl=ttl or settings.QUERY_CACHE_TTL_SECONDS,
+        )
+        self.similarity_threshold = (
+            settings.QUERY_CACHE_SIMILARITY_THRESHOLD if similarity_threshold is None else similarity_threshold
+        )
+        self.stamp_path = stamp_path or settings.INGEST_STAMP_PATH
+        # department key -> {entry key: unit-normalized query embedding}
+        self._vectors: Dict[Tuple[str, ...], Dict[Tuple, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._stamp = self._read_stamp()
+        self._stamp_checked_at = time.monotonic()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.similarity_threshold > 0
+
+    @staticmethod
+    def department_key(departments: Iterable[str]) -> Tuple[str, ...]:
+        return tuple(sorted(departments))
+
+    def _read_stamp(self) -> Optional[int]:
+        try:
+            return os.stat(self.stamp_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_stamp(self) -> None:
+        now = time.monotonic()
+        if now - self._stamp_checked_at < settings.QUERY_CACHE_STAMP_CHECK_SECONDS:
+            return
+        self._stamp_checked_at = now
+        stamp = self._read_stamp()
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self.invalidations += 1
+
+    def get(self, query: str, departments: Iterable[str],
+            query_embedding: Optional[List[float]] = None) -> Optional[Any]:
+        """Exact lookup, then (if an embedding is given) near-duplicate lookup."""
+        self._check_stamp()
+        dept_key = self.department_key(departments)
+        key = (dept_key, normalize_query(query))
+        value = self._entries.get(key, record=False)
+        if value is not None:
+            self.hits += 1
+            CACHE_LOOKUPS.inc(cache="answer", result="hit")
+            return value
+        if query_embedding is not None and self.semantic_enabled:
+            value = self._semantic_get(dept_key, query_embedding)
+            if value is not None:
+                self.semantic_hits += 1
+                CACHE_LOOKUPS.inc(cache="answer", result="semantic_hit")
+                return value
+        self.misses += 1
+        CACHE_LOOKUPS.inc(cache="answer", result="miss")
+        return None
+
+    def _semantic_get(self, dept_key: Tuple[str, ...], query_embedding: List[float]) -> Optional[Any]:
+        with self._lock:
+            candidates = self._vectors.get(dept_key)
+            if not candidates:
+                return None
+            keys = list(candidates)
+            matrix = np.stack([candidates[k] for k in keys])
+        scores = matrix @ self._unit(query_embedding)
+        above = np.flatnonzero(scores >= self.similarity_threshold)
+        expired = []
+        value = None
+        # Best match first; an expired entry must not shadow a live one behind it
+        for i in above[np.argsort(-scores[above])]:
+            value = self._entries.get(keys[i], record=False)
+            if value is not None:
+                break
+            expired.append(keys[i])
+        if expired:
+            # Forget the expired entries' embeddings too
+            with self._lock:
+                for key in expired:
+                    candidates.pop(key, None)
+        return value
+
+    def set(self, query: str, departments: Iterable[str], value: Any,
+            query_embedding: Optional[List[float]] = None) -> None:
+        dept_key = self.department_key(departments)
+        key = (dept_key, normalize_query(query))
+        evicted = self._entries.set(key, value)
+        with self._lock:
+            if query_embedding is not None and self.semantic_enabled:
+                self._vectors.setdefault(dept_key, {})[key] = self._unit(query_embedding)
+            for old_key in evicted:
+                self._vectors.get(old_key[0], {}).pop(old_key, None)
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        arr = np.asarray(vector, dtype=np.float32)
+        return arr / (np.linalg.norm(arr) + 1e-12)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self._entries.evictions,
+            "expirations": self._entries.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,104 @@
+from typing import Dict, List, Tuple
+
+from ..core.settings import get_settings
+from ..utils.tokens import count_tokens, truncate_to_tokens
+from .vector_index import Hit
+
+settings = get_settings()
+
+# A chunk cut down to fewer tokens than this is not worth its place in the prompt
+MIN_TRUNCATED_TOKENS = 32
+
+
+def overlap_length(left: str, right: str, min_chars: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`, or 0 below `min_chars`."""
+    probe = right[:min_chars]
+    if len(probe) < min_chars:
+        return 0
+    # Earliest match first, so the first one that verifies is the longest
+    idx = left.find(probe, max(0, len(left) - len(right)))
+    while idx != -1:
+        if right.startswith(left[idx:]):
+            return len(left) - idx
+        idx = left.find(probe, idx + 1)
+    return 0
+
+
+def remove_redundancy(hits: List[Hit], min_chars: int) -> Tuple[List[Hit], int, int]:
+    """
+    Drop chunks already present in a better-ranked chunk and trim spans shared
+    with one, such as the overlap between neighbouring chunks of a file.
+
+    Returns (remaining hits in rank order, chunks dropped, characters trimmed).
+    """
+    kept: List[Hit] = []
+    # Untrimmed text of kept chunks: all of it is in the context, either in
+    # the chunk itself or in the better-ranked chunk it was trimmed against
+    originals: List[str] = []
+    seen = set()
+    dropped = trimmed = 0
+    for hit in hits:
+        text = hit["text"]
+        normalized = " ".join(text.split())
+        if normalized in seen or any(text in original for original in originals):
+            dropped += 1
+            continue
+        for original in originals:
+            cut = overlap_length(original, text, min_chars)
+            if cut:
+                text = text[cut:].lstrip()
+            cut = overlap_length(text, original, min_chars)
+            if cut:
+                text = text[:-cut].rstrip()
+        if len(text) < min_chars:
+            dropped += 1
+            continue
+        trimmed += len(hit["text"]) - len(text)
+        seen.add(normalized)
+        originals.append(hit["text"])
+        kept.append(hit if text == hit["text"] else {**hit, "text": text})
+    return kept, dropped, trimmed
+
+
+def pack(hits: List[Hit], budget: int) -> List[Hit]:
+    """
+    Greedily keep hits in rank order while they fit in `budget` tokens. A hit
+    that doesn't fit is skipped so smaller, lower-ranked ones can still fill
+    the budget; only the top hit is truncated, so the context is never empty.
+    """
+    kept, used = [], 0
+    for position, hit in enumerate(hits):
+        tokens = count_tokens(hit["text"])
+        if used + tokens <= budget:
+            kept.append(hit)
+            used += tokens
+        elif position == 0 and budget >= MIN_TRUNCATED_TOKENS:
+            kept.append({**hit, "text": truncate_to_tokens(hit["text"], budget)})
+            used = budget
+    return kept
+
+
+def assemble_context(hits: List[Hit], budget: int = 0,
+                     dedupe: bool = True, min_overlap_chars: int = 40) -> Tuple[List[Hit], Dict[str, int]]:
+    """
+    Build the prompt context from best-first hits: remove duplicated and
+    overlapping spans, then pack into `budget` tokens (0 means unlimited).
+    Returns the hits to send and token/chunk counts before and after.
+    """
+    retrieved = len(hits)
+    tokens_retrieved = sum(count_tokens(hit["text"]) for hit in hits)
+    dropped = trimmed = 0
+    if dedupe:
+        hits, dropped, trimmed = remove_redundancy(hits, min_overlap_chars)
+    if budget > 0:
+        hits = pack(hits, budget)
+    tokens_used = sum(count_tokens(hit["text"]) for hit in hits)
+    return hits, {
+        "chunks_retrieved": retrieved,
+        "chunks_used": len(hits),
+        "duplicates_removed": dropped,
+        "overlap_chars_removed": trimmed,
+        "tokens_retrieved": tokens_retrieved,
+        "tokens_used": tokens_used,
+        "tokens_saved": tokens_retrieved - tokens_used,
+    }
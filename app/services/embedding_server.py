@@ -0,0 +1,56 @@
+"""
+Embedding sidecar: loads the embedding model once and serves it over HTTP
+to every API worker on the host (EMBEDDING_BACKEND=remote).
+
+    python -m app.services.embedding_server --host 127.0.0.1 --port 8001
+"""
+import argparse
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from .embeddings import build_inprocess_embeddings
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+    kind: str = "documents"  # "query" or "documents"
+
+
+class EmbedResponse(BaseModel):
+    embeddings: List[List[float]]
+
+
+app = FastAPI(title="Embedding sidecar")
+# Serves the PyTorch model, or its ONNX export when started with EMBEDDING_BACKEND=onnx
+embeddings = build_inprocess_embeddings()
+
+
+@app.get("/health")
+def health_check():
+    return {"status": "ok"}
+
+
+@app.post("/embed", response_model=EmbedResponse)
+async def embed(request: EmbedRequest):
+    if request.kind == "query":
+        vectors = await run_in_threadpool(lambda: [embeddings.embed_query(t) for t in request.texts])
+    else:
+        vectors = await run_in_threadpool(embeddings.embed_documents, request.texts)
+    return EmbedResponse(embeddings=vectors)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the embedding model to local API workers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import requests
+from langchain_core.embeddings import Embeddings
+
+from ..core.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Collection metadata keys describing how the stored vectors were produced
+MODEL_KEY = "embedding:model"
+NORMALIZE_KEY = "embedding:normalize"
+SPACE_KEY = "hnsw:space"
+
+# Files written by scripts/export_onnx.py into EMBEDDING_ONNX_PATH
+ONNX_EXPORT_INFO = "export.json"
+ONNX_VARIANTS = {"fp32": "model.onnx", "int8": "model.int8.onnx"}
+
+
+class EmbeddingConfigMismatch(RuntimeError):
+    """The collection was built with a different embedding configuration than the one configured."""
+
+
+class RemoteEmbeddings(Embeddings):
+    """
+    Embeddings served by the local embedding sidecar
+    (`python -m app.services.embedding_server`), so every API worker shares
+    one copy of the model instead of loading its own.
+    """
+
+    def __init__(self, base_url: str = None, timeout: float = 30.0):
+        self.base_url = (base_url or settings.EMBEDDING_SERVICE_URL).rstrip("/")
+        self.timeout = timeout
+        # Keep-alive session; retrieval calls this synchronously from worker threads
+        self.session = requests.Session()
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        resp = self.session.post(
+            f"{self.base_url}/embed",
+            json={"texts": texts, "kind": kind},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()["embeddings"]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, "documents")
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query")[0]
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    The configured sentence-transformers model exported to ONNX
+    (`python scripts/export_onnx.py`) and run with onnxruntime. Tokenization,
+    mean pooling and normalization match the PyTorch model, so the vectors are
+    interchangeable with an existing collection (within the tolerance checked
+    at export time), without importing torch.
+    """
+
+    def __init__(self, path: str = None, quantized: Optional[bool] = None, threads: Optional[int] = None,
+                 batch_size: Optional[int] = None, normalize: Optional[bool] = None, verify: bool = True):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.path = Path(path or settings.EMBEDDING_ONNX_PATH)
+        self.variant = "int8" if (settings.EMBEDDING_ONNX_QUANTIZED if quantized is None else quantized) else "fp32"
+        self.info = read_onnx_export_info(self.path)
+        if verify:
+            check_onnx_export(self.info, self.variant)
+        self.normalize = settings.EMBEDDING_NORMALIZE if normalize is None else normalize
+        self.batch_size = batch_size or settings.EMBEDDING_ONNX_BATCH_SIZE
+
+        self.tokenizer = Tokenizer.from_file(str(self.path / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.info["max_seq_length"])
+        pad_token = self.info.get("pad_token", "[PAD]")
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = settings.EMBEDDING_ONNX_THREADS if threads is None else threads
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(self.path / ONNX_VARIANTS[self.variant]), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """float32 array of shape (len(texts), dim)."""
+        # Encode in length order so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch])
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64), "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            for i, vector in zip(batch, pooled):
+                vectors[i] = vector
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
+
+
+def read_onnx_export_info(path: Path) -> Dict[str, Any]:
+    info_path = Path(path) / ONNX_EXPORT_INFO
+    if not info_path.exists():
+        raise FileNotFoundError(
+            f"No ONNX export in {str(path)!r}; run `python scripts/export_onnx.py` first"
+        )
+    return json.loads(info_path.read_text(encoding="utf-8"))
+
+
+def check_onnx_export(info: Dict[str, Any], variant: str) -> None:
+    """
+    Refuse an export of a different model than EMBEDDING_MODEL_NAME, or one
+    whose vectors strayed from the PyTorch model's by more than
+    EMBEDDING_ONNX_MIN_COSINE when it was exported.
+    """
+    if info.get("model") != settings.EMBEDDING_MODEL_NAME:
+        raise EmbeddingConfigMismatch(
+            f"ONNX export is of {info.get('model')!r} but EMBEDDING_MODEL_NAME is "
+            f"{settings.EMBEDDING_MODEL_NAME!r}; re-run scripts/export_onnx.py"
+        )
+    checked = info.get("variants", {}).get(variant)
+    if checked is None:
+        raise FileNotFoundError(f"The ONNX export has no {variant} model; re-run scripts/export_onnx.py")
+    if checked["min_cosine"] < settings.EMBEDDING_ONNX_MIN_COSINE:
+        raise EmbeddingConfigMismatch(
+            f"The {variant} ONNX model's vectors differ from the PyTorch model's (min cosine "
+            f"{checked['min_cosine']:.4f} < EMBEDDING_ONNX_MIN_COSINE={settings.EMBEDDING_ONNX_MIN_COSINE}); "
+            f"use the other variant or re-ingest with this backend"
+        )
+
+
+def embedding_fingerprint() -> Dict[str, Any]:
+    """Collection metadata identifying the configured embedding space."""
+    return {
+        MODEL_KEY: settings.EMBEDDING_MODEL_NAME,
+        NORMALIZE_KEY: settings.EMBEDDING_NORMALIZE,
+        SPACE_KEY: settings.CHROMA_DISTANCE,
+    }
+
+
+def check_collection_config(metadata: Optional[Dict[str, Any]], collection_name: str = None) -> None:
+    """
+    Fail fast if the collection's stored embedding configuration differs from
+    the configured one. Collections built before the fingerprint existed only
+    produce a warning.
+    """
+    collection_name = collection_name or settings.CHROMA_COLLECTION_NAME
+    metadata = metadata or {}
+    expected = embedding_fingerprint()
+    if MODEL_KEY not in metadata:
+        logger.warning(
+            "Collection %r has no embedding fingerprint; re-run `python scripts/ingest.py --full` "
+            "to stamp it", collection_name
+        )
+        return
+    mismatched = {
+        key: (metadata.get(key), value)
+        for key, value in expected.items()
+        if key in metadata and metadata.get(key) != value
+    }
+    if mismatched:
+        details = ", ".join(f"{k}: stored={stored!r} configured={configured!r}"
+                            for k, (stored, configured) in mismatched.items())
+        raise EmbeddingConfigMismatch(
+            f"Collection {collection_name!r} was built with a different embedding configuration ({details}). "
+            f"Re-ingest with `python scripts/ingest.py --full` or fix the EMBEDDING_* settings."
+        )
+
+
+def build_local_embeddings() -> Embeddings:
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=settings.EMBEDDING_MODEL_NAME,
+        model_kwargs={"device": settings.EMBEDDING_DEVICE},
+        encode_kwargs={"normalize_embeddings": settings.EMBEDDING_NORMALIZE},
+    )
+
+
+def build_inprocess_embeddings(backend: Optional[str] = None) -> Embeddings:
+    """The model run in this process: "onnx" if selected, otherwise the PyTorch ("local") model."""
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "onnx":
+        return OnnxEmbeddings()
+    return build_local_embeddings()
+
+
+def build_embeddings() -> Embeddings:
+    """Embedding backend selected by EMBEDDING_BACKEND ("local", "onnx" or "remote")."""
+    if settings.EMBEDDING_BACKEND == "remote":
+        return RemoteEmbeddings()
+    if settings.EMBEDDING_BACKEND in ("local", "onnx"):
+        return build_inprocess_embeddings()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {settings.EMBEDDING_BACKEND!r}")
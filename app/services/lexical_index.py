@@ -0,0 +1,110 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from ..core.settings import get_settings
+from ..utils.sqlite import ConnectionPool
+
+settings = get_settings()
+
+# Words, numbers and identifiers such as "FIN-2024-001" or "v2.3"
+_TERM_RE = re.compile(r"\w+(?:[-./:]\w+)*")
+MAX_QUERY_TERMS = 32
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression OR-ing every query term. Terms are quoted, so
+    punctuation is never parsed as query syntax and identifiers that the
+    tokenizer splits ("FIN-2024") must still match as adjacent tokens.
+    """
+    terms = list(dict.fromkeys(t.lower() for t in _TERM_RE.findall(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+class LexicalIndex:
+    """
+    On-disk BM25 index of chunk text (SQLite FTS5) for hybrid retrieval.
+
+    Chunks live in a regular table keyed by chunk ID with their department
+    and metadata; an external-content FTS5 table indexes the text. Upserts
+    and deletes by ID are index lookups, so ingestion can keep it in sync
+    incrementally, and searches filter on the caller's departments.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS chunks ("
+        " rowid INTEGER PRIMARY KEY,"
+        " id TEXT NOT NULL UNIQUE,"
+        " department TEXT NOT NULL,"
+        " metadata TEXT NOT NULL,"
+        " text TEXT NOT NULL)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5("
+        " text, content='chunks', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN"
+        " INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text); END",
+        "CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN"
+        " INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES ('delete', old.rowid, old.text); END",
+    )
+
+    def __init__(self, path: Optional[str] = None, pool_size: int = 4):
+        self.path = Path(path or settings.LEXICAL_INDEX_PATH)
+        self._pool = ConnectionPool(self.path, pool_size)
+        with self._pool.connection() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    def count(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def upsert(self, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[Dict]) -> int:
+        with self._pool.transaction() as conn:
+            # Delete first so the trigger removes the old text from the FTS index
+            conn.executemany("DELETE FROM chunks WHERE id = ?", [(i,) for i in ids])
+            conn.executemany(
+                "INSERT INTO chunks (id, department, metadata, text) VALUES (?, ?, ?, ?)",
+                [(i, (m or {}).get("department") or "general", json.dumps(m or {}), t)
+                 for i, t, m in zip(ids, texts, metadatas)],
+            )
+        return len(ids)
+
+    def delete(self, ids: Iterable[str]) -> None:
+        with self._pool.transaction() as conn:
+            conn.executemany("DELETE FROM chunks WHERE id = ?", [(i,) for i in ids])
+
+    def clear(self) -> None:
+        with self._pool.transaction() as conn:
+            conn.execute("DELETE FROM chunks")
+            conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+
+    def optimize(self) -> None:
+        """Merge FTS segments; worth running after large ingests."""
+        with self._pool.connection() as conn:
+            conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('optimize')")
+
+    def search(self, query: str, departments: Iterable[str], k: int) -> List[Dict]:
+        """BM25 top-k among `departments`, best first; score is -bm25 (higher is better)."""
+        match = build_match_query(query)
+        departments = sorted(departments)
+        if match is None or not departments:
+            return []
+        placeholders = ",".join("?" * len(departments))
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT c.id, c.text, c.metadata, bm25(chunks_fts) AS rank "
+                "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+                f"WHERE chunks_fts MATCH ? AND c.department IN ({placeholders}) "
+                "ORDER BY rank LIMIT ?",
+                (match, *departments, k),
+            ).fetchall()
+        return [
+            {"id": id_, "text": text, "metadata": json.loads(metadata), "score": -rank}
+            for id_, text, metadata, rank in rows
+        ]
+
+    def close(self) -> None:
+        self._pool.close()
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from ..core.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when the LLM backend cannot produce a completion."""
+
+
+class GroqClient:
+    """
+    Async client for Groq's OpenAI-compatible chat completions API.
+
+    A single connection-pooled `httpx.AsyncClient` is shared by all requests
+    (keep-alive), a semaphore bounds the number of in-flight completions, and
+    429/5xx responses are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        url: Optional[str] = None,
+        model: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.api_key = api_key if api_key is not None else settings.GROQ_API_KEY
+        self.url = url or settings.GROQ_API_URL
+        self.model = model or settings.GROQ_MODEL
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+        return self._client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait before retry `attempt` (0-based), honoring Retry-After."""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), settings.LLM_MAX_BACKOFF_SECONDS)
+                except ValueError:
+                    pass
+        delay = settings.LLM_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+        # Full jitter keeps concurrent retries from hammering the API in lockstep
+        return min(random.uniform(0, delay), settings.LLM_MAX_BACKOFF_SECONDS)
+
+    def payload(self, prompt: str, **overrides: Any) -> Dict[str, Any]:
+        body = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3,
+            "max_tokens": 800,
+            "top_p": 0.9,
+            "frequency_penalty": 0.1,
+            "presence_penalty": 0.1,
+        }
+        body.update(overrides)
+        return body
+
+    async def complete(self, prompt: str) -> str:
+        """Return the completion text for `prompt`, retrying transient failures."""
+        client = self._get_client()
+        last_error = "no attempt made"
+        async with self._get_semaphore():
+            for attempt in range(self.max_retries + 1):
+                response = None
+                try:
+                    response = await client.post(self.url, json=self.payload(prompt))
+                    if response.status_code == 200:
+                        return response.json()["choices"][0]["message"]["content"]
+                    last_error = f"Groq API error (Status {response.status_code}): {response.text}"
+                    if response.status_code not in RETRYABLE_STATUS:
+                        break
+                except httpx.TransportError as e:
+                    last_error = f"Request error: {e}"
+                if attempt < self.max_retries:
+                    delay = self._backoff(attempt, response)
+                    logger.warning("%s; retrying in %.2fs", last_error, delay)
+                    await asyncio.sleep(delay)
+        raise LLMError(last_error)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield completion tokens as they arrive using the OpenAI-compatible
+        `stream: true` mode. Retries only happen before the first token is sent.
+        """
+        client = self._get_client()
+        last_error = "no attempt made"
+        started = False
+        async with self._get_semaphore():
+            for attempt in range(self.max_retries + 1):
+                response = None
+                try:
+                    async with client.stream("POST", self.url, json=self.payload(prompt, stream=True)) as response:
+                        if response.status_code == 200:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[len("data:"):].strip()
+                                if data == "[DONE]":
+                                    return
+                                delta = json.loads(data)["choices"][0].get("delta", {})
+                                if delta.get("content"):
+                                    started = True
+                                    yield delta["content"]
+                            return
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        last_error = f"Groq API error (Status {response.status_code}): {body}"
+                        if response.status_code not in RETRYABLE_STATUS:
+                            break
+                except httpx.TransportError as e:
+                    last_error = f"Request error: {e}"
+                    if started:
+                        # Tokens already reached the caller; a retry would repeat them
+                        break
+                if attempt < self.max_retries:
+                    delay = self._backoff(attempt, response)
+                    logger.warning("%s; retrying in %.2fs", last_error, delay)
+                    await asyncio.sleep(delay)
+        raise LLMError(last_error)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_llm_client: Optional[GroqClient] = None
+
+
+def get_llm_client() -> GroqClient:
+    """Process-wide shared client so every request reuses the same connection pool."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = GroqClient()
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    if _llm_client is not None:
+        await _llm_client.aclose()
@@ -1,42 +1,210 @@
-from typing import List, Tuple
+import asyncio
+import functools
+import hashlib
+import logging
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import chromadb
 import requests
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma    import Chroma
+from langchain_core.embeddings import Embeddings
 
 from ..core.settings import get_settings
-from ..core.roles    import get_allowed_departments
+from ..core.metrics  import CACHE_LOOKUPS, FILTERED_HITS, LLM_FALLBACKS, STAGE_SECONDS
+from ..core.access_policy import RoleAccess
+from ..core.roles    import ACCESS_POLICY, get_allowed_departments
 from ..schemas.chat  import ChatRequest, ChatResponse
+from .llm_client     import LLMError, get_llm_client
+from .cache          import LRUTTLCache, QueryCache
+from .embeddings     import build_embeddings, check_collection_config, embedding_fingerprint
+from .vector_index   import SINGLE, Hit, VectorIndex, reciprocal_rank_fusion
+from .lexical_index  import LexicalIndex
+from .reranker       import CrossEncoderReranker
+from .context_builder import MIN_TRUNCATED_TOKENS, assemble_context
+from ..utils.tokens  import count_tokens
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 class RAGService:
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    def __init__(self, embeddings: Optional[Embeddings] = None):
+        self.embeddings = embeddings if embeddings is not None else build_embeddings()
+        self.client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIRECTORY)
+        self.index = VectorIndex(self.client, metadata=embedding_fingerprint())
+        # Refuse to serve queries embedded differently from the stored vectors
+        for collection in self.index.collections.values():
+            check_collection_config(collection.metadata, collection.name)
+        # LangChain view of the single collection (legacy overfetch path). The
+        # index has already opened or created it; no collection_metadata, which
+        # the wrapper's get_or_create would write over the stored fingerprint
         self.vector_store = Chroma(
-            persist_directory=settings.CHROMA_PERSIST_DIRECTORY,
+            client=self.client,
             embedding_function=self.embeddings,
-            collection_name="rbac"
-        )
-
-    def retrieve(self, query: str, role: str, k: int = 5) -> List[Tuple[str, dict]]:
-        allowed = get_allowed_departments(role)
-        hits = self.vector_store.similarity_search_with_score(query, k=k*3)
-        filtered = []
-        for doc, score in hits:
-            department = doc.metadata.get("department", "general")
-            if department in allowed:
-                filtered.append((doc.page_content, doc.metadata))
-                if len(filtered) >= k:
-                    break
-        return filtered
+            collection_name=settings.CHROMA_COLLECTION_NAME,
+        ) if self.index.layout == SINGLE else None
+        self.lexical = LexicalIndex() if settings.RETRIEVAL_MODE == "hybrid" else None
+        if self.lexical is not None and self.lexical.count() == 0:
+            logger.warning("Hybrid retrieval is enabled but the lexical index is empty; run scripts/ingest.py")
+        self.reranker = CrossEncoderReranker() if settings.RERANK_ENABLED else None
+        self.llm = get_llm_client()
+        self.cache = QueryCache() if settings.QUERY_CACHE_ENABLED else None
+        # Search-box queries repeat a lot (prefixes, paging); their embeddings never go stale
+        self.search_embeddings = LRUTTLCache(maxsize=settings.SEARCH_EMBEDDING_CACHE_SIZE)
 
-    def generate(self, query: str, context: List[str]) -> str:
-        if not settings.GROQ_API_KEY or settings.GROQ_API_KEY == "your_groq_api_key_here":
-            # Fallback response when Groq API key is not configured
-            return f"I found some relevant information, but I need a Groq API key to generate a proper response. Here's what I found: {' '.join(context[:2])}"
+    def _search(self, query: str, role: str, k: int = 5,
+                query_embedding: Optional[List[float]] = None) -> List[Hit]:
+        """Role-scoped top-k hits with IDs and scores, nearest first."""
+        if query_embedding is None:
+            with STAGE_SECONDS.time(stage="embed_query"):
+                query_embedding = self.embeddings.embed_query(query)
+        return self._search_many([query], role, k, [query_embedding])[0]
+
+    def _search_many(self, queries: List[str], role: str, k: int, query_embeddings: List[List[float]],
+                     access: Optional[RoleAccess] = None) -> List[List[Hit]]:
+        """
+        `_search` for several embedded queries, with one multi-query vector
+        search for all of them. `access` overrides the role's resolved access.
+        """
+        if access is None:
+            with STAGE_SECONDS.time(stage="rbac_filter"):
+                access = ACCESS_POLICY.resolve(role)
+        # Chroma applies the RBAC predicate (or only the allowed partitions are
+        # searched), so every candidate it returns is usable
+        if self.lexical is None:
+            with STAGE_SECONDS.time(stage="vector_search"):
+                return self.index.search_many(query_embeddings, access, k)
+        candidates = max(k, settings.HYBRID_CANDIDATES)
+        with STAGE_SECONDS.time(stage="vector_search"):
+            dense = self.index.search_many(query_embeddings, access, candidates)
+        fused = []
+        for query, dense_hits in zip(queries, dense):
+            with STAGE_SECONDS.time(stage="lexical_search"):
+                sparse = self.lexical.search(query, access.departments, candidates)
+            fused.append(reciprocal_rank_fusion([dense_hits, sparse], k, settings.HYBRID_RRF_K))
+        return fused
+
+    def retrieve(self, query: str, role: str, k: int = 5,
+                 query_embedding: Optional[List[float]] = None) -> List[Tuple[str, dict]]:
+        hits, _ = self.retrieve_context(query, role, k, query_embedding)
+        return [(hit["text"], hit["metadata"]) for hit in hits]
+
+    def retrieve_context(self, query: str, role: str, k: int = 5,
+                         query_embedding: Optional[List[float]] = None) -> Tuple[List[Hit], Dict[str, int]]:
+        """Hits to put in the prompt, deduplicated and packed into the token budget, plus usage counts."""
+        if settings.RETRIEVAL_FILTER_MODE == "overfetch" and self.vector_store is not None:
+            hits = [{"text": text, "metadata": meta} for text, meta in self.retrieve_overfetch(query, role, k)]
+        else:
+            hits = self._retrieve_hits(query, role, k, query_embedding)
+        return self._assemble_context(query, role, hits)
+
+    def retrieve_context_many(self, queries: List[str], role: str, k: int = 5,
+                              query_embeddings: Optional[List[List[float]]] = None
+                              ) -> List[Tuple[List[Hit], Dict[str, int]]]:
+        """`retrieve_context` for a batch of queries; embedded together and searched in one vector query."""
+        if settings.RETRIEVAL_FILTER_MODE == "overfetch" and self.vector_store is not None:
+            return [self.retrieve_context(query, role, k) for query in queries]
+        if query_embeddings is None:
+            with STAGE_SECONDS.time(stage="embed_batch"):
+                query_embeddings = self.embeddings.embed_documents(queries)
+        fetch = k if self.reranker is None else max(k, settings.RERANK_CANDIDATES)
+        results = []
+        for query, candidates in zip(queries, self._search_many(queries, role, fetch, query_embeddings)):
+            results.append(self._assemble_context(query, role, self._rerank(query, candidates, k)))
+        return results
+
+    def _assemble_context(self, query: str, role: str, hits: List[Hit]) -> Tuple[List[Hit], Dict[str, int]]:
+        with STAGE_SECONDS.time(stage="context_assembly"):
+            hits, usage = assemble_context(hits, self._context_budget(query), settings.CONTEXT_DEDUPE,
+                                           settings.CONTEXT_MIN_OVERLAP_CHARS)
+        if usage["duplicates_removed"]:
+            FILTERED_HITS.inc(usage["duplicates_removed"], role=role, reason="duplicate")
+        over_budget = usage["chunks_retrieved"] - usage["duplicates_removed"] - usage["chunks_used"]
+        if over_budget:
+            FILTERED_HITS.inc(over_budget, role=role, reason="budget")
+        return hits, usage
+
+    def _retrieve_hits(self, query: str, role: str, k: int,
+                       query_embedding: Optional[List[float]] = None) -> List[Hit]:
+        """Search, optionally re-ranking a wider candidate set down to k."""
+        if self.reranker is None:
+            return self._search(query, role, k, query_embedding)
+        candidates = self._search(query, role, max(k, settings.RERANK_CANDIDATES), query_embedding)
+        return self._rerank(query, candidates, k)
+
+    def _rerank(self, query: str, candidates: List[Hit], k: int) -> List[Hit]:
+        if self.reranker is None:
+            return candidates[:k]
+        with STAGE_SECONDS.time(stage="rerank"):
+            return self.reranker.rerank(query, candidates, k, settings.RERANK_MIN_SCORE)
+
+    def search(self, query: str, role: str, offset: int = 0, limit: int = 10,
+               department: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Retrieval without generation, for search boxes. Takes the top
+        SEARCH_MAX_RESULTS hits (no re-ranking or context assembly) and
+        returns the page `offset:offset+limit`. Facets count the role's top
+        hits across all its departments; with `department`, the hits come
+        from a second search restricted to that department.
+        """
+        access = ACCESS_POLICY.resolve(role)
+        if department is not None and department not in access.departments:
+            raise PermissionError(f"Role {role!r} may not search department {department!r}")
+        query_embedding = self._embed_search_query(query)
+        hits = self._search_many([query], role, settings.SEARCH_MAX_RESULTS, [query_embedding], access)[0]
+        facets = Counter(hit["metadata"].get("department", "") for hit in hits)
+        if department is not None:
+            hits = self._search_many([query], role, settings.SEARCH_MAX_RESULTS, [query_embedding],
+                                     ACCESS_POLICY.restrict(access, department))[0]
+        return {"total": len(hits), "hits": hits[offset:offset + limit], "facets": dict(facets)}
 
+    def _embed_search_query(self, query: str) -> List[float]:
+        key = " ".join(query.split())
+        embedding = self.search_embeddings.get(key)
+        CACHE_LOOKUPS.inc(cache="search_embedding", result="miss" if embedding is None else "hit")
+        if embedding is None:
+            with STAGE_SECONDS.time(stage="embed_query"):
+                embedding = self.embeddings.embed_query(key)
+            self.search_embeddings.set(key, embedding)
+        return embedding
+
+    def _context_budget(self, query: str) -> int:
+        """Tokens available for context: CONTEXT_TOKEN_BUDGET and what PROMPT_TOKEN_BUDGET leaves; 0 is unlimited."""
+        budgets = [settings.CONTEXT_TOKEN_BUDGET] if settings.CONTEXT_TOKEN_BUDGET > 0 else []
+        if settings.PROMPT_TOKEN_BUDGET > 0:
+            overhead = count_tokens(self.build_prompt(query, []))
+            budgets.append(max(MIN_TRUNCATED_TOKENS, settings.PROMPT_TOKEN_BUDGET - overhead))
+        return min(budgets, default=0)
+
+    def retrieve_overfetch(self, query: str, role: str, k: int = 5) -> List[Tuple[str, dict]]:
+        """Legacy path: over-fetch k*3 unfiltered hits and drop disallowed departments."""
+        # Embedding happens inside the LangChain call, so it counts as search time here
+        with STAGE_SECONDS.time(stage="vector_search"):
+            hits = self.vector_store.similarity_search_with_score(query, k=k*3)
+        with STAGE_SECONDS.time(stage="rbac_filter"):
+            access = ACCESS_POLICY.resolve(role)
+            allowed = ACCESS_POLICY.filter_allowed(access, hits, lambda hit: hit[0].metadata.get("department"))
+        if len(allowed) < len(hits):
+            FILTERED_HITS.inc(len(hits) - len(allowed), role=role, reason="rbac")
+        return [(doc.page_content, doc.metadata) for doc, score in allowed[:k]]
+
+    @staticmethod
+    def _has_api_key() -> bool:
+        return bool(settings.GROQ_API_KEY) and settings.GROQ_API_KEY != "your_groq_api_key_here"
+
+    @staticmethod
+    def _missing_key_response(context: List[str]) -> str:
+        # Fallback response when Groq API key is not configured
+        return f"I found some relevant information, but I need a Groq API key to generate a proper response. Here's what I found: {' '.join(context[:2])}"
+
+    @staticmethod
+    def _fallback_response(context: List[str]) -> str:
+        # Fallback to context summary
+        return f"Based on the available information: {' '.join(context[:3])}"
+
+    @staticmethod
+    def build_prompt(query: str, context: List[str]) -> str:
         # Enhanced prompt template for better answer quality
-        prompt = "\n".join([
+        return "\n".join([
             "You are a helpful assistant that answers questions based on the provided context information.",
             "Please provide clear, accurate, and well-structured answers.",
             "",
@@ -57,56 +225,244 @@ class RAGService:
             "Answer:"
         ])
 
+    def generate(self, query: str, context: List[str]) -> str:
+        """Blocking generation; use `agenerate` from async code."""
+        if not self._has_api_key():
+            LLM_FALLBACKS.inc(reason="missing_key")
+            return self._missing_key_response(context)
+
+        prompt = self._build_prompt_timed(query, context)
         try:
-            resp = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",  # Fixed URL
-                headers={
-                    "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": settings.GROQ_MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.3,  # Reduced from 0.7 for more consistent answers
-                    "max_tokens": 800,   # Increased from 500 for more detailed answers
-                    "top_p": 0.9,
-                    "frequency_penalty": 0.1,
-                    "presence_penalty": 0.1
-                },
-                timeout=30  # Add timeout
-            )
+            with STAGE_SECONDS.time(stage="llm"):
+                resp = requests.post(
+                    settings.GROQ_API_URL,
+                    headers={
+                        "Authorization": f"Bearer {settings.GROQ_API_KEY}",
+                        "Content-Type": "application/json"
+                    },
+                    json=self.llm.payload(prompt),
+                    timeout=settings.LLM_TIMEOUT_SECONDS
+                )
             
             if resp.status_code != 200:
-                error_msg = f"Groq API error (Status {resp.status_code}): {resp.text}"
-                print(f"Warning: {error_msg}")
-                # Fallback to context summary
-                return f"Based on the available information: {' '.join(context[:3])}"
+                logger.warning("Groq API error (Status %s): %s", resp.status_code, resp.text)
+                LLM_FALLBACKS.inc(reason="error")
+                return self._fallback_response(context)
                 
             return resp.json()["choices"][0]["message"]["content"]
             
         except requests.exceptions.RequestException as e:
-            error_msg = f"Request error: {str(e)}"
-            print(f"Warning: {error_msg}")
-            # Fallback to context summary
-            return f"Based on the available information: {' '.join(context[:3])}"
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            print(f"Warning: {error_msg}")
-            # Fallback to context summary
-            return f"Based on the available information: {' '.join(context[:3])}"
+            logger.warning("Request error: %s", e)
+            LLM_FALLBACKS.inc(reason="error")
+            return self._fallback_response(context)
+        except Exception:
+            logger.exception("Unexpected error calling the LLM")
+            LLM_FALLBACKS.inc(reason="error")
+            return self._fallback_response(context)
+
+    async def agenerate(self, query: str, context: List[str]) -> str:
+        """Non-blocking generation over the shared pooled async client."""
+        text, _ = await self._agenerate(query, context)
+        return text
+
+    async def _agenerate(self, query: str, context: List[str]) -> Tuple[str, bool]:
+        """Returns (answer, ok); ok is False when a fallback answer was produced."""
+        if not self._has_api_key():
+            LLM_FALLBACKS.inc(reason="missing_key")
+            return self._missing_key_response(context), False
+
+        prompt = self._build_prompt_timed(query, context)
+        try:
+            with STAGE_SECONDS.time(stage="llm"):
+                return await self.llm.complete(prompt), True
+        except LLMError as e:
+            logger.warning("%s", e)
+            LLM_FALLBACKS.inc(reason="error")
+            return self._fallback_response(context), False
+        except Exception:
+            logger.exception("Unexpected error calling the LLM")
+            LLM_FALLBACKS.inc(reason="error")
+            return self._fallback_response(context), False
+
+    def _build_prompt_timed(self, query: str, context: List[str]) -> str:
+        with STAGE_SECONDS.time(stage="prompt_build"):
+            return self.build_prompt(query, context)
+
+    def _cache_lookup(self, query: str, role: str) -> Tuple[Optional[ChatResponse], Optional[List[float]]]:
+        """
+        Check the answer cache. When near-duplicate matching is enabled the query
+        is embedded up front and the embedding is returned for reuse by retrieval.
+        """
+        if self.cache is None:
+            return None, None
+        query_embedding = None
+        if self.cache.semantic_enabled and settings.RETRIEVAL_FILTER_MODE != "overfetch":
+            with STAGE_SECONDS.time(stage="embed_query"):
+                query_embedding = self.embeddings.embed_query(query)
+        with STAGE_SECONDS.time(stage="cache_lookup"):
+            cached = self.cache.get(query, get_allowed_departments(role), query_embedding)
+        return cached, query_embedding
+
+    def _cache_store(self, query: str, role: str, response: ChatResponse,
+                     query_embedding: Optional[List[float]]) -> None:
+        if self.cache is not None:
+            self.cache.set(query, get_allowed_departments(role), response, query_embedding)
 
     async def answer(self, req: ChatRequest, role: str) -> ChatResponse:
-        docs = self.retrieve(req.message, role)
-        if not docs:
+        # Embedding the question and searching block; keep them off the event loop
+        loop = asyncio.get_running_loop()
+        cached, query_embedding = await loop.run_in_executor(None, self._cache_lookup, req.message, role)
+        if cached is not None:
+            return cached
+        hits, usage = await loop.run_in_executor(
+            None, functools.partial(self.retrieve_context, req.message, role, query_embedding=query_embedding))
+        if not hits:
             return ChatResponse(response="No relevant info found.", sources=[])
-        context = [d[0] for d in docs]
-        sources = [d[1]["source"] for d in docs]
-        ans = self.generate(req.message, context)
-        return ChatResponse(response=ans, sources=sources)
+        context = [hit["text"] for hit in hits]
+        sources = [hit["metadata"]["source"] for hit in hits]
+        ans, ok = await self._agenerate(req.message, context)
+        response = ChatResponse(response=ans, sources=sources, context_usage=usage)
+        if ok:
+            self._cache_store(req.message, role, response, query_embedding)
+        return response
+
+    async def answer_stream(self, req: ChatRequest, role: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of `answer`. Yields `sources` first, then `token`
+        events as the LLM produces them, and finally `done`.
+        """
+        loop = asyncio.get_running_loop()
+        cached, query_embedding = await loop.run_in_executor(None, self._cache_lookup, req.message, role)
+        if cached is not None:
+            yield {"event": "sources", "data": {"sources": cached.sources or []}}
+            yield {"event": "token", "data": {"content": cached.response}}
+            yield {"event": "done", "data": {}}
+            return
+
+        hits, usage = await loop.run_in_executor(
+            None, functools.partial(self.retrieve_context, req.message, role, query_embedding=query_embedding))
+        context = [hit["text"] for hit in hits]
+        sources = [hit["metadata"]["source"] for hit in hits]
+        yield {"event": "sources", "data": {"sources": sources, "context_usage": usage}}
+
+        if not hits:
+            yield {"event": "token", "data": {"content": "No relevant info found."}}
+        elif not self._has_api_key():
+            LLM_FALLBACKS.inc(reason="missing_key")
+            yield {"event": "token", "data": {"content": self._missing_key_response(context)}}
+        else:
+            tokens = []
+            prompt = self._build_prompt_timed(req.message, context)
+            try:
+                # Time to the end of the stream; client pauses between tokens count too
+                with STAGE_SECONDS.time(stage="llm"):
+                    async for token in self.llm.stream(prompt):
+                        tokens.append(token)
+                        yield {"event": "token", "data": {"content": token}}
+            except Exception as e:
+                logger.warning("Streaming generation failed: %s", e)
+                LLM_FALLBACKS.inc(reason="interrupted" if tokens else "error")
+                if tokens:
+                    yield {"event": "error", "data": {"detail": "Generation interrupted"}}
+                else:
+                    yield {"event": "token", "data": {"content": self._fallback_response(context)}}
+            else:
+                response = ChatResponse(response="".join(tokens), sources=sources, context_usage=usage)
+                self._cache_store(req.message, role, response, query_embedding)
+        yield {"event": "done", "data": {}}
+
+    async def answer_batch(self, questions: List[str], role: str, k: int = 5) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer many questions for one role. The questions are embedded in one
+        batch and searched with one multi-query vector search, then answered
+        with at most BATCH_LLM_CONCURRENCY LLM calls in flight. Results are
+        yielded as they finish, not in input order; each carries the question's
+        `index`.
+        """
+        loop = asyncio.get_running_loop()
+        departments = get_allowed_departments(role)
+        batched = settings.RETRIEVAL_FILTER_MODE != "overfetch"
+        semantic = self.cache is not None and self.cache.semantic_enabled and batched
+
+        pending = list(range(len(questions)))
+        if self.cache is not None and not semantic:
+            # Exact-match lookups need no embedding; skip cached questions before the batch
+            misses = []
+            for i in pending:
+                with STAGE_SECONDS.time(stage="cache_lookup"):
+                    cached = self.cache.get(questions[i], departments)
+                if cached is None:
+                    misses.append(i)
+                else:
+                    yield self._batch_result(i, questions[i], cached, cached=True)
+            pending = misses
+        if not pending:
+            return
+
+        embeddings: Optional[List[List[float]]] = None
+        if batched:
+            with STAGE_SECONDS.time(stage="embed_batch"):
+                embeddings = await loop.run_in_executor(
+                    None, self.embeddings.embed_documents, [questions[i] for i in pending])
+        if semantic:
+            misses, miss_embeddings = [], []
+            for i, embedding in zip(pending, embeddings):
+                with STAGE_SECONDS.time(stage="cache_lookup"):
+                    cached = self.cache.get(questions[i], departments, embedding)
+                if cached is None:
+                    misses.append(i)
+                    miss_embeddings.append(embedding)
+                else:
+                    yield self._batch_result(i, questions[i], cached, cached=True)
+            pending, embeddings = misses, miss_embeddings
+            if not pending:
+                return
+
+        contexts = await loop.run_in_executor(
+            None, self.retrieve_context_many, [questions[i] for i in pending], role, k, embeddings)
+        semaphore = asyncio.Semaphore(max(1, settings.BATCH_LLM_CONCURRENCY))
+
+        async def complete(i: int, hits: List[Hit], usage: Dict[str, int],
+                           embedding: Optional[List[float]]) -> Dict[str, Any]:
+            question = questions[i]
+            try:
+                if not hits:
+                    return self._batch_result(i, question, ChatResponse(response="No relevant info found.", sources=[]))
+                context = [hit["text"] for hit in hits]
+                sources = [hit["metadata"]["source"] for hit in hits]
+                async with semaphore:
+                    ans, ok = await self._agenerate(question, context)
+                response = ChatResponse(response=ans, sources=sources, context_usage=usage)
+                if ok:
+                    self._cache_store(question, role, response, embedding)
+                return self._batch_result(i, question, response)
+            except Exception as e:
+                logger.exception("Batch question %d failed", i)
+                return {"index": i, "question": question, "error": f"{type(e).__name__}: {e}"}
+
+        tasks = [
+            asyncio.ensure_future(complete(i, hits, usage, embeddings[n] if embeddings else None))
+            for n, (i, (hits, usage)) in enumerate(zip(pending, contexts))
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # The client may stop reading early; don't leave generations running
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _batch_result(index: int, question: str, response: ChatResponse, cached: bool = False) -> Dict[str, Any]:
+        return {"index": index, "question": question, **response.model_dump(), "cached": cached}
 
-    def add_documents(self, documents: List[str]):
+    def add_documents(self, documents: List[Dict[str, Any]]):
         # if you want dynamic uploads later
         texts = [d["content"] for d in documents]
         metas = [d["metadata"] for d in documents]
-        self.vector_store.add_texts(texts=texts, metadatas=metas)
-        self.vector_store.persist()
+        ids = [hashlib.sha256((t + str(m)).encode("utf-8")).hexdigest() for t, m in zip(texts, metas)]
+        self.index.upsert(ids, texts, metas, self.embeddings.embed_documents(texts))
+        if self.lexical is not None:
+            self.lexical.upsert(ids, texts, metas)
+        if self.cache is not None:
+            self.cache.invalidate()
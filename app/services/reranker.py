@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from ..core.settings import get_settings
+from .vector_index import Hit
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Re-orders retrieval candidates with a small local cross-encoder.
+
+    All candidates that fit the latency budget are scored in one batched
+    `predict` call. The budget is enforced up front from a running estimate of
+    a call's cost, fitted as fixed overhead plus a per-pair cost over recent
+    calls: when the full candidate list would not fit, only the best-ranked
+    prefix is scored and the rest keep their retrieval order behind it. If the
+    model cannot be loaded, hits pass through unchanged.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, budget_ms: Optional[float] = None,
+                 max_length: Optional[int] = None, device: Optional[str] = None):
+        self.model_name = model_name or settings.RERANK_MODEL_NAME
+        self.budget_s = (settings.RERANK_TIME_BUDGET_MS if budget_ms is None else budget_ms) / 1000.0
+        self.max_length = max_length or settings.RERANK_MAX_LENGTH
+        self.device = device or settings.EMBEDDING_DEVICE
+        self._model = None
+        self._failed = False
+        self._lock = threading.Lock()
+        # Exponentially weighted sums of (1, pairs, seconds, pairs^2, pairs*seconds)
+        # over recent calls, for a least-squares fit of seconds = fixed + per_pair * pairs
+        self._cost_sums: Optional[List[float]] = None
+
+    def _get_model(self):
+        if self._model is None and not self._failed:
+            with self._lock:
+                if self._model is None and not self._failed:
+                    try:
+                        from sentence_transformers import CrossEncoder
+                        self._model = CrossEncoder(self.model_name, max_length=self.max_length, device=self.device)
+                    except Exception as e:
+                        self._failed = True
+                        logger.warning("Re-ranking disabled: could not load %r (%s)", self.model_name, e)
+        return self._model
+
+    def warmup(self) -> None:
+        model = self._get_model()
+        if model is not None:
+            # A cold first call says nothing about steady-state cost; don't record it
+            self._score(model, "warm-up", ["warm-up"], record=False)
+
+    def _score(self, model, query: str, texts: List[str], record: bool = True) -> List[float]:
+        start = time.perf_counter()
+        scores = model.predict([(query, t) for t in texts], batch_size=len(texts), show_progress_bar=False)
+        if record:
+            self._record_cost(len(texts), time.perf_counter() - start)
+        return [float(s) for s in scores]
+
+    def _record_cost(self, pairs: int, seconds: float) -> None:
+        sample = [1.0, pairs, seconds, pairs * pairs, pairs * seconds]
+        with self._lock:
+            if self._cost_sums is None:
+                self._cost_sums = sample
+            else:
+                self._cost_sums = [0.8 * total + 0.2 * x for total, x in zip(self._cost_sums, sample)]
+
+    def _affordable(self, n: int) -> int:
+        sums = self._cost_sums
+        if sums is None or self.budget_s <= 0:
+            return n
+        w, total_pairs, total_s, total_pairs_sq, total_pairs_s = sums
+        spread = w * total_pairs_sq - total_pairs * total_pairs
+        if spread > 1e-9 * total_pairs_sq:
+            per_pair = (w * total_pairs_s - total_pairs * total_s) / spread
+            fixed = (total_s - per_pair * total_pairs) / w
+        else:
+            # Every recent call scored about as many pairs: no slope to fit, so
+            # scale the average call; exact at the batch size actually used
+            per_pair, fixed = total_s / total_pairs, 0.0
+        if per_pair <= 0:
+            return n
+        return max(1, min(n, int((self.budget_s - max(fixed, 0.0)) / per_pair)))
+
+    def rerank(self, query: str, hits: List[Hit], top_n: int,
+               min_score: Optional[float] = None) -> List[Hit]:
+        """
+        Best `top_n` hits by cross-encoder score (stored as `rerank_score`).
+        With `min_score`, only scored hits at or above it are returned; hits
+        the time budget left unscored are dropped, since they can't be checked.
+        """
+        model = self._get_model()
+        if model is None or not hits:
+            return hits[:top_n]
+        n = self._affordable(len(hits))
+        head, tail = hits[:n], hits[n:]
+        scores = self._score(model, query, [h["text"] for h in head])
+        scored = sorted(
+            ({**h, "rerank_score": s} for h, s in zip(head, scores)),
+            key=lambda h: h["rerank_score"],
+            reverse=True,
+        )
+        if min_score is not None:
+            return [h for h in scored if h["rerank_score"] >= min_score][:top_n]
+        return (scored + tail)[:top_n]
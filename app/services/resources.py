@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from ..core.settings import get_settings
+from .embeddings import build_embeddings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class ResourceManager:
+    """
+    Owns the heavy, process-wide resources (embedding model, vector store,
+    RAG service). Nothing is loaded at import time: resources are built on
+    first use or by a background warm-up started from the app lifespan, so
+    `/health` answers immediately and `/ready` reports when loading is done.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._embeddings: Optional[Embeddings] = None
+        # Set by `preload_embeddings`: loaded, but the warm-up encode is still due
+        self._embeddings_cold = False
+        self._rag_service = None
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._error: Optional[str] = None
+        self._timings: Dict[str, float] = {}
+
+    def get_embeddings(self) -> Embeddings:
+        if self._embeddings is None or self._embeddings_cold:
+            with self._lock:
+                if self._embeddings is None:
+                    start = time.perf_counter()
+                    embeddings = build_embeddings()
+                    # Run one encode so lazily-initialized weights are resident
+                    embeddings.embed_query("warm-up")
+                    self._timings["embeddings_load_s"] = round(time.perf_counter() - start, 3)
+                    self._embeddings = embeddings
+                elif self._embeddings_cold:
+                    start = time.perf_counter()
+                    self._embeddings.embed_query("warm-up")
+                    self._timings["embeddings_warmup_s"] = round(time.perf_counter() - start, 3)
+                    self._embeddings_cold = False
+        return self._embeddings
+
+    def preload_embeddings(self) -> None:
+        """
+        Load the embedding model without running it, in a process that is about
+        to fork workers. Inference (and its thread pools) starts only in the
+        workers, since thread pools do not survive fork; the loaded weights are
+        shared copy-on-write.
+        """
+        with self._lock:
+            if self._embeddings is None:
+                start = time.perf_counter()
+                self._embeddings = build_embeddings()
+                self._embeddings_cold = True
+                self._timings["embeddings_load_s"] = round(time.perf_counter() - start, 3)
+
+    def get_rag_service(self):
+        if self._rag_service is None:
+            with self._lock:
+                if self._rag_service is None:
+                    from .rag_service import RAGService
+
+                    embeddings = self.get_embeddings()
+                    start = time.perf_counter()
+                    rag_service = RAGService(embeddings=embeddings)
+                    self._timings["vector_store_load_s"] = round(time.perf_counter() - start, 3)
+                    if rag_service.reranker is not None:
+                        start = time.perf_counter()
+                        rag_service.reranker.warmup()
+                        self._timings["reranker_load_s"] = round(time.perf_counter() - start, 3)
+                    self._rag_service = rag_service
+        return self._rag_service
+
+    def _warmup(self) -> None:
+        try:
+            self.get_rag_service()
+            self._error = None
+            logger.info("Warm-up complete: %s", self._timings)
+        except Exception as e:
+            self._error = f"{type(e).__name__}: {e}"
+            logger.exception("Warm-up failed")
+
+    def start_warmup(self) -> None:
+        """Load resources on a background thread so startup is not blocked."""
+        if self._warmup_thread is None:
+            self._warmup_thread = threading.Thread(target=self._warmup, name="resource-warmup", daemon=True)
+            self._warmup_thread.start()
+
+    @property
+    def ready(self) -> bool:
+        return self._rag_service is not None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "embeddings_loaded": self._embeddings is not None,
+            "vector_store_loaded": self._rag_service is not None,
+            "embedding_backend": settings.EMBEDDING_BACKEND,
+            "error": self._error,
+            **self._timings,
+        }
+
+
+resources = ResourceManager()
+
+
+def get_rag_service():
+    """FastAPI dependency. Declared sync so a first-use load runs in the threadpool, not on the loop."""
+    return resources.get_rag_service()
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional
+
+from ..core.settings import get_settings
+from ..utils.sqlite import ConnectionPool
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class RevocationStore:
+    """
+    Revoked tokens and per-user revocation times in SQLite, so a logout in
+    one API worker is seen by every worker on the host. Tokens are stored as
+    SHA-256 digests and dropped once they would have expired anyway.
+
+    Checks never touch the database: each process keeps the revocations in
+    memory and a background thread reloads them whenever the stored version
+    (bumped by every revocation) changes, polling every
+    REVOCATION_REFRESH_SECONDS. A revocation applies in the worker that made
+    it at once, and in the others within one polling interval.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+        " token_hash TEXT PRIMARY KEY,"
+        " exp REAL NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_revoked_tokens_exp ON revoked_tokens(exp)",
+        "CREATE TABLE IF NOT EXISTS revoked_users ("
+        " username TEXT PRIMARY KEY,"
+        " revoked_at INTEGER NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS revocation_version ("
+        " id INTEGER PRIMARY KEY CHECK (id = 0),"
+        " version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO revocation_version (id, version) VALUES (0, 0)",
+    )
+
+    def __init__(self, path: Optional[str] = None, pool_size: int = 4,
+                 refresh_seconds: Optional[float] = None):
+        self.path = Path(path or settings.REVOCATION_DB_PATH)
+        self._pool = ConnectionPool(self.path, pool_size)
+        with self._pool.connection() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+        self._lock = threading.Lock()
+        self._tokens: FrozenSet[str] = frozenset()
+        self._users: Dict[str, int] = {}
+        self._version: Optional[int] = None
+        self.refresh()
+        interval = settings.REVOCATION_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._stop = threading.Event()
+        if interval > 0:
+            threading.Thread(target=self._poll, args=(interval,), name="revocation-refresh", daemon=True).start()
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _poll(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Could not refresh token revocations: %s", e)
+
+    def refresh(self) -> None:
+        """Reload the revocations if any process changed them since the last load."""
+        with self._pool.connection() as conn:
+            (version,) = conn.execute("SELECT version FROM revocation_version WHERE id = 0").fetchone()
+            if version == self._version:
+                return
+            tokens = frozenset(row[0] for row in conn.execute(
+                "SELECT token_hash FROM revoked_tokens WHERE exp > ?", (time.time(),)))
+            users = dict(conn.execute("SELECT username, revoked_at FROM revoked_users").fetchall())
+        with self._lock:
+            self._tokens, self._users, self._version = tokens, users, version
+
+    def revoke_token(self, token: str, exp: float) -> None:
+        digest = self._digest(token)
+        now = time.time()
+        with self._pool.transaction() as conn:
+            conn.execute("DELETE FROM revoked_tokens WHERE exp <= ?", (now,))
+            conn.execute(
+                "INSERT INTO revoked_tokens (token_hash, exp) VALUES (?, ?) "
+                "ON CONFLICT(token_hash) DO UPDATE SET exp = excluded.exp",
+                (digest, exp),
+            )
+            conn.execute("UPDATE revocation_version SET version = version + 1 WHERE id = 0")
+        with self._lock:
+            self._tokens = self._tokens | {digest}
+
+    def revoke_user(self, username: str, revoked_at: int) -> None:
+        with self._pool.transaction() as conn:
+            conn.execute(
+                "INSERT INTO revoked_users (username, revoked_at) VALUES (?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET revoked_at = MAX(revoked_at, excluded.revoked_at)",
+                (username, revoked_at),
+            )
+            conn.execute("UPDATE revocation_version SET version = version + 1 WHERE id = 0")
+        with self._lock:
+            self._users = {**self._users, username: max(revoked_at, self._users.get(username, revoked_at))}
+
+    def is_revoked(self, token: str, username: str, issued_at: int) -> bool:
+        """True if `token` was revoked, or `username`'s tokens issued at or before `issued_at` were. No I/O."""
+        revoked_at = self._users.get(username)
+        if revoked_at is not None and revoked_at >= issued_at:
+            return True
+        tokens = self._tokens
+        return bool(tokens) and self._digest(token) in tokens
+
+    def close(self) -> None:
+        self._stop.set()
+        self._pool.close()
+
+
+_revocation_store: Optional[RevocationStore] = None
+_revocation_lock = threading.Lock()
+
+
+def get_revocation_store() -> RevocationStore:
+    # Opened lazily, so each forked worker gets its own connections and refresh thread
+    global _revocation_store
+    if _revocation_store is None:
+        with _revocation_lock:
+            if _revocation_store is None:
+                _revocation_store = RevocationStore()
+    return _revocation_store
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from ..core.roles import ACCESS_POLICY
+from ..core.settings import get_settings
+from ..utils.sqlite import ConnectionPool
+
+settings = get_settings()
+
+METRICS = {"count": "COUNT", "sum": "SUM", "avg": "AVG", "min": "MIN", "max": "MAX"}
+# Most rows one aggregate or lookup may return
+MAX_ROWS = 1000
+
+
+def table_name(source: str) -> str:
+    """SQLite table holding the rows of the CSV at `source` (e.g. "hr/hr_data.csv" -> "t_hr_hr_data")."""
+    stem = source.rsplit(".", 1)[0]
+    return "t_" + re.sub(r"\W+", "_", stem).strip("_").lower()
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class TabularService:
+    """
+    Ingested CSV datasets stored as SQLite tables, for questions that need a
+    filtered scan or an aggregate over rows rather than an LLM reading text.
+
+    A `datasets` catalog records each table's source file, department and
+    columns. Every query resolves the caller's role through the access
+    policy first, so a dataset is only visible to roles allowed its
+    department (HR data stays HR-only). Column names are validated against
+    the catalog and filter values are bound parameters.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS datasets ("
+        " name TEXT PRIMARY KEY,"
+        " source TEXT NOT NULL UNIQUE,"
+        " department TEXT NOT NULL,"
+        " columns TEXT NOT NULL,"
+        " row_count INTEGER NOT NULL)",
+    )
+
+    def __init__(self, path: Optional[str] = None, pool_size: int = 4):
+        self._pool = ConnectionPool(path or settings.TABULAR_DB_PATH, pool_size)
+        with self._pool.connection() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    # ── Ingestion ──
+
+    def table_for(self, source: str) -> str:
+        """
+        Table name for `source`: the one it already has, else `table_name(source)`
+        unless another source maps to that too (e.g. "a_b.csv" and "a/b.csv"),
+        in which case a short hash of the source is appended.
+        """
+        name = table_name(source)
+        with self._pool.connection() as conn:
+            row = conn.execute("SELECT name FROM datasets WHERE source = ?", (source,)).fetchone()
+            if row:
+                return row[0]
+            if conn.execute("SELECT 1 FROM datasets WHERE name = ?", (name,)).fetchone() is None:
+                return name
+        return f"{name}_{hashlib.sha1(source.encode('utf-8')).hexdigest()[:8]}"
+
+    def staging_connection(self):
+        """Connection for loading a dataset into a staging table before `publish`."""
+        return self._pool.connection()
+
+    def publish(self, conn, staging: str, name: str, source: str, department: str,
+                columns: List[str], row_count: int) -> None:
+        """Atomically replace dataset `name` with the rows loaded into `staging`."""
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+            conn.execute(f"ALTER TABLE {_quote(staging)} RENAME TO {_quote(name)}")
+            conn.execute(
+                "INSERT INTO datasets (name, source, department, columns, row_count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET source = excluded.source, department = excluded.department, "
+                "columns = excluded.columns, row_count = excluded.row_count",
+                (name, source, department, json.dumps(columns), row_count),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def drop_source(self, source: str) -> None:
+        with self._pool.transaction() as conn:
+            row = conn.execute("SELECT name FROM datasets WHERE source = ?", (source,)).fetchone()
+            if row:
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(row[0])}")
+                conn.execute("DELETE FROM datasets WHERE name = ?", (row[0],))
+
+    def clear(self) -> None:
+        with self._pool.transaction() as conn:
+            for (name,) in conn.execute("SELECT name FROM datasets").fetchall():
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+            conn.execute("DELETE FROM datasets")
+
+    # ── Queries ──
+
+    def datasets(self, role: str) -> List[Dict[str, Any]]:
+        """Datasets visible to `role`."""
+        allowed = ACCESS_POLICY.resolve(role).departments
+        with self._pool.connection() as conn:
+            rows = conn.execute("SELECT name, source, department, columns, row_count FROM datasets").fetchall()
+        return [
+            {"name": name, "source": source, "department": department,
+             "columns": json.loads(columns), "row_count": row_count}
+            for name, source, department, columns, row_count in rows
+            if department in allowed
+        ]
+
+    def _dataset(self, conn, name: str, role: str) -> List[str]:
+        row = conn.execute("SELECT department, columns FROM datasets WHERE name = ?", (name,)).fetchone()
+        # Unknown and forbidden datasets look the same to the caller
+        if row is None or not ACCESS_POLICY.allows(ACCESS_POLICY.resolve(role), row[0]):
+            raise PermissionError(f"Dataset {name!r} not found or not accessible")
+        return json.loads(row[1])
+
+    @staticmethod
+    def _check_columns(columns: List[str], *names: Optional[str]) -> None:
+        for name in names:
+            if name is not None and name not in columns:
+                raise ValueError(f"Unknown column {name!r}")
+
+    @staticmethod
+    def _where(filters: Optional[Dict[str, Any]]):
+        if not filters:
+            return "", []
+        clauses = [f"{_quote(column)} = ?" for column in filters]
+        return " WHERE " + " AND ".join(clauses), list(filters.values())
+
+    def aggregate(self, name: str, role: str, metric: str, column: Optional[str] = None,
+                  group_by: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+                  limit: int = 100) -> Dict[str, Any]:
+        """`metric` (count/sum/avg/min/max) of `column`, optionally per `group_by` value and filtered by equality."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}; expected one of {sorted(METRICS)}")
+        if metric != "count" and column is None:
+            raise ValueError(f"Metric {metric!r} needs a column")
+        _check_limit(limit)
+        with self._pool.connection() as conn:
+            columns = self._dataset(conn, name, role)
+            self._check_columns(columns, column, group_by, *(filters or {}))
+            target = _quote(column) if column else "*"
+            value = f"{METRICS[metric]}({target})"
+            where, params = self._where(filters)
+            if group_by:
+                sql = (f"SELECT {_quote(group_by)}, {value} AS value FROM {_quote(name)}{where} "
+                       f"GROUP BY {_quote(group_by)} ORDER BY value DESC LIMIT ?")
+                rows = conn.execute(sql, (*params, limit)).fetchall()
+                return {"columns": [group_by, metric], "rows": [list(r) for r in rows]}
+            row = conn.execute(f"SELECT {value} FROM {_quote(name)}{where}", params).fetchone()
+            return {"columns": [metric], "rows": [[row[0]]]}
+
+    def lookup(self, name: str, role: str, filters: Optional[Dict[str, Any]] = None,
+               columns: Optional[List[str]] = None, limit: int = 20) -> Dict[str, Any]:
+        """Rows matching equality `filters`, e.g. one employee's record."""
+        _check_limit(limit)
+        with self._pool.connection() as conn:
+            available = self._dataset(conn, name, role)
+            columns = columns or available
+            self._check_columns(available, *columns, *(filters or {}))
+            where, params = self._where(filters)
+            sql = f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(name)}{where} LIMIT ?"
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+        return {"columns": columns, "rows": [list(r) for r in rows]}
+
+
+def _check_limit(limit: int) -> None:
+    # SQLite treats a negative LIMIT as no limit at all
+    if not 1 <= limit <= MAX_ROWS:
+        raise ValueError(f"limit must be between 1 and {MAX_ROWS}")
+
+
+_tabular_service: Optional[TabularService] = None
+
+
+def get_tabular_service() -> TabularService:
+    global _tabular_service
+    if _tabular_service is None:
+        _tabular_service = TabularService()
+    return _tabular_service
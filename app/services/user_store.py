@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from ..core.settings import get_settings
+from ..utils.sqlite import ConnectionPool
+from .cache import LRUTTLCache
+
+settings = get_settings()
+
+
+class UserStore(ABC):
+    """
+    Username -> {"password_hash": ..., "role": ...} lookups for authentication.
+    Password hashes are always precomputed; stores never hash.
+    """
+
+    @abstractmethod
+    def get(self, username: str) -> Optional[Dict]:
+        """Return the user's record, or None if unknown."""
+
+    @abstractmethod
+    def upsert_many(self, users: Iterable[Dict]) -> int:
+        """Insert or update records with `username`, `password_hash` and `role` keys."""
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __contains__(self, username: str) -> bool:
+        return self.get(username) is not None
+
+
+class JsonUserStore(UserStore):
+    """
+    Users with precomputed bcrypt hashes, read from a JSON file on first use:
+
+        {"Tony": {"password_hash": "$2b$12$...", "role": "engineering"}, ...}
+
+    Nothing is hashed at import or load time.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.USER_STORE_PATH)
+        self._users: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._users is None:
+            with self._lock:
+                if self._users is None:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._users = json.load(f)
+        return self._users
+
+    def get(self, username: str) -> Optional[Dict]:
+        return self._load().get(username)
+
+    def upsert_many(self, users: Iterable[Dict]) -> int:
+        data = dict(self._load())
+        n = 0
+        for user in users:
+            data[user["username"]] = {"password_hash": user["password_hash"], "role": user["role"]}
+            n += 1
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._users = data
+        return n
+
+    def count(self) -> int:
+        return len(self._load())
+
+
+class SQLiteUserStore(UserStore):
+    """
+    SQLite-backed store for large user bases.
+
+    `username` is the (clustered) primary key, so a login is a single index
+    lookup. Connections come from a small pool so concurrent requests don't
+    serialize on one handle, WAL mode lets bulk imports run alongside logins,
+    and a read-through LRU/TTL cache answers repeat lookups (including
+    unknown usernames) without touching the database.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS users ("
+        " username TEXT PRIMARY KEY,"
+        " password_hash TEXT NOT NULL,"
+        " role TEXT NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)",
+    )
+
+    def __init__(self, path: Optional[str] = None, pool_size: Optional[int] = None,
+                 cache_size: Optional[int] = None, cache_ttl: Optional[float] = None):
+        self.path = Path(path or settings.USER_DB_PATH)
+        self._pool = ConnectionPool(self.path, pool_size or settings.USER_STORE_POOL_SIZE)
+        with self._pool.connection() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+        cache_size = settings.USER_STORE_CACHE_SIZE if cache_size is None else cache_size
+        self._cache = LRUTTLCache(
+            maxsize=cache_size,
+            ttl=settings.USER_STORE_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl,
+        ) if cache_size > 0 else None
+
+    def get(self, username: str) -> Optional[Dict]:
+        if self._cache is not None:
+            cached = self._cache.get(username)
+            if cached is not None:
+                # False marks a cached "no such user"
+                return cached or None
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT password_hash, role FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        user = {"password_hash": row[0], "role": row[1]} if row else None
+        if self._cache is not None:
+            self._cache.set(username, user or False)
+        return user
+
+    def upsert_many(self, users: Iterable[Dict]) -> int:
+        rows = [(u["username"], u["password_hash"], u["role"]) for u in users]
+        with self._pool.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET "
+                "password_hash = excluded.password_hash, role = excluded.role",
+                rows,
+            )
+        if self._cache is not None:
+            for row in rows:
+                self._cache.pop(row[0])
+        return len(rows)
+
+    def count(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def create_user_store(backend: Optional[str] = None) -> UserStore:
+    """User store selected by USER_STORE_BACKEND ("json" or "sqlite")."""
+    backend = backend or settings.USER_STORE_BACKEND
+    if backend == "json":
+        return JsonUserStore()
+    if backend == "sqlite":
+        return SQLiteUserStore()
+    raise ValueError(f"Unknown USER_STORE_BACKEND: {backend!r}")
+
+
+_user_store: Optional[UserStore] = None
+
+
+def get_user_store() -> UserStore:
+    global _user_store
+    if _user_store is None:
+        _user_store = create_user_store()
+    return _user_store
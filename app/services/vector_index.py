@@ -0,0 +1,185 @@
+import heapq
+import math
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby, islice
+from typing import Any, Dict, List, Optional, Sequence
+
+from chromadb import errors as chroma_errors
+
+from ..core.access_policy import RoleAccess
+from ..core.roles import DEPARTMENT_DIRS
+from ..core.settings import get_settings
+
+settings = get_settings()
+
+SINGLE = "single"
+PARTITIONED = "partitioned"
+
+# get_collection raises NotFoundError on newer chromadb releases and ValueError on 0.4
+COLLECTION_NOT_FOUND = (ValueError, getattr(chroma_errors, "NotFoundError", ValueError))
+
+# A retrieval hit: {"id", "text", "metadata", "distance", "score"}; score is a
+# higher-is-better relevance derived from the distance
+Hit = Dict[str, Any]
+
+
+def partition_name(department: str) -> str:
+    return f"{settings.CHROMA_COLLECTION_NAME}_{department}"
+
+
+def collection_names(layout: Optional[str] = None) -> Dict[Optional[str], str]:
+    """Collection name per department for `layout`; the single layout has one entry keyed None."""
+    layout = layout or settings.CHROMA_LAYOUT
+    if layout == SINGLE:
+        return {None: settings.CHROMA_COLLECTION_NAME}
+    if layout == PARTITIONED:
+        return {department: partition_name(department) for department in DEPARTMENT_DIRS}
+    raise ValueError(f"Unknown CHROMA_LAYOUT: {layout!r}")
+
+
+def open_collection(client, name: str, metadata: Optional[Dict[str, Any]] = None):
+    """
+    Collection `name` as stored, or a new one created with `metadata`.
+    get_or_create_collection would replace an existing collection's metadata
+    (and so its embedding fingerprint) with `metadata` on chromadb 0.4.
+    """
+    try:
+        return client.get_collection(name=name)
+    except COLLECTION_NOT_FOUND:
+        pass
+    try:
+        return client.create_collection(name=name, metadata=metadata)
+    except Exception as e:
+        # Another process may have created it in the meantime; keep its metadata
+        try:
+            return client.get_collection(name=name)
+        except COLLECTION_NOT_FOUND:
+            raise e
+
+
+def relevance(distance: float) -> float:
+    """Map a Chroma distance in the configured space to a 0..1-ish relevance."""
+    if settings.CHROMA_DISTANCE == "l2":
+        return 1.0 - distance / math.sqrt(2)
+    return 1.0 - distance
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[Hit]], k: int, rrf_k: int = 60) -> List[Hit]:
+    """
+    Fuse best-first hit lists by reciprocal rank: each list contributes
+    1 / (rrf_k + rank) per hit. Rank-based, so BM25 and cosine scores never
+    need to be put on a common scale. The fused score replaces `score`.
+    """
+    fused: Dict[str, Hit] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            entry = fused.get(hit["id"])
+            if entry is None:
+                entry = fused[hit["id"]] = {**hit, "score": 0.0}
+            entry["score"] += 1.0 / (rrf_k + rank)
+    return sorted(fused.values(), key=lambda h: h["score"], reverse=True)[:k]
+
+
+class VectorIndex:
+    """
+    The raw Chroma collections behind retrieval and ingestion.
+
+    With CHROMA_LAYOUT="single" every chunk lives in one collection and RBAC
+    is a `where` predicate. With "partitioned" each department in
+    DEPARTMENT_DIRS gets its own collection (and HNSW graph), so a search only
+    walks vectors the caller may see: the allowed partitions are queried
+    concurrently, unfiltered, and their per-partition top-k lists are merged.
+    """
+
+    def __init__(self, client, layout: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
+        self.layout = layout or settings.CHROMA_LAYOUT
+        self.collections = {
+            key: open_collection(client, name, metadata)
+            for key, name in collection_names(self.layout).items()
+        }
+        self._pool: Optional[ThreadPoolExecutor] = None
+        if self.layout == PARTITIONED:
+            # hnswlib releases the GIL during a search, so threads give real parallelism
+            self._pool = ThreadPoolExecutor(max_workers=len(self.collections), thread_name_prefix="chroma-search")
+
+    def collection_for(self, department: Optional[str]):
+        if self.layout == SINGLE:
+            return self.collections[None]
+        return self.collections[department or "general"]
+
+    def count(self) -> int:
+        return sum(c.count() for c in self.collections.values())
+
+    def upsert(self, ids: List[str], texts: List[str], metadatas: List[Dict],
+               embeddings: Sequence[Sequence[float]]) -> int:
+        if self.layout == SINGLE:
+            self.collections[None].upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=embeddings)
+            return len(ids)
+        rows = sorted(range(len(ids)), key=lambda i: metadatas[i].get("department") or "general")
+        for department, group in groupby(rows, key=lambda i: metadatas[i].get("department") or "general"):
+            group = list(group)
+            self.collection_for(department).upsert(
+                ids=[ids[i] for i in group],
+                documents=[texts[i] for i in group],
+                metadatas=[metadatas[i] for i in group],
+                embeddings=[embeddings[i] for i in group],
+            )
+        return len(ids)
+
+    def delete(self, ids: List[str], department: Optional[str] = None) -> None:
+        """Delete by ID; without a department, partitioned layouts try every partition."""
+        if self.layout == SINGLE or department is not None:
+            self.collection_for(department).delete(ids=ids)
+        else:
+            for collection in self.collections.values():
+                collection.delete(ids=ids)
+
+    @staticmethod
+    def _query(collection, query_embeddings: Sequence[Sequence[float]], k: int,
+               where: Optional[Dict[str, Any]] = None) -> List[List[Hit]]:
+        """One Chroma call for any number of query vectors; a hit list per query."""
+        result = collection.query(
+            query_embeddings=[list(e) for e in query_embeddings],
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            [
+                {"id": id_, "text": text, "metadata": metadata or {}, "distance": distance,
+                 "score": relevance(distance)}
+                for id_, text, metadata, distance in zip(ids, documents, metadatas, distances)
+            ]
+            for ids, documents, metadatas, distances in zip(
+                result["ids"], result["documents"], result["metadatas"], result["distances"]
+            )
+        ]
+
+    def search(self, query_embedding: Sequence[float], access: RoleAccess, k: int) -> List[Hit]:
+        """Top-k hits, nearest first, among the departments `access` covers."""
+        return self.search_many([query_embedding], access, k)[0]
+
+    def search_many(self, query_embeddings: Sequence[Sequence[float]], access: RoleAccess,
+                    k: int) -> List[List[Hit]]:
+        """`search` for several queries at once: one Chroma call per collection searched."""
+        if not query_embeddings:
+            return []
+        if self.layout == SINGLE:
+            return self._query(self.collections[None], query_embeddings, k, where=access.where_filter)
+        targets = [self.collections[d] for d in sorted(access.departments) if d in self.collections]
+        if not targets:
+            return [[] for _ in query_embeddings]
+        if len(targets) == 1:
+            return self._query(targets[0], query_embeddings, k)
+        futures = [self._pool.submit(self._query, c, query_embeddings, k) for c in targets]
+        per_partition = [f.result() for f in futures]
+        # Each partition's list is already sorted by distance
+        return [
+            list(islice(heapq.merge(*(lists[i] for lists in per_partition), key=lambda h: h["distance"]), k))
+            for i in range(len(query_embeddings))
+        ]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,48 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+
+class ConnectionPool:
+    """
+    A fixed set of SQLite connections shared across threads. WAL mode lets
+    readers proceed while a writer (ingest, bulk import) commits.
+    """
+
+    def __init__(self, path: Union[str, Path], size: int = 4):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, size)):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
@@ -0,0 +1,73 @@
+import logging
+import re
+import threading
+
+from ..core.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Rough subword count for English prose when no tokenizer is configured:
+# each word or punctuation mark, plus one extra piece per 6 chars of long words
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+_tokenizer = None
+_tokenizer_loaded = False
+_lock = threading.Lock()
+
+
+def _get_tokenizer():
+    """
+    The tokenizer named by PROMPT_TOKENIZER (a HuggingFace tokenizer name or a
+    local tokenizer.json path), loaded once. Returns None when unset or
+    unavailable, in which case counts are estimated.
+    """
+    global _tokenizer, _tokenizer_loaded
+    if not _tokenizer_loaded:
+        with _lock:
+            if not _tokenizer_loaded:
+                name = settings.PROMPT_TOKENIZER
+                if name:
+                    try:
+                        from tokenizers import Tokenizer
+                        if name.endswith(".json"):
+                            _tokenizer = Tokenizer.from_file(name)
+                        else:
+                            _tokenizer = Tokenizer.from_pretrained(name)
+                    except Exception as e:
+                        logger.warning("Could not load tokenizer %r (%s); estimating token counts", name, e)
+                _tokenizer_loaded = True
+    return _tokenizer
+
+
+def _estimate(text: str) -> int:
+    return sum(1 + len(p) // 6 for p in _PIECE_RE.findall(text))
+
+
+def count_tokens(text: str) -> int:
+    """Number of prompt tokens `text` is expected to cost."""
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return _estimate(text)
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` within `max_tokens`, cut at a token (or word) boundary."""
+    if max_tokens <= 0:
+        return ""
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        offsets = tokenizer.encode(text, add_special_tokens=False).offsets
+        if len(offsets) <= max_tokens:
+            return text
+        return text[:offsets[max_tokens - 1][1]]
+    used = 0
+    for match in _PIECE_RE.finditer(text):
+        used += 1 + len(match.group()) // 6
+        if used > max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
@@ -0,0 +1,110 @@
+"""
+Cost of access checks with a large synthetic policy.
+
+Builds a policy with --roles roles over --departments departments (each role
+grants a few departments and inherits from up to two earlier roles), then
+filters a batch of --hits candidate hits for multi-role users. Compares the
+compiled bitmask check against recomputing the inherited department set per
+request and testing set membership per hit.
+
+Usage:
+    python -m benchmarks.access_policy --roles 300 --departments 400 --hits 5000
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Set
+
+from benchmarks.common import emit, summarize_latencies
+from app.core.access_policy import AccessPolicy
+
+
+def synthetic_policy(n_roles: int, n_departments: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    departments = [f"dept{i}" for i in range(n_departments)]
+    roles = {"user": {"departments": [departments[0]]}}
+    names = ["user"]
+    for i in range(n_roles):
+        name = f"role{i}"
+        roles[name] = {
+            "departments": rng.sample(departments, 3),
+            "inherits": rng.sample(names, min(len(names), rng.randint(1, 2))),
+        }
+        names.append(name)
+    return {"departments": departments, "default_role": "user", "roles": roles}
+
+
+def department_of(hit: Dict) -> str:
+    return hit["department"]
+
+
+def naive_departments(policy: Dict, roles: List[str]) -> Set[str]:
+    """Walk the inheritance graph on every request, as an uncompiled lookup would."""
+    allowed: Set[str] = set()
+    stack = list(roles)
+    seen = set()
+    while stack:
+        role = stack.pop()
+        if role in seen:
+            continue
+        seen.add(role)
+        spec = policy["roles"][role]
+        allowed.update(spec.get("departments", []))
+        stack.extend(spec.get("inherits", []))
+    return allowed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", type=int, default=300)
+    parser.add_argument("--departments", type=int, default=400)
+    parser.add_argument("--hits", type=int, default=5000, help="candidate hits filtered per request")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    raw = synthetic_policy(args.roles, args.departments, args.seed)
+
+    start = time.perf_counter()
+    policy = AccessPolicy.from_dict(raw)
+    compile_s = time.perf_counter() - start
+
+    role_names = list(raw["roles"])
+    users = [",".join(rng.sample(role_names, 3)) for _ in range(50)]
+    hits = [{"department": rng.choice(raw["departments"])} for _ in range(args.hits)]
+
+    compiled: List[float] = []
+    naive: List[float] = []
+    for i in range(args.requests):
+        roles = users[i % len(users)]
+
+        start = time.perf_counter()
+        access = policy.resolve(roles)
+        kept_compiled = policy.filter_allowed(access, hits, department_of)
+        compiled.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        allowed = naive_departments(raw, roles.split(","))
+        kept_naive = [h for h in hits if department_of(h) in allowed]
+        naive.append(time.perf_counter() - start)
+
+        assert len(kept_compiled) == len(kept_naive)
+
+    result = {
+        "benchmark": "access_policy",
+        "roles": args.roles,
+        "departments": args.departments,
+        "hits_per_request": args.hits,
+        "compile_ms": round(1000 * compile_s, 3),
+        "compiled": summarize_latencies(compiled),
+        "naive": summarize_latencies(naive),
+    }
+    result["compiled"]["ns_per_hit"] = round(1e9 * sum(compiled) / (args.requests * args.hits), 1)
+    result["naive"]["ns_per_hit"] = round(1e9 * sum(naive) / (args.requests * args.hits), 1)
+    emit(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
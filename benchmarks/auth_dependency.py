@@ -0,0 +1,52 @@
+"""
+Per-request overhead of the `get_current_user` auth dependency.
+
+Calls the dependency directly (no HTTP) --iterations times with the same
+token, once with the verified-token cache disabled (full JWT decode + HMAC
+check + user lookup on every call) and once with it enabled.
+
+Usage:
+    python -m benchmarks.auth_dependency --iterations 20000
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from benchmarks.common import emit, summarize_latencies
+from app.services import auth_service
+from app.services.cache import LRUTTLCache
+
+
+async def measure(token: str, iterations: int) -> dict:
+    latencies: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await auth_service.get_current_user(token)
+        latencies.append(time.perf_counter() - start)
+    summary = summarize_latencies(latencies)
+    summary["mean_us"] = round(1e6 * sum(latencies) / len(latencies), 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    token = auth_service.create_access_token({"sub": "Tony", "role": "engineering"})
+    results = {}
+
+    auth_service._token_cache = None
+    results["uncached"] = asyncio.run(measure(token, args.iterations))
+
+    auth_service._token_cache = LRUTTLCache(maxsize=auth_service.settings.AUTH_TOKEN_CACHE_SIZE)
+    results["cached"] = asyncio.run(measure(token, args.iterations))
+
+    results["speedup"] = round(results["uncached"]["mean_us"] / max(results["cached"]["mean_us"], 1e-9), 2)
+    emit({"benchmark": "auth_dependency", "iterations": args.iterations, **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
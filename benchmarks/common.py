@@ -0,0 +1,88 @@
+"""Shared helpers for the benchmark scripts."""
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Make `app` importable when a benchmark is run as `python benchmarks/<name>.py`
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+# A few representative questions per department, taken from the README
+SAMPLE_QUERIES: Dict[str, List[str]] = {
+    "engineering": [
+        "What is the system architecture of FinSolve Technologies?",
+        "How does the API Gateway handle authentication and rate limiting?",
+        "What is the process for automated testing and CI/CD?",
+    ],
+    "finance": [
+        "What was the company's revenue growth in 2024?",
+        "What is the gross margin and net margin for the year?",
+        "How did vendor costs impact profitability?",
+    ],
+    "hr": [
+        "What is the leave policy for employees?",
+        "What is the average leave balance across all employees?",
+        "Who manages the HR department?",
+    ],
+    "marketing": [
+        "What were the main marketing campaigns in 2024?",
+        "What is the customer acquisition cost and customer lifetime value?",
+        "How did social media engagement impact customer acquisition?",
+    ],
+    "general": [
+        "What are the company holidays?",
+        "What is the code of conduct?",
+    ],
+}
+
+
+def all_sample_queries() -> List[str]:
+    return [q for queries in SAMPLE_QUERIES.values() for q in queries]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (pct in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_latencies(latencies_s: Sequence[float]) -> Dict[str, float]:
+    """Summarize a list of latencies (seconds) in milliseconds."""
+    n = len(latencies_s)
+    return {
+        "count": n,
+        "mean_ms": round(1000 * sum(latencies_s) / n, 3) if n else 0.0,
+        "p50_ms": round(1000 * percentile(latencies_s, 50), 3),
+        "p95_ms": round(1000 * percentile(latencies_s, 95), 3),
+        "p99_ms": round(1000 * percentile(latencies_s, 99), 3),
+    }
+
+
+class Stopwatch:
+    """Context manager recording wall-clock durations into a list."""
+
+    def __init__(self, sink: List[float]):
+        self.sink = sink
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.sink.append(time.perf_counter() - self._start)
+        return False
+
+
+def emit(result: Dict, output: Optional[str] = None) -> None:
+    """Print the result as JSON and optionally write it to `output`."""
+    text = json.dumps(result, indent=2, sort_keys=True)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
@@ -0,0 +1,134 @@
+"""
+Compare the PyTorch embedding model with its ONNX export (fp32 and int8).
+
+Each backend runs in a fresh interpreter, so import time and memory are
+its own:
+
+  * load_s        - importing the backend and loading the model
+  * rss_mb        - resident memory after loading and encoding (peak)
+  * query         - single-text embed_query latency (p50/p95/p99)
+  * throughput    - embed_documents texts/second in batches of --batch-size
+  * min/mean cosine of each ONNX variant's vectors against the PyTorch ones
+
+Needs the model (for "torch") and an export from scripts/export_onnx.py.
+
+Usage:
+    python -m benchmarks.embedding_backends --threads 4
+    python -m benchmarks.embedding_backends --backends onnx onnx-int8 --queries 500
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import all_sample_queries, emit, project_root, summarize_latencies
+from scripts.export_onnx import cosine_stats
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def document_texts(count: int) -> List[str]:
+    """Paragraphs of the bundled documents, repeated up to `count`."""
+    paragraphs = [
+        p.strip()
+        for path in sorted((project_root / "resources" / "data").rglob("*.md"))
+        for p in path.read_text(encoding="utf-8", errors="ignore").split("\n\n")
+        if p.strip()
+    ] or all_sample_queries()
+    return [paragraphs[i % len(paragraphs)] for i in range(count)]
+
+
+def run_backend(backend: str, threads: int, queries: int, documents: int, batch_size: int, vectors_path: str) -> Dict:
+    """Measure one backend in this process; called in a child interpreter."""
+    start = time.perf_counter()
+    if backend == "torch":
+        import torch
+
+        if threads > 0:
+            torch.set_num_threads(threads)
+        from app.services.embeddings import build_local_embeddings
+
+        embeddings = build_local_embeddings()
+    else:
+        from app.services.embeddings import OnnxEmbeddings
+
+        # verify=False: report a variant even if it fails EMBEDDING_ONNX_MIN_COSINE; vs_torch shows by how much
+        embeddings = OnnxEmbeddings(quantized=backend == "onnx-int8", threads=threads, batch_size=batch_size,
+                                    verify=False)
+    embeddings.embed_query("warm-up")
+    load_s = time.perf_counter() - start
+
+    samples = all_sample_queries()
+    latencies = []
+    for i in range(queries):
+        start = time.perf_counter()
+        embeddings.embed_query(samples[i % len(samples)])
+        latencies.append(time.perf_counter() - start)
+
+    texts = document_texts(documents)
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        embeddings.embed_documents(texts[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start
+
+    # Vectors for the compatibility comparison, on a fixed sample
+    np.save(vectors_path, np.asarray(embeddings.embed_documents(samples + texts[:64]), dtype=np.float32))
+    return {
+        "load_s": round(load_s, 3),
+        # ru_maxrss is in KiB on Linux
+        "rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "torch_imported": "torch" in sys.modules,
+        "query": summarize_latencies(latencies),
+        "throughput_texts_per_s": round(len(texts) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--threads", type=int, default=0,
+                        help="intra-op threads for every backend (0: library default)")
+    parser.add_argument("--queries", type=int, default=200, help="single-query encodes")
+    parser.add_argument("--documents", type=int, default=1024, help="texts encoded for throughput")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_backend(args.child, args.threads, args.queries, args.documents, args.batch_size, args.vectors)
+        print(json.dumps(result))
+        return
+
+    results: Dict[str, Dict] = {}
+    vectors: Dict[str, np.ndarray] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            vectors_path = os.path.join(tmp, f"{backend}.npy")
+            cmd = [sys.executable, "-m", "benchmarks.embedding_backends", "--child", backend,
+                   "--threads", str(args.threads), "--queries", str(args.queries),
+                   "--documents", str(args.documents), "--batch-size", str(args.batch_size), "--vectors", vectors_path]
+            proc = subprocess.run(cmd, cwd=project_root, capture_output=True, text=True)
+            if proc.returncode != 0:
+                results[backend] = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+                continue
+            results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(vectors_path)
+
+    if "torch" in vectors:
+        for backend, vecs in vectors.items():
+            if backend != "torch":
+                results[backend]["vs_torch"] = cosine_stats(vectors["torch"], vecs)
+    emit({"threads": args.threads, "batch_size": args.batch_size, "backends": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Load test for LLM generation against a local fake Groq server.
+
+Fires --requests completions with up to --concurrency in flight and compares
+  * blocking - the legacy `requests.post` issued from inside the event loop
+  * async    - the pooled `GroqClient` used by `RAGService.agenerate`
+
+Besides throughput and latency it records event-loop lag (how late a 10ms
+heartbeat task wakes up), which is what stalls every other request on the
+uvicorn worker while a blocking completion is in flight.
+
+Usage:
+    python -m benchmarks.llm_load --requests 200 --concurrency 50 --latency-ms 200
+"""
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import requests
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from benchmarks.common import emit, summarize_latencies
+from app.services.llm_client import GroqClient, LLMError
+
+
+def build_fake_groq(latency_s: float, error_rate: float) -> FastAPI:
+    fake = FastAPI()
+
+    @fake.post("/openai/v1/chat/completions")
+    async def completions(body: dict):
+        await asyncio.sleep(latency_s)
+        if random.random() < error_rate:
+            return JSONResponse(status_code=429, content={"error": "rate limited"})
+        return {"choices": [{"message": {"role": "assistant", "content": "ok"}}]}
+
+    return fake
+
+
+def start_server(app: FastAPI) -> Tuple[uvicorn.Server, str]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}/openai/v1/chat/completions"
+
+
+async def heartbeat(stop: asyncio.Event, lags: List[float], interval: float = 0.01):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(mode: str, url: str, total: int, concurrency: int) -> Dict:
+    client = GroqClient(api_key="fake", url=url, max_concurrency=concurrency)
+    session = requests.Session()
+    limiter = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with limiter:
+            start = time.perf_counter()
+            try:
+                if mode == "blocking":
+                    resp = session.post(url, json=client.payload("hello"), timeout=30)
+                    if resp.status_code != 200:
+                        errors += 1
+                else:
+                    await client.complete("hello")
+            except LLMError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    await client.aclose()
+    session.close()
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "errors": errors,
+        "latency": summarize_latencies(latencies),
+        "max_event_loop_lag_ms": round(1000 * max(lags, default=0.0), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fake Groq response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake 429 responses")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    server, url = start_server(build_fake_groq(args.latency_ms / 1000.0, args.error_rate))
+    try:
+        results = {mode: asyncio.run(run_mode(mode, url, args.requests, args.concurrency))
+                   for mode in ("blocking", "async")}
+    finally:
+        server.should_exit = True
+
+    emit({
+        "benchmark": "llm_load",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "fake_latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "modes": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Login throughput under concurrent load.
+
+Drives POST /api/v1/auth/login in-process (httpx + ASGI transport) with
+--concurrency simultaneous clients, while a probe measures /health latency
+to show whether bcrypt work is stalling the event loop.
+
+--inline runs bcrypt verification directly on the event loop (the previous
+behaviour) for comparison.
+
+Usage:
+    python -m benchmarks.login_throughput --logins 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.common import emit, summarize_latencies
+from app.main import app
+from app.services import auth_service
+
+
+async def run(logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    health: List[float] = []
+    failures = 0
+    limiter = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login():
+            nonlocal failures
+            async with limiter:
+                start = time.perf_counter()
+                resp = await client.post("/api/v1/auth/login",
+                                         json={"username": "Tony", "password": "password123"})
+                latencies.append(time.perf_counter() - start)
+                failures += resp.status_code != 200
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_s": round(logins / elapsed, 2),
+        "failures": failures,
+        "login_latency": summarize_latencies(latencies),
+        "health_latency_during_load": summarize_latencies(health),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--inline", action="store_true", help="verify bcrypt on the event loop")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    if args.inline:
+        async def inline_verify(password: str, password_hash: str) -> bool:
+            return auth_service.pwd_context.verify(password, password_hash)
+        auth_service.verify_password = inline_verify
+
+    result = asyncio.run(run(args.logins, args.concurrency))
+    emit({
+        "benchmark": "login_throughput",
+        "mode": "inline" if args.inline else "threadpool",
+        "hash_workers": auth_service.settings.AUTH_HASH_WORKERS,
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        **result,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Single-collection vs per-department partitioned Chroma layout.
+
+For each corpus size in --sizes, builds a synthetic corpus (clustered random
+unit vectors, spread over the departments in DEPARTMENT_DIRS with --skew
+making some departments much larger) into a throwaway Chroma directory in
+both layouts, then runs --queries searches per role through VectorIndex.
+Reports latency and recall@k against an exact brute-force top-k over the
+vectors each role may see.
+
+Usage:
+    python -m benchmarks.partition_layout --sizes 2000 20000 100000 --k 5
+"""
+import argparse
+import tempfile
+import time
+from typing import Dict, List
+
+import chromadb
+import numpy as np
+
+from benchmarks.common import emit, summarize_latencies
+from app.core.roles import ACCESS_POLICY, DEPARTMENT_DIRS, ROLE_DEPARTMENTS
+from app.services.vector_index import PARTITIONED, SINGLE, VectorIndex
+
+DIM = 384
+
+
+def synthetic_corpus(n: int, skew: float, rng: np.random.Generator):
+    departments = list(DEPARTMENT_DIRS)
+    weights = np.array([skew ** i for i in range(len(departments))], dtype=float)
+    labels = rng.choice(len(departments), size=n, p=weights / weights.sum())
+    centers = rng.normal(size=(64, DIM))
+    vectors = centers[rng.integers(0, len(centers), size=n)] + 0.6 * rng.normal(size=(n, DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32), [departments[i] for i in labels]
+
+
+def build(path: str, layout: str, vectors: np.ndarray, departments: List[str], batch: int) -> VectorIndex:
+    client = chromadb.PersistentClient(path=path)
+    index = VectorIndex(client, layout=layout, metadata={"hnsw:space": "cosine"})
+    for start in range(0, len(vectors), batch):
+        end = min(start + batch, len(vectors))
+        index.upsert(
+            ids=[str(i) for i in range(start, end)],
+            texts=[f"chunk {i}" for i in range(start, end)],
+            metadatas=[{"department": departments[i], "source": f"doc{i}"} for i in range(start, end)],
+            embeddings=vectors[start:end].tolist(),
+        )
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=50, help="queries per role")
+    parser.add_argument("--skew", type=float, default=0.6, help="relative size of each successive department")
+    parser.add_argument("--batch", type=int, default=2000, help="upsert batch size while building")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results: Dict[str, Dict] = {}
+    for size in args.sizes:
+        vectors, departments = synthetic_corpus(size, args.skew, rng)
+        dept_array = np.array(departments)
+        queries = synthetic_corpus(args.queries, 1.0, rng)[0]
+        results[str(size)] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            indexes = {}
+            for layout in (SINGLE, PARTITIONED):
+                start = time.perf_counter()
+                indexes[layout] = build(f"{tmp}/{layout}", layout, vectors, departments, args.batch)
+                results[str(size)][f"{layout}_build_s"] = round(time.perf_counter() - start, 2)
+
+            for role in ROLE_DEPARTMENTS:
+                access = ACCESS_POLICY.resolve(role)
+                visible = np.flatnonzero(np.isin(dept_array, sorted(access.departments)))
+                row = {"visible_chunks": int(len(visible))}
+                for layout, index in indexes.items():
+                    latencies, recalls = [], []
+                    for q in queries:
+                        start = time.perf_counter()
+                        hits = index.search(q.tolist(), access, args.k)
+                        latencies.append(time.perf_counter() - start)
+                        if len(visible):
+                            exact = visible[np.argsort(-(vectors[visible] @ q))[:args.k]]
+                            truth = {str(i) for i in exact}
+                            recalls.append(len(truth & {h["id"] for h in hits}) / len(truth))
+                    row[layout] = {
+                        **summarize_latencies(latencies),
+                        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else None,
+                    }
+                results[str(size)][role] = row
+            for index in indexes.values():
+                index.close()
+
+    emit({"benchmark": "partition_layout", "k": args.k, "queries_per_role": args.queries, "results": results},
+         args.output)
+
+
+if __name__ == "__main__":
+    main()
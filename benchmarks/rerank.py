@@ -0,0 +1,117 @@
+"""
+End-to-end effect of context assembly, cross-encoder re-ranking and context trimming.
+
+Runs the sample queries for each department role through four pipelines:
+
+  * baseline - top-k ANN hits straight into the prompt
+  * dedupe   - duplicate and overlapping spans removed (CONTEXT_DEDUPE)
+  * rerank   - dedupe, with RERANK_CANDIDATES hits re-ranked down to k
+  * budget   - rerank plus CONTEXT_TOKEN_BUDGET packing
+
+For each it records retrieval latency, prompt tokens, and end-to-end latency
+against a local fake Groq server whose response time grows with the prompt
+(--base-ms + --per-token-ms per input token), approximating prefill cost.
+
+Needs an ingested collection and the embedding and cross-encoder models.
+
+Usage:
+    python -m benchmarks.rerank --budget 600 --per-token-ms 0.05
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from fastapi import FastAPI
+
+from benchmarks.common import SAMPLE_QUERIES, emit, summarize_latencies
+from benchmarks.llm_load import start_server
+from app.core.settings import get_settings
+from app.services.llm_client import GroqClient
+from app.services.rag_service import RAGService
+from app.services.reranker import CrossEncoderReranker
+from app.utils.tokens import count_tokens
+
+settings = get_settings()
+
+
+def build_fake_groq(base_s: float, per_token_s: float) -> FastAPI:
+    fake = FastAPI()
+
+    @fake.post("/openai/v1/chat/completions")
+    async def completions(body: dict):
+        prompt = " ".join(m["content"] for m in body["messages"])
+        await asyncio.sleep(base_s + per_token_s * count_tokens(prompt))
+        return {"choices": [{"message": {"role": "assistant", "content": "ok"}}]}
+
+    return fake
+
+
+async def run_pipeline(rag: RAGService, k: int, repeat: int) -> Dict:
+    retrieval: List[float] = []
+    end_to_end: List[float] = []
+    prompt_tokens: List[int] = []
+    for role, queries in SAMPLE_QUERIES.items():
+        for query in queries:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                docs = rag.retrieve(query, role, k=k)
+                retrieval.append(time.perf_counter() - start)
+                context = [d[0] for d in docs]
+                prompt_tokens.append(count_tokens(rag.build_prompt(query, context)))
+                await rag.agenerate(query, context)
+                end_to_end.append(time.perf_counter() - start)
+    return {
+        "retrieval": summarize_latencies(retrieval),
+        "end_to_end": summarize_latencies(end_to_end),
+        "mean_prompt_tokens": round(sum(prompt_tokens) / len(prompt_tokens), 1),
+    }
+
+
+async def run(args) -> Dict:
+    _, url = start_server(build_fake_groq(args.base_ms / 1000, args.per_token_ms / 1000))
+    settings.GROQ_API_KEY = "benchmark"
+    settings.QUERY_CACHE_ENABLED = False
+
+    rag = RAGService()
+    rag.cache = None
+    rag.llm = GroqClient(api_key="benchmark", url=url)
+    reranker = CrossEncoderReranker(budget_ms=args.rerank_budget_ms)
+    reranker.warmup()
+
+    results = {}
+    rag.reranker, settings.CONTEXT_TOKEN_BUDGET, settings.CONTEXT_DEDUPE = None, 0, False
+    results["baseline"] = await run_pipeline(rag, args.k, args.repeat)
+    settings.CONTEXT_DEDUPE = True
+    results["dedupe"] = await run_pipeline(rag, args.k, args.repeat)
+    rag.reranker = reranker
+    results["rerank"] = await run_pipeline(rag, args.k, args.repeat)
+    settings.CONTEXT_TOKEN_BUDGET = args.budget
+    results["budget"] = await run_pipeline(rag, args.k, args.repeat)
+
+    base_tokens = results["baseline"]["mean_prompt_tokens"]
+    for name in ("dedupe", "rerank", "budget"):
+        results[name]["prompt_token_savings_pct"] = round(
+            100 * (1 - results[name]["mean_prompt_tokens"] / max(base_tokens, 1e-9)), 1
+        )
+    await rag.llm.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=600, help="CONTEXT_TOKEN_BUDGET for the budget pipeline")
+    parser.add_argument("--rerank-budget-ms", type=float, default=settings.RERANK_TIME_BUDGET_MS)
+    parser.add_argument("--base-ms", type=float, default=150.0, help="fake LLM fixed latency")
+    parser.add_argument("--per-token-ms", type=float, default=0.05, help="fake LLM latency per prompt token")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    emit({"benchmark": "rerank", "k": args.k, "budget": args.budget, **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
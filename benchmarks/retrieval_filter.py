@@ -0,0 +1,91 @@
+"""
+Compare RBAC retrieval strategies per role.
+
+  * overfetch - the legacy path: search k*3 unfiltered hits, then post-filter
+                (single layout only)
+  * where     - the serving path, RAGService._search: the allowed-department
+                set as a `$in` predicate (or only the allowed partitions with
+                CHROMA_LAYOUT=partitioned), fused with BM25 when
+                RETRIEVAL_MODE=hybrid
+
+Recall@k is measured against an exact (brute-force cosine) top-k over the
+chunks each role is allowed to see.
+
+Usage:
+    python -m benchmarks.retrieval_filter --k 5 --repeat 5 --output retrieval.json
+"""
+import argparse
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from benchmarks.common import Stopwatch, all_sample_queries, emit, summarize_latencies
+from app.core.roles import ACCESS_POLICY, ROLE_DEPARTMENTS
+from app.services.rag_service import RAGService
+
+
+def exact_top_k(rag: RAGService, query_vec: np.ndarray, role: str, k: int) -> Set[Tuple[str, str]]:
+    """Brute-force cosine top-k among the chunks visible to `role`, across every collection."""
+    access = ACCESS_POLICY.resolve(role)
+    embeddings, chunks = [], []
+    for collection in rag.index.collections.values():
+        data = collection.get(where=access.where_filter, include=["embeddings", "documents", "metadatas"])
+        embeddings.extend(data["embeddings"])
+        chunks.extend(((meta or {}).get("source", ""), text) for meta, text in zip(data["metadatas"], data["documents"]))
+    if not chunks:
+        return set()
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+    scores = matrix @ (query_vec / (np.linalg.norm(query_vec) + 1e-12))
+    top = np.argsort(-scores)[:k]
+    return {chunks[i] for i in top}
+
+
+def run_mode(rag: RAGService, mode: str, query: str, role: str, k: int) -> List[Tuple[str, dict]]:
+    if mode == "overfetch":
+        return rag.retrieve_overfetch(query, role, k)
+    return [(hit["text"], hit["metadata"]) for hit in rag._search(query, role, k)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    rag = RAGService()
+    queries = all_sample_queries()
+    query_vecs = {q: np.asarray(rag.embeddings.embed_query(q), dtype=np.float32) for q in queries}
+    # The legacy path goes through the LangChain view of the single collection
+    modes = ("overfetch", "where") if rag.vector_store is not None else ("where",)
+
+    results: Dict[str, Dict] = {}
+    for role in ROLE_DEPARTMENTS:
+        results[role] = {}
+        truths = {q: exact_top_k(rag, query_vecs[q], role, args.k) for q in queries}
+        for mode in modes:
+            latencies: List[float] = []
+            recalls: List[float] = []
+            short = 0
+            for q in queries:
+                for _ in range(args.repeat):
+                    with Stopwatch(latencies):
+                        hits = run_mode(rag, mode, q, role, args.k)
+                truth = truths[q]
+                got = {(meta.get("source", ""), text) for text, meta in hits}
+                if truth:
+                    recalls.append(len(got & truth) / len(truth))
+                if len(hits) < min(args.k, len(truth)):
+                    short += 1
+            results[role][mode] = {
+                "latency": summarize_latencies(latencies),
+                "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else None,
+                "short_result_queries": short,
+            }
+
+    emit({"benchmark": "retrieval_filter", "k": args.k, "queries": len(queries), "roles": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
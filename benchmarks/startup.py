@@ -0,0 +1,137 @@
+"""
+Measure API cold start and per-worker memory.
+
+Starts `uvicorn app.main:app` with the requested worker count and records
+  * time until /health answers (liveness)
+  * time until /ready answers 200 (models loaded; skipped if the tree has no /ready)
+  * RSS and PSS of every server process (PSS splits shared pages fairly,
+    so it shows the saving from EMBEDDING_BACKEND=remote or a preloaded model)
+
+Run it against an older checkout with --app-dir to get "before" numbers.
+
+--prefork starts `python -m app.server` instead, which loads the model once
+before forking the workers.
+
+Usage:
+    python -m benchmarks.startup --workers 2
+    python -m benchmarks.startup --workers 2 --env EMBEDDING_BACKEND=remote
+    python -m benchmarks.startup --workers 2 --prefork
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from benchmarks.common import emit, project_root
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float, ok_status=(200,)) -> Optional[float]:
+    """Seconds until `url` returns one of `ok_status`, or None on timeout / 404."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            resp = requests.get(url, timeout=1)
+            if resp.status_code in ok_status:
+                return time.perf_counter() - start
+            if resp.status_code == 404:
+                return None
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def process_tree(root_pid: int) -> List[int]:
+    """`root_pid` and all its descendants, read from /proc."""
+    children: Dict[int, List[int]] = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces; ppid is the 2nd field after ")"
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    result = {}
+    try:
+        for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+            key = line.split(":")[0]
+            if key in ("Rss", "Pss"):
+                result[key.lower() + "_kb"] = int(line.split()[1])
+    except OSError:
+        pass
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--app-dir", default=str(project_root), help="tree containing the app package")
+    parser.add_argument("--env", action="append", default=[], help="extra KEY=VALUE for the server")
+    parser.add_argument("--prefork", action="store_true", help="serve with app.server (model preloaded before fork)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, **dict(kv.split("=", 1) for kv in args.env))
+    if args.prefork:
+        cmd = [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--log-level", "warning"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--app-dir", args.app_dir, "--log-level", "warning"]
+    start = time.perf_counter()
+    server = subprocess.Popen(cmd, cwd=args.app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        health_s = wait_for(f"{base}/health", args.timeout)
+        ready_s = wait_for(f"{base}/ready", args.timeout)
+        total_ready_s = time.perf_counter() - start if ready_s is not None else None
+        processes = [{"pid": pid, **memory_kb(pid)} for pid in process_tree(server.pid)]
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    emit({
+        "benchmark": "startup",
+        "workers": args.workers,
+        "prefork": args.prefork,
+        "env": args.env,
+        "health_s": round(health_s, 3) if health_s is not None else None,
+        "ready_s": round(total_ready_s, 3) if total_ready_s is not None else None,
+        "processes": processes,
+        "total_rss_kb": sum(p.get("rss_kb", 0) for p in processes),
+        "total_pss_kb": sum(p.get("pss_kb", 0) for p in processes),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+End-to-end benchmark suite: ingest, retrieval per role, auth and full chat.
+
+Builds a synthetic corpus of --docs-per-department markdown documents under
+one directory per department in DEPARTMENT_DIRS (plus --duplicates top-level
+copies, as in resources/data), then in a throwaway workspace:
+
+  * ingest   - a full `scripts/ingest.py` run, then an incremental no-op run
+  * retrieve - `RAGService.retrieve` for every role in the access policy
+  * auth     - the `get_current_user` dependency for one token per role
+  * chat     - POST /api/v1/chat/query through FastAPI's TestClient, with
+               the LLM served by a local fake Groq server (--llm-ms latency)
+
+Each phase reports p50/p95/p99 latency, throughput and the process's peak
+RSS so far, as JSON. Other settings (RETRIEVAL_MODE, CHROMA_LAYOUT,
+RERANK_ENABLED, ...) come from the environment as usual, so the same run
+can be repeated before and after a change.
+
+--embeddings hash swaps the model for deterministic feature hashing, to
+measure everything except model inference (or where the model is not
+available).
+
+Usage:
+    python -m benchmarks.suite --docs-per-department 200 --output suite.json
+    python -m benchmarks.suite --embeddings hash --phases ingest retrieve
+"""
+import argparse
+import asyncio
+import logging
+import random
+import re
+import resource
+import subprocess
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.common import emit, project_root, summarize_latencies
+from benchmarks.llm_load import build_fake_groq, start_server
+from scripts import ingest
+from app.core.roles import ACCESS_POLICY, DEPARTMENT_DIRS
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+PHASES = ("ingest", "retrieve", "auth", "chat")
+
+# Topic words per department, mixed with shared filler so departments overlap
+VOCABULARY: Dict[str, List[str]] = {
+    "engineering": ["microservice", "kubernetes", "latency", "deployment", "gateway", "schema",
+                    "pipeline", "observability", "incident", "rollback", "cache", "throughput"],
+    "finance": ["revenue", "margin", "ebitda", "forecast", "invoice", "cashflow",
+                "budget", "audit", "liability", "depreciation", "vendor", "quarterly"],
+    "hr": ["leave", "payroll", "onboarding", "benefits", "appraisal", "attendance",
+           "recruitment", "grievance", "training", "compensation", "probation", "policy"],
+    "marketing": ["campaign", "acquisition", "engagement", "conversion", "brand", "funnel",
+                  "retention", "segment", "impressions", "influencer", "churn", "persona"],
+    "general": ["holiday", "conduct", "office", "travel", "security", "wellness",
+                "mission", "values", "handbook", "facilities", "parking", "cafeteria"],
+}
+FILLER = ("the team reviewed results for this period and agreed on next steps while "
+          "tracking key metrics across regions with clear owners and timelines").split()
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic signed feature hashing of words; costs microseconds instead of a model call."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            h = zlib.crc32(word.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 0x10000 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def build_corpus(root: Path, docs_per_department: int, paragraphs: int, duplicates: int, seed: int) -> int:
+    """Write the synthetic corpus under `root`; returns the number of files written."""
+    rng = random.Random(seed)
+    written = []
+    for department, directory in DEPARTMENT_DIRS.items():
+        words = VOCABULARY.get(department, FILLER)
+        (root / directory).mkdir(parents=True, exist_ok=True)
+        for i in range(docs_per_department):
+            lines = [f"# {department.title()} document {i}", ""]
+            for _ in range(paragraphs):
+                sentences = []
+                for _ in range(rng.randint(3, 6)):
+                    sentence = rng.sample(words, 3) + rng.sample(FILLER, rng.randint(5, 10))
+                    rng.shuffle(sentence)
+                    sentences.append(" ".join(sentence).capitalize() + f" (ref {department[:3].upper()}-{i}).")
+                lines += [" ".join(sentences), ""]
+            path = root / directory / f"{department}_{i:05d}.md"
+            path.write_text("\n".join(lines), encoding="utf-8")
+            written.append(path)
+    # Unfiled copies, which ingestion should skip as duplicates
+    for path in rng.sample(written, min(duplicates, len(written))):
+        (root / path.name).write_text(path.read_text(encoding="utf-8"), encoding="utf-8")
+    return len(written) + min(duplicates, len(written))
+
+
+def sample_queries(role: str, n: int, rng: random.Random) -> List[str]:
+    departments = sorted(ACCESS_POLICY.resolve(role).departments) or list(VOCABULARY)
+    queries = []
+    for _ in range(n):
+        words = VOCABULARY.get(rng.choice(departments), FILLER)
+        queries.append("What does the document say about " + " and ".join(rng.sample(words, 2)) + "?")
+    return queries
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def with_throughput(latencies: List[float], elapsed: float) -> Dict:
+    return {**summarize_latencies(latencies), "throughput_per_s": round(len(latencies) / max(elapsed, 1e-9), 2)}
+
+
+def run_ingest(args, workspace: Path, embeddings: Embeddings) -> Dict:
+    corpus = workspace / "corpus"
+    files = build_corpus(corpus, args.docs_per_department, args.paragraphs, args.duplicates, args.seed)
+    argv = ["--data-dir", str(corpus), "--manifest", str(workspace / "manifest.json"),
+            "--batch-size", str(args.batch_size)]
+    full = ingest.main(argv + ["--full"], embeddings=embeddings)
+    noop = ingest.main(argv, embeddings=embeddings)
+    return {
+        "files": files,
+        "duplicates_skipped": full["duplicates"],
+        "chunks": full["chunks"],
+        "seconds": round(full["total_seconds"], 3),
+        "embed_seconds": round(full["embed_seconds"], 3),
+        "chunks_per_s": round(full["chunks"] / max(full["total_seconds"], 1e-9), 1),
+        "noop_seconds": round(noop["total_seconds"], 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_retrieve(args, rag, queries: Dict[str, List[str]]) -> Dict:
+    per_role, everything = {}, []
+    started = time.perf_counter()
+    for role, role_queries in queries.items():
+        latencies = []
+        role_started = time.perf_counter()
+        for query in role_queries:
+            start = time.perf_counter()
+            rag.retrieve(query, role, k=args.k)
+            latencies.append(time.perf_counter() - start)
+        per_role[role] = with_throughput(latencies, time.perf_counter() - role_started)
+        everything += latencies
+    return {"overall": with_throughput(everything, time.perf_counter() - started),
+            "per_role": per_role, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_auth(args, tokens: Dict[str, str]) -> Dict:
+    from app.services.auth_service import get_current_user
+
+    async def measure() -> List[float]:
+        latencies = []
+        cycle = list(tokens.values())
+        for i in range(args.auth_iterations):
+            start = time.perf_counter()
+            await get_current_user(cycle[i % len(cycle)])
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    started = time.perf_counter()
+    latencies = asyncio.run(measure())
+    return {**with_throughput(latencies, time.perf_counter() - started), "peak_rss_mb": peak_rss_mb()}
+
+
+def run_chat(args, rag, tokens: Dict[str, str], queries: Dict[str, List[str]]) -> Dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services.resources import get_rag_service
+
+    app.dependency_overrides[get_rag_service] = lambda: rag
+    latencies, failures = [], 0
+    try:
+        with TestClient(app) as client:
+            started = time.perf_counter()
+            for role, role_queries in queries.items():
+                headers = {"Authorization": f"Bearer {tokens[role]}"}
+                for query in role_queries[:args.chat_queries]:
+                    start = time.perf_counter()
+                    resp = client.post(f"{settings.API_V1_STR}/chat/query", json={"message": query}, headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    failures += resp.status_code != 200
+            elapsed = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.pop(get_rag_service, None)
+    return {**with_throughput(latencies, elapsed), "failures": failures,
+            "llm_latency_ms": args.llm_ms, "peak_rss_mb": peak_rss_mb()}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args, workspace: Path) -> Dict:
+    # Everything the suite writes goes to the workspace, never to data/
+    settings.CHROMA_PERSIST_DIRECTORY = str(workspace / "chroma")
+    settings.LEXICAL_INDEX_PATH = str(workspace / "lexical.sqlite3")
+    settings.TABULAR_DB_PATH = str(workspace / "tables.sqlite3")
+    settings.INGEST_STAMP_PATH = str(workspace / "ingest.stamp")
+    settings.USER_STORE_BACKEND = "sqlite"
+    settings.USER_DB_PATH = str(workspace / "users.sqlite3")
+    settings.REVOCATION_DB_PATH = str(workspace / "revocations.sqlite3")
+    settings.WARMUP_ON_STARTUP = False
+    if "chat" in args.phases:
+        # Before the shared LLM client is created, so every answer goes to the stub
+        _, url = start_server(build_fake_groq(args.llm_ms / 1000, 0.0))
+        settings.GROQ_API_URL, settings.GROQ_API_KEY = url, "benchmark"
+
+    results: Dict[str, Dict] = {}
+    start = time.perf_counter()
+    if args.embeddings == "hash":
+        settings.EMBEDDING_MODEL_NAME = "benchmark-hashing-384"
+        embeddings: Embeddings = HashingEmbeddings()
+    else:
+        from app.services.embeddings import build_local_embeddings
+        embeddings = build_local_embeddings()
+        embeddings.embed_query("warm-up")
+    results["model_load"] = {"seconds": round(time.perf_counter() - start, 3), "peak_rss_mb": peak_rss_mb()}
+
+    if "ingest" in args.phases or not (workspace / "manifest.json").exists():
+        results["ingest"] = run_ingest(args, workspace, embeddings)
+
+    from app.services.auth_service import create_access_token
+    from app.services.rag_service import RAGService
+    from app.services.user_store import get_user_store
+
+    rng = random.Random(args.seed)
+    roles = sorted(ACCESS_POLICY.role_masks)
+    queries = {role: sample_queries(role, args.queries, rng) for role in roles}
+    # Password hashes are never checked: the suite mints tokens directly
+    get_user_store().upsert_many({"username": f"bench_{role}", "password_hash": "-", "role": role} for role in roles)
+    tokens = {role: create_access_token({"sub": f"bench_{role}", "role": role}) for role in roles}
+
+    rag = RAGService(embeddings=embeddings)
+    # Measure the uncached path; the answer cache would hide retrieval and LLM time
+    rag.cache = None
+    if "retrieve" in args.phases:
+        results["retrieve"] = run_retrieve(args, rag, queries)
+    if "auth" in args.phases:
+        results["auth"] = run_auth(args, tokens)
+    if "chat" in args.phases:
+        results["chat"] = run_chat(args, rag, tokens, queries)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES))
+    parser.add_argument("--docs-per-department", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=8, help="paragraphs per synthetic document")
+    parser.add_argument("--duplicates", type=int, default=20, help="top-level duplicate files")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=50, help="retrieval queries per role")
+    parser.add_argument("--chat-queries", type=int, default=10, help="chat queries per role")
+    parser.add_argument("--auth-iterations", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--llm-ms", type=float, default=50.0, help="fake LLM response latency")
+    parser.add_argument("--embeddings", choices=["model", "hash"], default="model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="keep the workspace here instead of a temporary directory")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "workdir")}
+    config.update(retrieval_mode=settings.RETRIEVAL_MODE, chroma_layout=settings.CHROMA_LAYOUT,
+                  rerank_enabled=settings.RERANK_ENABLED,
+                  embedding_model=settings.EMBEDDING_MODEL_NAME if args.embeddings == "model" else "hash")
+    if args.workdir:
+        Path(args.workdir).mkdir(parents=True, exist_ok=True)
+        results = run(args, Path(args.workdir))
+    else:
+        with tempfile.TemporaryDirectory(prefix="rag-bench-") as tmp:
+            results = run(args, Path(tmp))
+    emit({"benchmark": "suite", "git_revision": git_revision(), "config": config, **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
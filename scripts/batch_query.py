@@ -0,0 +1,137 @@
+"""
+Run a file of questions through POST /api/v1/chat/batch and write the answers as JSONL.
+
+    python scripts/batch_query.py questions.txt --username Tony --password password123 -o answers.jsonl
+
+Questions are read from a .txt file (one per line), a .csv file (the
+`--column` column, default "question") or a .json/.jsonl file (strings or
+objects with a "question" field). Large inputs are sent in chunks of
+`--chunk-size` questions; answers are written as the server streams them,
+in completion order, each line carrying the question's `index` in the input.
+"""
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, TextIO
+
+import requests
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def read_questions(path: str, column: str = "question") -> List[str]:
+    suffix = Path(path).suffix.lower()
+    with open(path, encoding="utf-8", newline="" if suffix == ".csv" else None) as f:
+        if suffix == ".csv":
+            questions = [row.get(column) or "" for row in csv.DictReader(f)]
+        elif suffix == ".json":
+            questions = [q if isinstance(q, str) else q.get("question", "") for q in json.load(f)]
+        elif suffix == ".jsonl":
+            records = (json.loads(line) for line in f if line.strip())
+            questions = [q if isinstance(q, str) else q.get("question", "") for q in records]
+        else:
+            questions = f.read().splitlines()
+    return [q.strip() for q in questions if q and q.strip()]
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    resp = requests.post(f"{base_url}/api/v1/auth/login", json={"username": username, "password": password},
+                         timeout=30)
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+def stream_batch(base_url: str, token: str, questions: List[str], k: int, timeout: float) -> Iterator[dict]:
+    """POST one batch and yield each NDJSON result line as it arrives."""
+    with requests.post(
+        f"{base_url}/api/v1/chat/batch",
+        headers={"Authorization": f"Bearer {token}", "Accept": "application/x-ndjson"},
+        json={"questions": questions, "k": k},
+        stream=True,
+        timeout=timeout,
+    ) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def run(base_url: str, token: str, questions: List[str], out: TextIO, k: int = 5,
+        chunk_size: int = 500, timeout: float = 600.0) -> int:
+    """Send `questions` in chunks, writing every result to `out`; returns the number of failed questions."""
+    failed = done = 0
+    start = time.perf_counter()
+    for offset in range(0, len(questions), chunk_size):
+        chunk = questions[offset:offset + chunk_size]
+        answered = set()
+        for result in stream_batch(base_url, token, chunk, k, timeout):
+            if "index" not in result:
+                # The whole batch failed server-side; the rest of the chunk is lost
+                logging.error(f"Batch starting at question {offset} failed: {result.get('error')}")
+                break
+            result["index"] += offset
+            answered.add(result["index"])
+            if "error" in result:
+                failed += 1
+                logging.warning(f"Question {result['index']} failed: {result['error']}")
+            out.write(json.dumps(result) + "\n")
+            done += 1
+            if done % 50 == 0:
+                logging.info(f"{done}/{len(questions)} answered ({done / (time.perf_counter() - start):.1f}/s)")
+        missing = len(chunk) - len(answered)
+        if missing:
+            failed += missing
+            logging.error(f"{missing} question(s) in the batch starting at {offset} got no answer")
+        out.flush()
+    logging.info(f"{done}/{len(questions)} answered in {time.perf_counter() - start:.1f}s, {failed} failed")
+    return failed
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Answer a file of questions via the batch chat endpoint.")
+    parser.add_argument("questions", help=".txt (one per line), .csv, .json or .jsonl file of questions")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--token", help="bearer token; otherwise log in with --username/--password")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--column", default="question", help="question column for CSV input")
+    parser.add_argument("-k", type=int, default=5, help="chunks retrieved per question")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                        help="questions per request (at most the server's BATCH_MAX_QUESTIONS)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="read timeout per request in seconds")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = parse_args(argv)
+    base_url = args.url.rstrip("/")
+    if args.token:
+        token = args.token
+    elif args.username and args.password:
+        token = login(base_url, args.username, args.password)
+    else:
+        logging.error("Pass --token or --username and --password")
+        return 2
+
+    questions = read_questions(args.questions, args.column)
+    if not questions:
+        logging.error(f"No questions found in {args.questions}")
+        return 1
+    logging.info(f"Sending {len(questions)} question(s) in batches of {args.chunk_size}")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        failed = run(base_url, token, questions, out, args.k, args.chunk_size, args.timeout)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import codecs
+import hashlib
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, Union
+
+# Separators tried in order when looking for a natural place to end a chunk
+DEFAULT_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+# Bytes read from disk per step; memory per file stays around chunk_size + READ_SIZE
+READ_SIZE = 1 << 20
+
+
+def iter_text_blocks(path: Union[str, Path], read_size: int = READ_SIZE) -> Iterator[str]:
+    """Yield decoded text from `path` in blocks, never holding the whole file in memory."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        while True:
+            raw = f.read(read_size)
+            if not raw:
+                break
+            text = decoder.decode(raw)
+            if text:
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def hash_file(path: Union[str, Path], read_size: int = READ_SIZE) -> str:
+    """SHA256 of a file's bytes, computed incrementally."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for raw in iter(lambda: f.read(read_size), b""):
+            digest.update(raw)
+    return digest.hexdigest()
+
+
+def _find_cut(window: str, min_length: int, separators: Sequence[str]) -> int:
+    """Index to end a chunk at: after the last separator past `min_length`, else hard cut."""
+    for sep in separators:
+        idx = window.rfind(sep, min_length)
+        if idx != -1:
+            return idx + len(sep)
+    return len(window)
+
+
+def iter_chunks(
+    blocks: Iterable[str],
+    chunk_size: int = 1500,
+    chunk_overlap: int = 300,
+    separators: Sequence[str] = DEFAULT_SEPARATORS,
+) -> Iterator[str]:
+    """
+    Split a stream of text blocks into overlapping chunks of at most
+    `chunk_size` characters, preferring to break on `separators`.
+
+    Only the unconsumed tail of the text is buffered, so arbitrarily large
+    inputs are chunked with bounded memory. Consecutive chunks share about
+    `chunk_overlap` characters, starting on a whitespace boundary.
+    """
+    if chunk_overlap >= chunk_size // 2:
+        raise ValueError("chunk_overlap must be smaller than half of chunk_size")
+    buffer = ""
+    # Start of the unconsumed text in `buffer`; compacted once per block, not per chunk
+    pos = 0
+    # Characters at `pos` already emitted as the previous chunk's tail
+    carried = 0
+
+    def drain(final: bool) -> Iterator[str]:
+        nonlocal pos, carried
+        while len(buffer) - pos > chunk_size:
+            end = pos + chunk_size
+            cut = pos + _find_cut(buffer[pos:end], chunk_size // 2, separators)
+            chunk = buffer[pos:cut].strip()
+            if chunk:
+                yield chunk
+            start = cut - chunk_overlap
+            # Begin the overlap on a word boundary so chunks don't open mid-word
+            space = buffer.find(" ", start, cut)
+            if space != -1:
+                start = space + 1
+            pos = start
+            carried = cut - start
+        if final and buffer[pos + carried:].strip():
+            chunk = buffer[pos:].strip()
+            if chunk:
+                yield chunk
+
+    for block in blocks:
+        buffer = buffer[pos:] + block
+        pos = 0
+        yield from drain(final=False)
+    yield from drain(final=True)
@@ -0,0 +1,193 @@
+"""
+Export the embedding model to ONNX for EMBEDDING_BACKEND=onnx.
+
+    python scripts/export_onnx.py                     # fp32 + int8 into EMBEDDING_ONNX_PATH
+    python scripts/export_onnx.py --check 500         # compare with vectors stored in Chroma
+
+Writes `model.onnx`, `model.int8.onnx` (dynamic int8 quantization of the
+weights), `tokenizer.json` and `export.json`. Every variant is compared
+with the PyTorch sentence-transformers model on sample texts from
+resources/data; the minimum and mean cosine similarity are recorded in
+export.json, and the backend refuses a variant below EMBEDDING_ONNX_MIN_COSINE.
+
+`--check N` re-embeds N chunks already stored in the vector store with the
+ONNX model and compares them with their stored vectors, to confirm an
+existing collection can be queried with it.
+"""
+import argparse
+import inspect
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Adding the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.core.settings import get_settings
+from app.services.embeddings import ONNX_EXPORT_INFO, ONNX_VARIANTS, OnnxEmbeddings
+
+settings = get_settings()
+
+DATA_DIR = project_root / "resources" / "data"
+
+
+def sample_texts(limit: int) -> List[str]:
+    """Paragraphs of the bundled documents, plus short question-like texts."""
+    texts = [
+        "What is the leave policy?", "quarterly revenue growth", "How does the API gateway authenticate requests?",
+        "marketing campaign ROI", "employee attendance percentage", "code of conduct",
+    ]
+    for path in sorted(DATA_DIR.rglob("*.md")):
+        for paragraph in path.read_text(encoding="utf-8", errors="ignore").split("\n\n"):
+            if len(texts) >= limit:
+                return texts
+            if paragraph.strip():
+                texts.append(paragraph.strip())
+    return texts
+
+
+def cosine_stats(a: np.ndarray, b: np.ndarray) -> Dict[str, float]:
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    cosines = (a * b).sum(axis=1)
+    return {"min_cosine": round(float(cosines.min()), 6), "mean_cosine": round(float(cosines.mean()), 6)}
+
+
+def export(model_name: str, output: Path, opset: int, quantize: bool, samples: int) -> Dict:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer, pooling = st[0], st[1]
+    # sentence-transformers 6 names the mode `pooling_mode`; older releases only have the getter
+    mode = getattr(pooling, "pooling_mode", None) or pooling.get_pooling_mode_str()
+    if mode != "mean":
+        raise ValueError(f"{model_name} uses {mode!r} pooling; only mean pooling is supported")
+    output.mkdir(parents=True, exist_ok=True)
+    tokenizer = transformer.tokenizer
+    tokenizer.save_pretrained(str(output))
+    if not (output / "tokenizer.json").exists():
+        raise ValueError(f"{model_name} has no fast tokenizer (tokenizer.json); it cannot be exported")
+
+    model = transformer.auto_model.eval()
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids")
+                   if name in tokenizer.model_input_names]
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    example = tokenizer(["an example sentence", "another"], padding=True, return_tensors="pt")
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles these models as-is
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    start = time.perf_counter()
+    torch.onnx.export(
+        LastHiddenState(model),
+        tuple(example[name] for name in input_names),
+        str(output / ONNX_VARIANTS["fp32"]),
+        input_names=input_names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names},
+                      "last_hidden_state": {0: "batch", 1: "sequence"}},
+        opset_version=opset,
+        **legacy,
+    )
+    logging.info(f"Exported {model_name} to {output / ONNX_VARIANTS['fp32']} in {time.perf_counter() - start:.1f}s")
+
+    variants = ["fp32"]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(output / ONNX_VARIANTS["fp32"]), str(output / ONNX_VARIANTS["int8"]),
+                         weight_type=QuantType.QInt8)
+        variants.append("int8")
+        logging.info(f"Quantized to {output / ONNX_VARIANTS['int8']}")
+    elif (output / ONNX_VARIANTS["int8"]).exists():
+        (output / ONNX_VARIANTS["int8"]).unlink()
+
+    info = {
+        "model": model_name,
+        "max_seq_length": st.max_seq_length,
+        "pad_token": tokenizer.pad_token,
+        "opset": opset,
+        "variants": {},
+    }
+    (output / ONNX_EXPORT_INFO).write_text(json.dumps(info, indent=2) + "\n", encoding="utf-8")
+
+    texts = sample_texts(samples)
+    reference = st.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+    for variant in variants:
+        onnx = OnnxEmbeddings(str(output), quantized=variant == "int8", normalize=True, verify=False)
+        stats = cosine_stats(reference, onnx.encode(texts))
+        stats["size_mb"] = round((output / ONNX_VARIANTS[variant]).stat().st_size / 1e6, 1)
+        info["variants"][variant] = stats
+        ok = stats["min_cosine"] >= settings.EMBEDDING_ONNX_MIN_COSINE
+        logging.info(f"{variant}: min cosine {stats['min_cosine']:.4f}, mean {stats['mean_cosine']:.4f} "
+                     f"over {len(texts)} texts, {stats['size_mb']} MB"
+                     + ("" if ok else f" -- below EMBEDDING_ONNX_MIN_COSINE={settings.EMBEDDING_ONNX_MIN_COSINE}"))
+    (output / ONNX_EXPORT_INFO).write_text(json.dumps(info, indent=2) + "\n", encoding="utf-8")
+    return info
+
+
+def check_collection(path: Path, quantized: bool, limit: int) -> Dict[str, float]:
+    """Cosine between stored chunk vectors and the same chunks re-embedded with the ONNX model."""
+    import chromadb
+
+    from app.services.vector_index import VectorIndex
+
+    index = VectorIndex(chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIRECTORY))
+    documents, stored = [], []
+    for collection in index.collections.values():
+        result = collection.get(limit=max(1, limit - len(documents)), include=["documents", "embeddings"])
+        documents.extend(result["documents"])
+        stored.extend(result["embeddings"])
+        if len(documents) >= limit:
+            break
+    if not documents:
+        raise ValueError("The vector store is empty; run scripts/ingest.py first")
+    onnx = OnnxEmbeddings(str(path), quantized=quantized)
+    stats = cosine_stats(np.asarray(stored, dtype=np.float32), onnx.encode(documents))
+    stats["chunks"] = len(documents)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX (fp32 and int8).")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output", default=settings.EMBEDDING_ONNX_PATH)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 model")
+    parser.add_argument("--samples", type=int, default=256, help="texts used to compare with the PyTorch model")
+    parser.add_argument("--check", type=int, metavar="N",
+                        help="instead of exporting, compare N stored chunk vectors with the existing export")
+    parser.add_argument("--quantized", action="store_true", help="with --check: check the int8 model")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    if args.check:
+        stats = check_collection(output, args.quantized, args.check)
+        ok = stats["min_cosine"] >= settings.EMBEDDING_ONNX_MIN_COSINE
+        logging.info(f"{'int8' if args.quantized else 'fp32'} vs stored vectors: min cosine {stats['min_cosine']:.4f}, "
+                     f"mean {stats['mean_cosine']:.4f} over {stats['chunks']} chunks -> {'OK' if ok else 'MISMATCH'}")
+        return 0 if ok else 1
+
+    info = export(args.model, output, args.opset, not args.no_quantize, args.samples)
+    failed = [v for v, stats in info["variants"].items() if stats["min_cosine"] < settings.EMBEDDING_ONNX_MIN_COSINE]
+    return 1 if len(failed) == len(info["variants"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Adding the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.core.roles import ACCESS_POLICY
+from app.services.auth_service import revoke_user_tokens
+from app.services.user_store import UserStore, create_user_store
+
+
+def hash_batch(rows: List[Dict], rounds: int) -> List[Dict]:
+    """Replace plaintext `password` with a bcrypt `password_hash`. Runs in worker processes."""
+    from passlib.hash import bcrypt
+
+    hasher = bcrypt.using(rounds=rounds)
+    out = []
+    for row in rows:
+        if not row.get("password_hash"):
+            row = {**row, "password_hash": hasher.hash(row["password"])}
+        out.append({"username": row["username"], "password_hash": row["password_hash"], "role": row["role"]})
+    return out
+
+
+def iter_csv_users(path: str, username_column: str, role_column: str) -> Iterator[Dict]:
+    """Stream users from a CSV with a username, a role and a `password` or `password_hash` column."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, record in enumerate(csv.DictReader(f), start=2):
+            username = (record.get(username_column) or "").strip()
+            role = (record.get(role_column) or "").strip().lower()
+            password_hash = (record.get("password_hash") or "").strip()
+            password = record.get("password") or ""
+            if not username or not (password_hash or password):
+                logging.warning(f"{path}:{line_no}: missing username or password, skipped")
+                continue
+            yield {"username": username, "role": role, "password": password, "password_hash": password_hash}
+
+
+def iter_json_users(path: str) -> Iterator[Dict]:
+    """Users from a JsonUserStore file (already hashed), e.g. to migrate to SQLite."""
+    with open(path, "r", encoding="utf-8") as f:
+        for username, user in json.load(f).items():
+            yield {"username": username, "role": user["role"], "password_hash": user["password_hash"]}
+
+
+def valid_roles(users: Iterable[Dict]) -> Iterator[Dict]:
+    """Drop users with roles the access policy doesn't define; multiple roles are comma-separated."""
+    for user in users:
+        roles = ACCESS_POLICY.parse_roles(user["role"])
+        unknown = [r for r in roles if not ACCESS_POLICY.is_known_role(r)]
+        if not roles or unknown:
+            logging.warning(f"Unknown role(s) {user['role']!r} for {user['username']!r}, skipped")
+            continue
+        yield {**user, "role": ",".join(sorted(roles))}
+
+
+def upsert_batch(store: UserStore, users: List[Dict]) -> int:
+    """
+    Upsert `users`, revoking the tokens already issued to any whose role
+    changed, so the old role is not honoured until those tokens expire.
+    """
+    changed = []
+    for user in users:
+        existing = store.get(user["username"])
+        if existing and ACCESS_POLICY.parse_roles(existing["role"]) != ACCESS_POLICY.parse_roles(user["role"]):
+            changed.append(user["username"])
+    imported = store.upsert_many(users)
+    for username in changed:
+        revoke_user_tokens(username)
+    if changed:
+        logging.info(f"Role changed for {len(changed)} user(s); revoked their existing tokens")
+    return imported
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk-import users into the user store.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV with username, role and password or password_hash columns")
+    source.add_argument("--from-json", help="JSON user file to copy (hashes are kept as-is)")
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "json"],
+                        help="destination user store (default: sqlite)")
+    parser.add_argument("--username-column", default="username")
+    parser.add_argument("--role-column", default="role")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to bcrypt plaintext passwords (default: 1)")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor (default: 12)")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="users per hashing task and per upsert transaction (default: 500)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    store = create_user_store(args.backend)
+
+    if args.csv:
+        users = iter_csv_users(args.csv, args.username_column, args.role_column)
+    else:
+        users = iter_json_users(args.from_json)
+    batches = batched(valid_roles(users), args.batch_size)
+
+    imported = 0
+    # Each batch is written in its own short transaction, so logins (which only
+    # read, and see committed rows under WAL) are never blocked for long
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(hash_batch, batch, args.rounds))
+                # Bound in-flight work so a huge CSV isn't read into memory at once
+                if len(pending) >= args.workers * 2:
+                    imported += upsert_batch(store, pending.popleft().result())
+            while pending:
+                imported += upsert_batch(store, pending.popleft().result())
+    else:
+        for batch in batches:
+            imported += upsert_batch(store, hash_batch(batch, args.rounds))
+
+    elapsed = time.perf_counter() - started
+    logging.info(
+        f"Imported {imported} user(s) in {elapsed:.2f}s ({imported / max(elapsed, 1e-9):.1f} users/sec); "
+        f"store now holds {store.count()} user(s)"
+    )
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
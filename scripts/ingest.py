@@ -1,12 +1,32 @@
+import argparse
 import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
 from app.core.settings import get_settings
 from app.core.roles import DEPARTMENT_DIRS
+from app.services.cache import touch_ingest_stamp
+from app.services.lexical_index import LexicalIndex
+from app.services.tabular_service import get_tabular_service
+from app.services.vector_index import VectorIndex, collection_names
+from app.services.embeddings import (
+    MODEL_KEY,
+    EmbeddingConfigMismatch,
+    build_inprocess_embeddings,
+    check_collection_config,
+    embedding_fingerprint,
+)
+from scripts.chunker import hash_file, iter_chunks, iter_text_blocks
+from scripts.manifest import IngestManifest
+from scripts.tabular import CSV_LOAD_ERRORS, load_csv
 import hashlib
 import chromadb
 import logging
@@ -20,159 +40,519 @@ sys.path.append(str(project_root))
 
 settings = get_settings()
 
-def load_documents() -> List[Dict]:
-    """Load and process documents from the resources/data directory."""
-    documents = []
-    base_path = project_root / "resources" / "data"
+def get_department_from_filename(filename: str) -> str:
+    """Department mapping based on filename patterns."""
+    filename_lower = filename.lower()
+    if "engineering" in filename_lower:
+        return "engineering"
+    elif "financial" in filename_lower or "finance" in filename_lower:
+        return "finance"
+    elif "hr" in filename_lower or "employee" in filename_lower:
+        return "hr"
+    elif "marketing" in filename_lower or "market" in filename_lower:
+        return "marketing"
+    else:
+        return "general"
+
+# Subdirectory of resources/data -> department, e.g. "finance" -> "finance"
+DIR_DEPARTMENTS: Dict[str, str] = {directory: department for department, directory in DEPARTMENT_DIRS.items()}
+DOCUMENT_SUFFIXES = {".txt", ".md", ".csv"}
+
+
+def iter_document_paths(base_path: Path) -> Iterator[Tuple[os.DirEntry, str]]:
+    """
+    Walk `base_path` recursively with scandir, yielding (entry, source) for
+    each document, where source is the POSIX path relative to `base_path`.
+    Hidden files and directories are skipped.
+    """
+    stack = [(str(base_path), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, prefix + entry.name + "/"))
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in DOCUMENT_SUFFIXES:
+                        yield entry, prefix + entry.name
+        except OSError as e:
+            logging.error(f"Cannot list {directory}: {e}")
+
+
+def discover_files(base_path: Optional[Path] = None) -> List[Dict]:
+    """
+    List candidate documents under resources/data, recursively, with their
+    metadata and stat info, without reading them. A file's department is the
+    DEPARTMENT_DIRS directory it sits under; files elsewhere fall back to
+    filename patterns.
+    """
+    entries = []
+    base_path = base_path or project_root / "resources" / "data"
     logging.info(f"Looking for documents in: {base_path}")
-    
-    # Department mapping based on filename patterns
-    def get_department_from_filename(filename: str) -> str:
-        filename_lower = filename.lower()
-        if "engineering" in filename_lower:
-            return "engineering"
-        elif "financial" in filename_lower or "finance" in filename_lower:
-            return "finance"
-        elif "hr" in filename_lower or "employee" in filename_lower:
-            return "hr"
-        elif "marketing" in filename_lower or "market" in filename_lower:
-            return "marketing"
-        else:
-            return "general"
-    
-    # Look for both .txt and .md files directly in the data directory
-    for file_path in base_path.glob("*.*"):
-        if file_path.suffix.lower() in ['.txt', '.md']:
-            logging.info(f"Found file: {file_path}")
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    filename = file_path.name
-                    department = get_department_from_filename(filename)
-                    documents.append({
-                        "content": content,
-                        "metadata": {
-                            "source": str(file_path.relative_to(base_path)),
-                            "department": department
-                        }
-                    })
-                logging.info(f"Successfully loaded {file_path} (department: {department})")
-            except Exception as e:
-                logging.error(f"Error loading {file_path}: {str(e)}")
-    
-    logging.info(f"Total documents loaded: {len(documents)}")
-    return documents
+
+    for dir_entry, source in iter_document_paths(base_path):
+        top, sep, _ = source.partition("/")
+        department = DIR_DEPARTMENTS.get(top) if sep else None
+        try:
+            stat = dir_entry.stat()
+        except OSError as e:
+            logging.error(f"Error loading {dir_entry.path}: {str(e)}")
+            continue
+        entries.append({
+            "path": Path(dir_entry.path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            # Files filed under a department directory win over guessed copies
+            "in_department_dir": department is not None,
+            "metadata": {
+                "source": source,
+                "department": department or get_department_from_filename(dir_entry.name),
+            }
+        })
+    return entries
+
+def read_document(entry: Dict) -> Dict:
+    """Hash a discovered file's content (streamed; the text itself is read at chunking time)."""
+    return {**entry, "file_hash": hash_file(entry["path"])}
 
 def chunk_hash(text, metadata):
     """Generate a SHA256 hash for a chunk based on its text and metadata."""
     hash_input = text + str(metadata)
     return hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
 
-def main():
-    # Load documents
-    documents = load_documents()
-    logging.info(f"Total documents found: {len(documents)}")
-    for doc in documents:
-        logging.info(f"Source: {doc['metadata']['source']}")
-
-    # Process all documents (no filter)
-    logging.info(f"Processing {len(documents)} document(s)")
-    
-    # Initialize embeddings and vector store
-    try:
-        logging.info("Initializing HuggingFace embeddings...")
-        embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-        logging.info("HuggingFace embeddings initialized successfully.")
-    except Exception as e:
-        logging.error(f"Error initializing HuggingFace embeddings: {e}")
-        raise
+# Chunking parameters
+CHUNK_SIZE = 1500  # Increased from 1000 for more context
+CHUNK_OVERLAP = 300  # Increased from 200 for better context continuity
+
+# Files larger than this are streamed in the main process instead of being
+# chunked whole inside a pool worker
+STREAM_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+
+def chunk_document(doc: Dict) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    Lazily split one document into (id, text, metadata) triples, reading the
+    file incrementally. IDs are content hashes, so an unchanged chunk keeps
+    its ID across runs and edits only touch the chunks that actually changed.
+    """
+    seen = set()
+    if is_tabular(doc):
+        # Rows go to the tabular store; only their summaries are embedded
+        meta = doc["metadata"]
+        chunks = load_csv(doc["path"], meta["source"], meta["department"], get_tabular_service())
+    else:
+        chunks = iter_chunks(iter_text_blocks(doc["path"]), CHUNK_SIZE, CHUNK_OVERLAP)
+    for chunk in chunks:
+        meta = doc["metadata"].copy()
+        chunk_id = chunk_hash(chunk, meta)
+        if chunk_id not in seen:
+            seen.add(chunk_id)
+            yield chunk_id, chunk, meta
+
+
+def is_tabular(doc: Dict) -> bool:
+    return doc["path"].suffix.lower() == ".csv"
+
+
+def _chunk_document_eager(doc: Dict) -> List[Tuple[str, str, Dict]]:
+    # Pool workers must return picklable results
+    return list(chunk_document(doc))
+
+
+def iter_chunked_documents(documents: List[Dict], workers: int) -> Iterator[Tuple[Dict, Iterable[Tuple[str, str, Dict]]]]:
+    """
+    Yield (document, chunks) pairs. Small files are chunked in a process pool
+    with a bounded look-ahead window; large files are streamed lazily here so
+    memory stays bounded regardless of file size. CSVs are always loaded
+    here, since loading writes to the tabular store.
+    """
+    small = [d for d in documents if d["size"] <= STREAM_THRESHOLD_BYTES and not is_tabular(d)]
+    large = [d for d in documents if d["size"] > STREAM_THRESHOLD_BYTES or is_tabular(d)]
+    if workers > 1 and len(small) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            window = deque()
+            docs = iter(small)
+            for doc in islice(docs, workers * 2):
+                window.append((doc, pool.submit(_chunk_document_eager, doc)))
+            while window:
+                doc, future = window.popleft()
+                next_doc = next(docs, None)
+                if next_doc is not None:
+                    window.append((next_doc, pool.submit(_chunk_document_eager, next_doc)))
+                yield doc, future.result()
+    else:
+        for doc in small:
+            yield doc, chunk_document(doc)
+    for doc in large:
+        yield doc, chunk_document(doc)
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class ChunkEmbedder:
+    """
+    Batch embedder over `HuggingFaceEmbeddings`. With more than one worker,
+    sentence-transformers' multi-process pool spreads encoding over CPU cores.
+    Other embeddings (the ONNX backend uses EMBEDDING_ONNX_THREADS) run in-process.
+    """
+
+    def __init__(self, embeddings: Embeddings, workers: int = 1):
+        self.embeddings = embeddings
+        self.pool = None
+        if workers > 1 and not isinstance(embeddings, HuggingFaceEmbeddings):
+            logging.info(f"--workers {workers} applies to the PyTorch backend only; encoding in-process")
+        elif workers > 1:
+            self.pool = embeddings._client.start_multi_process_pool(target_devices=["cpu"] * workers)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if self.pool is None:
+            return self.embeddings.embed_documents(texts)
+        vectors = self.embeddings._client.encode_multi_process(texts, self.pool)
+        if self.embeddings.encode_kwargs.get("normalize_embeddings"):
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.tolist()
+
+    def close(self):
+        if self.pool is not None:
+            self.embeddings._client.stop_multi_process_pool(self.pool)
+            self.pool = None
+
+
+def embed_and_store(index: VectorIndex, embedder: ChunkEmbedder, chunks: Iterable[Tuple[str, str, Dict]],
+                    batch_size: int, lexical: Optional[LexicalIndex] = None) -> Dict[str, float]:
+    """
+    Embed chunks in batches and upsert each batch in a single Chroma call
+    (one per department partition in the partitioned layout), plus the
+    lexical index when given.
+    Writes run on a background thread so SQLite I/O overlaps the next batch's encoding.
+    """
+    embed_seconds = 0.0
+    written = 0
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        pending = None
+        for batch in batched(chunks, batch_size):
+            ids = [c[0] for c in batch]
+            texts = [c[1] for c in batch]
+            metas = [c[2] for c in batch]
+            start = time.perf_counter()
+            vectors = embedder.embed(texts)
+            embed_seconds += time.perf_counter() - start
+            if pending is not None:
+                written += pending.result()
+            pending = writer.submit(_store, index, lexical, ids, texts, metas, vectors)
+            logging.info(f"Embedded batch of {len(batch)} chunks ({written + len(batch)} so far)")
+        if pending is not None:
+            written += pending.result()
+    return {"written": written, "embed_seconds": embed_seconds}
+
+
+def _store(index: VectorIndex, lexical: Optional[LexicalIndex], ids, texts, metas, vectors) -> int:
+    index.upsert(ids, texts, metas, vectors)
+    if lexical is not None:
+        lexical.upsert(ids, texts, metas)
+    return len(ids)
+
+
+def delete_chunks(index: VectorIndex, ids_by_department: Dict[str, List[str]], batch_size: int,
+                  lexical: Optional[LexicalIndex] = None) -> int:
+    deleted = 0
+    for department, ids in ids_by_department.items():
+        for batch in batched(ids, batch_size):
+            index.delete(batch, department)
+            if lexical is not None:
+                lexical.delete(batch)
+        deleted += len(ids)
+    return deleted
+
+
+def backfill_lexical(index: VectorIndex, lexical: LexicalIndex, batch_size: int) -> int:
+    """Copy already-embedded chunks into an empty lexical index (no re-embedding needed)."""
+    copied = 0
+    for collection in index.collections.values():
+        offset = 0
+        while True:
+            page = collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+            if not page["ids"]:
+                break
+            lexical.upsert(page["ids"], page["documents"], page["metadatas"])
+            copied += len(page["ids"])
+            offset += len(page["ids"])
+    return copied
+
+
+def hash_documents(entries: List[Dict], manifest: IngestManifest, threads: int) -> Tuple[List[Dict], List[str]]:
+    """
+    Attach each entry's content hash. Files whose size and mtime match the
+    manifest reuse the recorded hash and are marked `unchanged`; the rest are
+    read and hashed in a thread pool (hashlib releases the GIL on large
+    reads, so this overlaps I/O across files).
+
+    Returns (hashed documents, sources that could not be read).
+    """
+    docs, to_read = [], []
+    for entry in entries:
+        source = entry["metadata"]["source"]
+        if manifest.is_unchanged(source, entry["size"], entry["mtime_ns"]):
+            docs.append({**entry, "file_hash": manifest.get(source)["file_hash"], "unchanged": True})
+        else:
+            to_read.append(entry)
+
+    failed = []
+
+    def read(entry: Dict) -> Optional[Dict]:
+        try:
+            return read_document(entry)
+        except OSError as e:
+            logging.error(f"Error loading {entry['path']}: {str(e)}")
+            failed.append(entry["metadata"]["source"])
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        docs.extend(doc for doc in pool.map(read, to_read) if doc is not None)
+    return docs, failed
+
+
+def dedupe_documents(docs: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Keep one document per content hash, preferring the copy filed under a
+    department directory, then the first source path. Returns (kept, duplicates).
+    """
+    def preference(doc: Dict) -> Tuple[bool, str]:
+        return not doc["in_department_dir"], doc["metadata"]["source"]
+
+    best: Dict[str, Dict] = {}
+    for doc in docs:
+        current = best.get(doc["file_hash"])
+        if current is None or preference(doc) < preference(current):
+            best[doc["file_hash"]] = doc
+    kept_ids = {id(doc) for doc in best.values()}
+    kept = [doc for doc in docs if id(doc) in kept_ids]
+    duplicates = [doc for doc in docs if id(doc) not in kept_ids]
+    return kept, duplicates
+
+
+def plan_changes(docs: List[Dict], manifest: IngestManifest,
+                 keep: Iterable[str] = ()) -> Tuple[List[Dict], List[Dict], List[str]]:
+    """
+    Compare hashed, deduplicated documents with the manifest. Sources in
+    `keep` (e.g. files that could not be read this run) are never removed.
+
+    Returns (changed documents, unchanged documents whose stat info moved but
+    whose content hash did not, sources that disappeared or became duplicates).
+    """
+    changed, touched = [], []
+    for doc in docs:
+        if doc.get("unchanged"):
+            continue
+        previous = manifest.get(doc["metadata"]["source"])
+        if (previous and previous["file_hash"] == doc["file_hash"]
+                and previous["department"] == doc["metadata"]["department"]):
+            touched.append(doc)
+        else:
+            changed.append(doc)
+    seen = {doc["metadata"]["source"] for doc in docs} | set(keep)
+    removed = [source for source in manifest.files if source not in seen]
+    return changed, touched, removed
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest documents into the Chroma vector store.")
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="chunks per embed_documents / upsert call (default: 64)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="CPU processes for chunking and embedding (default: 1)")
+    parser.add_argument("--embedding-backend", choices=["local", "onnx"],
+                        default="onnx" if settings.EMBEDDING_BACKEND == "onnx" else "local",
+                        help="run the PyTorch model or its ONNX export (scripts/export_onnx.py)")
+    parser.add_argument("--read-threads", type=int, default=8,
+                        help="threads for reading and hashing discovered files (default: 8)")
+    parser.add_argument("--full", action="store_true",
+                        help="drop the collection and re-embed everything instead of an incremental run")
+    parser.add_argument("--data-dir", default=str(project_root / "resources" / "data"),
+                        help="document root; subdirectories named in DEPARTMENT_DIRS set the department")
+    parser.add_argument("--manifest", default=settings.INGEST_MANIFEST_PATH,
+                        help=f"ingest manifest path (default: {settings.INGEST_MANIFEST_PATH})")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None, embeddings: Optional[Embeddings] = None) -> Dict[str, float]:
+    """
+    Run an ingest. `embeddings` replaces the configured local model (used by
+    the benchmark suite). Returns the run's counts and timings.
+    """
+    args = parse_args(argv)
+    started = time.perf_counter()
 
     try:
         logging.info("Initializing Chroma vector store...")
-        # Create a new collection
         client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIRECTORY)
-        collection = client.get_or_create_collection(
-            name="rbac",
-            metadata={"hnsw:space": "cosine"}
-        )
+        manifest = IngestManifest.load(args.manifest)
+        lexical = LexicalIndex(settings.LEXICAL_INDEX_PATH)
+        # Without a manifest (or after a layout switch) we cannot tell which
+        # stored chunks are stale, so rebuild
+        rebuilt = args.full or manifest.is_empty() or manifest.layout != settings.CHROMA_LAYOUT
+        if rebuilt:
+            logging.info(f"Full rebuild: dropping existing collection(s) for the {settings.CHROMA_LAYOUT!r} layout")
+            for name in collection_names().values():
+                try:
+                    client.delete_collection(name)
+                except Exception:
+                    pass
+            manifest.clear()
+            manifest.layout = settings.CHROMA_LAYOUT
+            lexical.clear()
+            get_tabular_service().clear()
+        # The fingerprint is only stamped on collections the index creates; an
+        # existing one keeps its stored metadata and must match the configuration
+        index = VectorIndex(client, metadata=embedding_fingerprint())
+        for collection in index.collections.values():
+            if not rebuilt and MODEL_KEY not in (collection.metadata or {}):
+                raise EmbeddingConfigMismatch(
+                    f"Collection {collection.name!r} has no embedding fingerprint; "
+                    f"run with --full to rebuild it with the configured embedding model."
+                )
+            check_collection_config(collection.metadata, collection.name)
         logging.info("Chroma vector store initialized successfully.")
     except Exception as e:
         logging.error(f"Error initializing Chroma vector store: {e}")
         raise
-    
-    # Split documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1500,  # Increased from 1000 for more context
-        chunk_overlap=300,  # Increased from 200 for better context continuity
-        length_function=len,
-        is_separator_regex=False,
-        separators=["\n\n", "\n", ". ", " ", ""]  # Better separators for more natural chunks
+
+    # Never exceed what Chroma accepts in one call
+    get_max_batch_size = getattr(client, "get_max_batch_size", None)
+    max_batch_size = get_max_batch_size() if get_max_batch_size else client.max_batch_size
+    batch_size = max(1, min(args.batch_size, max_batch_size))
+
+    # Collections ingested before the lexical index existed: index what is already stored
+    if not rebuilt and lexical.count() == 0 and index.count() > 0:
+        copied = backfill_lexical(index, lexical, batch_size)
+        lexical.optimize()
+        logging.info(f"Backfilled the lexical index with {copied} stored chunk(s)")
+
+    # Find what changed since the last run
+    entries = discover_files(Path(args.data_dir))
+    docs, unreadable = hash_documents(entries, manifest, args.read_threads)
+    docs, duplicates = dedupe_documents(docs)
+    for doc in duplicates:
+        logging.info(f"Skipping {doc['metadata']['source']}: same content as another document")
+    changed, touched, removed = plan_changes(docs, manifest, keep=unreadable)
+    logging.info(
+        f"{len(entries)} file(s) found: {len(duplicates)} duplicate(s), {len(changed)} new/changed, "
+        f"{len(docs) - len(changed)} unchanged, {len(removed)} removed"
     )
-    
-    # Process and store documents
-    BATCH_SIZE = 10  # Reduced batch size for testing
-
-    total_chunks = 0
-    for doc in documents:
-        chunks = text_splitter.split_text(doc["content"])
-        logging.info(f"{doc['metadata']['source']}: {len(chunks)} chunks")
-        batch_texts = []
-        batch_metas = []
-        for i, chunk in enumerate(chunks):
-            if i >= BATCH_SIZE:
-                break
-            meta = doc["metadata"].copy()
-            batch_texts.append(chunk)
-            batch_metas.append(meta)
-        try:
-            logging.info("About to add batch to vector store...")
-            if batch_texts:
-                logging.info(f"Processing batch of {len(batch_texts)} chunks...")
+
+    # Stream chunks of changed documents, keeping only those not already stored
+    new_ids_by_source: Dict[str, List[str]] = {}
+    failed_sources = set()
+
+    def pending_chunks() -> Iterator[Tuple[str, str, Dict]]:
+        for doc, chunks in iter_chunked_documents(changed, args.workers):
+            source = doc["metadata"]["source"]
+            if is_tabular(doc):
+                # Load the whole file before embedding any of it, so a bad row
+                # further down can't leave it half-indexed
                 try:
-                    # Test embedding a single chunk first
-                    logging.info("Testing embedding on a single chunk...")
-                    test_embedding = embeddings.embed_query(batch_texts[0])
-                    logging.info(f"Successfully embedded test chunk. Vector size: {len(test_embedding)}")
-                    
-                    logging.info("Adding batch to vector store...")
-                    try:
-                        # Add texts using the collection directly with more error handling
-                        for i, (text, meta) in enumerate(zip(batch_texts, batch_metas)):
-                            logging.info(f"Adding chunk {i+1}/{len(batch_texts)}...")
-                            try:
-                                logging.info(f"Generating embedding for chunk {i+1}...")
-                                embedding = embeddings.embed_query(text)
-                                logging.info(f"Successfully generated embedding for chunk {i+1}")
-                                
-                                logging.info(f"Adding chunk {i+1} to collection...")
-                                collection.add(
-                                    embeddings=[embedding],
-                                    documents=[text],
-                                    metadatas=[meta],
-                                    ids=[f"{doc['metadata']['source']}_{i}"]
-                                )
-                                logging.info(f"Successfully added chunk {i+1}")
-                            except Exception as e:
-                                logging.error(f"Error processing chunk {i+1}: {e}")
-                                raise
-                        logging.info("All chunks added to vector store.")
-                        total_chunks += len(batch_texts)
-                    except Exception as e:
-                        logging.error(f"Error during vector store addition: {e}")
-                        raise
-                except Exception as e:
-                    logging.error(f"Error during embedding or vector store addition: {e}")
-                    raise
+                    chunks = list(chunks)
+                except CSV_LOAD_ERRORS as e:
+                    logging.error(f"Skipping {source}: {type(e).__name__}: {e}; keeping its previously indexed data")
+                    failed_sources.add(source)
+                    continue
+            old_ids = set(manifest.chunk_ids(source))
+            ids = []
+            for chunk in chunks:
+                ids.append(chunk[0])
+                if chunk[0] not in old_ids:
+                    yield chunk
+            new_ids_by_source[source] = ids
+            logging.info(f"{source}: {len(ids)} chunks")
+
+    # Embed and store only the new chunks; the model is not loaded at all when nothing changed
+    stats = {"written": 0, "embed_seconds": 0.0}
+    to_add = pending_chunks()
+    first = next(to_add, None)
+    if first is not None and embeddings is None:
+        try:
+            logging.info(f"Initializing {args.embedding_backend} embeddings...")
+            embeddings = build_inprocess_embeddings(args.embedding_backend)
+            logging.info(f"{args.embedding_backend} embeddings initialized successfully.")
         except Exception as e:
-            logging.error(f"Error adding batch to vector store: {e}")
-        logging.info(f"Processed {len(batch_texts)} chunks from {doc['metadata']['source']}")
+            logging.error(f"Error initializing {args.embedding_backend} embeddings: {e}")
+            raise
+    if first is not None:
+        embedder = ChunkEmbedder(embeddings, workers=args.workers)
+        try:
+            stats = embed_and_store(index, embedder, chain([first], to_add), batch_size, lexical)
+        finally:
+            embedder.close()
+
+    # Drop chunks that no longer exist in changed or removed files, from the
+    # partition they were stored in
+    # A file that failed to load is treated like an unreadable one: its manifest
+    # entry and stored chunks stay as they were, and the next run retries it
+    changed = [doc for doc in changed if doc["metadata"]["source"] not in failed_sources]
+    to_delete: Dict[str, List[str]] = {}
+    for doc in changed:
+        source = doc["metadata"]["source"]
+        stale = set(manifest.chunk_ids(source)) - set(new_ids_by_source[source])
+        if stale:
+            to_delete.setdefault(manifest.get(source)["department"], []).extend(stale)
+    for source in removed:
+        to_delete.setdefault(manifest.get(source)["department"], []).extend(manifest.chunk_ids(source))
+    deleted = delete_chunks(index, to_delete, batch_size, lexical) if to_delete else 0
+    if stats["written"] or deleted:
+        lexical.optimize()
 
-    logging.info(f"Processed {len(documents)} documents into {total_chunks} chunks")
+    # Record the new state only after the vector store has been updated
+    for doc in changed + touched:
+        source = doc["metadata"]["source"]
+        manifest.update(
+            source,
+            file_hash=doc["file_hash"],
+            size=doc["size"],
+            mtime_ns=doc["mtime_ns"],
+            department=doc["metadata"]["department"],
+            chunk_ids=new_ids_by_source.get(source, manifest.chunk_ids(source)),
+        )
+    for source in removed:
+        if source.lower().endswith(".csv"):
+            get_tabular_service().drop_source(source)
+        manifest.remove(source)
+    manifest.save()
+
+    # Tell running API processes to drop answers computed against the old collection
+    if rebuilt or stats["written"] or deleted:
+        touch_ingest_stamp()
+
+    total_seconds = time.perf_counter() - started
+    written = stats["written"]
+    total_chunks = sum(len(ids) for ids in new_ids_by_source.values())
+    logging.info(f"Embedded {written} new chunk(s), deleted {deleted} stale chunk(s)")
+    logging.info(
+        f"Throughput: scanned {total_chunks / max(total_seconds, 1e-9):.1f} chunks/sec, "
+        f"embedding {written / max(stats['embed_seconds'], 1e-9):.1f} chunks/sec, "
+        f"end-to-end {written / max(total_seconds, 1e-9):.1f} chunks/sec "
+        f"({total_seconds:.2f}s total, batch size {batch_size}, {args.workers} worker(s))"
+    )
     logging.info("Script finished execution.")
+    return {
+        "files": len(entries),
+        "duplicates": len(duplicates),
+        "changed": len(changed),
+        "failed": len(unreadable) + len(failed_sources),
+        "chunks": total_chunks,
+        "written": written,
+        "deleted": deleted,
+        "embed_seconds": stats["embed_seconds"],
+        "total_seconds": total_seconds,
+    }
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
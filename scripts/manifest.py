@@ -0,0 +1,74 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+class IngestManifest:
+    """
+    Record of what the vector store currently holds, keyed by document source.
+
+    Each entry keeps the file's size, mtime and content hash (so unchanged
+    files can be skipped without re-reading them) plus the IDs of the chunks
+    stored for it (so stale chunks can be deleted when the file changes or
+    disappears).
+    """
+
+    def __init__(self, path: str, files: Optional[Dict[str, Dict]] = None, layout: Optional[str] = None):
+        self.path = Path(path)
+        self.files: Dict[str, Dict] = files or {}
+        # Chroma layout ("single"/"partitioned") the chunk IDs were written to
+        self.layout = layout
+
+    @classmethod
+    def load(cls, path: str) -> "IngestManifest":
+        manifest_path = Path(path)
+        if not manifest_path.exists():
+            return cls(path)
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            # Unknown layout: start over rather than trusting stale chunk IDs
+            return cls(path)
+        return cls(path, data.get("files", {}), data.get("layout", "single"))
+
+    def is_empty(self) -> bool:
+        return not self.files
+
+    def get(self, source: str) -> Optional[Dict]:
+        return self.files.get(source)
+
+    def chunk_ids(self, source: str) -> List[str]:
+        entry = self.files.get(source)
+        return list(entry["chunk_ids"]) if entry else []
+
+    def is_unchanged(self, source: str, size: int, mtime_ns: int) -> bool:
+        """Cheap stat-based check; a hit means the file need not be read at all."""
+        entry = self.files.get(source)
+        return bool(entry) and entry["size"] == size and entry["mtime_ns"] == mtime_ns
+
+    def update(self, source: str, *, file_hash: str, size: int, mtime_ns: int,
+               department: str, chunk_ids: List[str]) -> None:
+        self.files[source] = {
+            "file_hash": file_hash,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "department": department,
+            "chunk_ids": chunk_ids,
+        }
+
+    def remove(self, source: str) -> None:
+        self.files.pop(source, None)
+
+    def clear(self) -> None:
+        self.files = {}
+
+    def save(self) -> None:
+        """Write atomically so an interrupted run never leaves a truncated manifest."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "layout": self.layout, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,130 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from app.services.tabular_service import TabularService
+
+# Rows read and stored per pandas chunk
+ROWS_PER_CHUNK = 5000
+# Rows described by each embedded row-group summary
+ROWS_PER_GROUP = 200
+# Columns with more distinct values than this are not listed as categories
+MAX_CATEGORIES = 50
+TOP_CATEGORIES = 10
+# Unique-valued text columns (IDs, names) listed per row group so lookups by
+# identifier still retrieve the right group
+MAX_IDENTIFIER_COLUMNS = 2
+
+# Errors from a malformed or mis-encoded CSV; ingest skips the file and keeps its previous state
+CSV_LOAD_ERRORS = (pd.errors.ParserError, UnicodeDecodeError, ValueError)
+
+
+def _fmt(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return f"{value:.2f}"
+
+
+class _ColumnStats:
+    """Running statistics of one column across row groups."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.categories: Optional[Counter] = Counter()
+
+    def add_numeric(self, series: pd.Series) -> None:
+        series = series.dropna()
+        if series.empty:
+            return
+        self.count += len(series)
+        self.total += float(series.sum())
+        low, high = float(series.min()), float(series.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def add_categories(self, series: pd.Series) -> None:
+        if self.categories is None:
+            return
+        self.categories.update(series.dropna().astype(str))
+        if len(self.categories) > MAX_CATEGORIES:
+            self.categories = None
+
+    def describe_numeric(self, name: str) -> Optional[str]:
+        if not self.count:
+            return None
+        return (f"{name}: min {_fmt(self.min)}, mean {_fmt(self.total / self.count)}, "
+                f"max {_fmt(self.max)}, total {_fmt(self.total)}")
+
+    def describe_categories(self, name: str) -> Optional[str]:
+        if not self.categories:
+            return None
+        top = ", ".join(f"{value} ({n})" for value, n in self.categories.most_common(TOP_CATEGORIES))
+        return f"{name} values: {top}"
+
+
+def _group_summary(frame: pd.DataFrame, header: str, first_row: int) -> str:
+    lines = [f"{header}, rows {first_row}-{first_row + len(frame) - 1}."]
+    identifiers = 0
+    for column in frame.columns:
+        series = frame[column]
+        if series.dtype.kind in "iuf":
+            stats = _ColumnStats()
+            stats.add_numeric(series)
+            described = stats.describe_numeric(column)
+            if described:
+                lines.append(described)
+        elif identifiers < MAX_IDENTIFIER_COLUMNS and series.is_unique:
+            identifiers += 1
+            lines.append(f"{column}: " + ", ".join(series.astype(str)))
+    return "\n".join(lines)
+
+
+def load_csv(path: Union[str, Path], source: str, department: str, service: TabularService,
+             rows_per_chunk: int = ROWS_PER_CHUNK, rows_per_group: int = ROWS_PER_GROUP) -> Iterator[str]:
+    """
+    Stream a CSV into the tabular store `rows_per_chunk` rows at a time and
+    yield text summaries to embed: one per `rows_per_group` rows as they are
+    loaded, then one for the whole dataset. Rows go to a staging table that
+    replaces the live one only once the whole file has loaded.
+    """
+    name = service.table_for(source)
+    staging = f"{name}__staging"
+    header = f"Dataset {source} (table {name}, department {department})"
+    stats: Dict[str, _ColumnStats] = {}
+    columns: List[str] = []
+    rows = 0
+    with service.staging_connection() as conn:
+        conn.execute(f'DROP TABLE IF EXISTS "{staging}"')
+        for frame in pd.read_csv(path, chunksize=rows_per_chunk):
+            if not columns:
+                columns = [str(c) for c in frame.columns]
+            frame.to_sql(staging, conn, if_exists="append", index=False)
+            for column in frame.columns:
+                column_stats = stats.setdefault(column, _ColumnStats())
+                if frame[column].dtype.kind in "iuf":
+                    column_stats.add_numeric(frame[column])
+                else:
+                    column_stats.add_categories(frame[column])
+            for start in range(0, len(frame), rows_per_group):
+                yield _group_summary(frame.iloc[start:start + rows_per_group], header, rows + start + 1)
+            rows += len(frame)
+        if not columns:
+            return
+        service.publish(conn, staging, name, source, department, columns, rows)
+
+    lines = [f"{header}: {rows} rows.", "Columns: " + ", ".join(columns) + "."]
+    numeric = [s.describe_numeric(c) for c, s in stats.items()]
+    if any(numeric):
+        lines.append("Overall statistics across all rows:")
+        lines.extend(line for line in numeric if line)
+    categories = [s.describe_categories(c) for c, s in stats.items()]
+    if any(categories):
+        lines.append("Most common values:")
+        lines.extend(line for line in categories if line)
+    lines.append(f"Exact per-row figures and aggregates: /api/v1/tables/{name}")
+    yield "\n".join(lines)
@@ -26,6 +26,7 @@ setup(
         # Env & HTTP
         "python-dotenv",
         "requests>=2.28.1,<3.0.0",
+        "httpx>=0.25.0",
 
         # Utility
         "tabulate",
@@ -2,105 +2,204 @@
 """
 Startup script for RBAC Chatbot
 Launches both FastAPI and Streamlit servers
+
+    python start_servers.py                   # development: one API process with --reload
+    python start_servers.py --prod --workers 4
+
+In --prod mode the API runs under `python -m app.server`: several worker
+processes share one socket, and the embedding model is loaded once before
+they are forked. Each server's output is streamed here with a name prefix,
+and startup waits on the health endpoints instead of fixed sleeps.
 """
 
+import argparse
+import signal
 import subprocess
-import time
 import sys
-import os
+import threading
+import time
 from pathlib import Path
+from typing import List, Optional
+
+import requests
+
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+
+class ManagedProcess:
+    """A child server whose combined stdout/stderr is continuously streamed with a prefix."""
 
-def start_fastapi():
+    def __init__(self, name: str, cmd: List[str]):
+        self.name = name
+        # Reading the pipe on a thread means a chatty server can never block on a full pipe
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=1, text=True)
+        self._reader = threading.Thread(target=self._stream, name=f"{name}-log", daemon=True)
+        self._reader.start()
+
+    def _stream(self):
+        for line in self.process.stdout:
+            sys.stdout.write(f"[{self.name}] {line}")
+            sys.stdout.flush()
+
+    def running(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self, timeout: float):
+        """SIGTERM (servers drain in-flight requests), then SIGKILL after `timeout` seconds."""
+        if self.running():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                print(f"⚠️  {self.name} did not stop within {timeout:.0f}s; killing it")
+                self.process.kill()
+                self.process.wait()
+        self._reader.join(timeout=1)
+
+
+def wait_until_healthy(server: ManagedProcess, url: str, timeout: float) -> bool:
+    """Poll `url` until it answers 200; gives up if the process exits or `timeout` passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not server.running():
+            return False
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def start_fastapi(args) -> Optional[ManagedProcess]:
     """Start the FastAPI server"""
-    print("🚀 Starting FastAPI server...")
+    if args.prod:
+        print(f"🚀 Starting FastAPI server ({args.workers} worker(s))...")
+        cmd = [sys.executable, "-m", "app.server", "--host", args.host, "--port", str(args.api_port),
+               "--workers", str(args.workers)]
+    else:
+        print("🚀 Starting FastAPI server (development, --reload)...")
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app",
+               "--reload", "--host", args.host, "--port", str(args.api_port)]
     try:
-        # Start FastAPI server in background
-        process = subprocess.Popen([
-            sys.executable, "-m", "uvicorn", "app.main:app", 
-            "--reload", "--host", "0.0.0.0", "--port", "8000"
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Wait a moment for server to start
-        time.sleep(3)
-        
-        # Check if process is still running
-        if process.poll() is None:
-            print("✅ FastAPI server started successfully on http://localhost:8000")
-            return process
-        else:
-            print("❌ FastAPI server failed to start")
-            return None
+        server = ManagedProcess("api", cmd)
     except Exception as e:
         print(f"❌ Error starting FastAPI server: {e}")
         return None
 
-def start_streamlit():
+    base = f"http://127.0.0.1:{args.api_port}"
+    if not wait_until_healthy(server, f"{base}/health", args.startup_timeout):
+        print("❌ FastAPI server failed to start")
+        server.stop(args.graceful_timeout)
+        return None
+    print(f"✅ FastAPI server started successfully on http://localhost:{args.api_port}")
+    if args.wait_ready:
+        if wait_until_healthy(server, f"{base}/ready", args.startup_timeout):
+            print("✅ Models loaded")
+        else:
+            print("⚠️  FastAPI server is up but not ready yet; see /ready")
+    return server
+
+
+def start_streamlit(args) -> Optional[ManagedProcess]:
     """Start the Streamlit server"""
     print("🚀 Starting Streamlit server...")
+    cmd = [sys.executable, "-m", "streamlit", "run", "streamlit_app.py",
+           "--server.port", str(args.ui_port), "--server.headless", "true"]
     try:
-        # Start Streamlit server in background
-        process = subprocess.Popen([
-            sys.executable, "-m", "streamlit", "run", "streamlit_app.py",
-            "--server.port", "8501", "--server.headless", "true"
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Wait a moment for server to start
-        time.sleep(5)
-        
-        # Check if process is still running
-        if process.poll() is None:
-            print("✅ Streamlit server started successfully on http://localhost:8501")
-            return process
-        else:
-            print("❌ Streamlit server failed to start")
-            return None
+        server = ManagedProcess("ui", cmd)
     except Exception as e:
         print(f"❌ Error starting Streamlit server: {e}")
         return None
 
+    if not wait_until_healthy(server, f"http://127.0.0.1:{args.ui_port}/_stcore/health", args.startup_timeout):
+        print("❌ Streamlit server failed to start")
+        server.stop(args.graceful_timeout)
+        return None
+    print(f"✅ Streamlit server started successfully on http://localhost:{args.ui_port}")
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the RBAC Chatbot API and frontend.")
+    parser.add_argument("--prod", action="store_true",
+                        help="multi-worker API without --reload, embedding model preloaded before fork")
+    parser.add_argument("--workers", type=int, default=settings.API_WORKERS,
+                        help="API worker processes in --prod mode")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--api-port", type=int, default=settings.API_PORT)
+    parser.add_argument("--ui-port", type=int, default=8501)
+    parser.add_argument("--no-ui", action="store_true", help="start only the API")
+    parser.add_argument("--wait-ready", action="store_true",
+                        help="also wait for /ready (models loaded) before starting the frontend")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--graceful-timeout", type=float, default=settings.GRACEFUL_TIMEOUT_SECONDS)
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     print("🤖 RBAC Chatbot Startup")
     print("=" * 40)
-    
+
     # Check if required files exist
     if not Path("app/main.py").exists():
         print("❌ FastAPI app not found. Please ensure app/main.py exists.")
-        return
-    
-    if not Path("streamlit_app.py").exists():
+        return 1
+
+    if not args.no_ui and not Path("streamlit_app.py").exists():
         print("❌ Streamlit app not found. Please ensure streamlit_app.py exists.")
-        return
-    
-    # Start FastAPI server
-    fastapi_process = start_fastapi()
-    if not fastapi_process:
-        print("❌ Failed to start FastAPI server. Exiting.")
-        return
-    
-    # Start Streamlit server
-    streamlit_process = start_streamlit()
-    if not streamlit_process:
-        print("❌ Failed to start Streamlit server. Exiting.")
-        fastapi_process.terminate()
-        return
-    
-    print("\n" + "=" * 40)
-    print("🎉 Both servers started successfully!")
-    print("\n📱 Access your application:")
-    print("   • Frontend: http://localhost:8501")
-    print("   • API Docs: http://localhost:8000/docs")
-    print("   • Health Check: http://localhost:8000/health")
-    print("\n⏹️  Press Ctrl+C to stop both servers")
-    
+        return 1
+
+    # Stop cleanly when the launcher itself is terminated (e.g. by a process manager)
+    def handle_sigterm(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    servers: List[ManagedProcess] = []
     try:
-        # Keep the script running
+        # Start FastAPI server
+        fastapi_process = start_fastapi(args)
+        if not fastapi_process:
+            print("❌ Failed to start FastAPI server. Exiting.")
+            return 1
+        servers.append(fastapi_process)
+
+        # Start Streamlit server
+        if not args.no_ui:
+            streamlit_process = start_streamlit(args)
+            if not streamlit_process:
+                print("❌ Failed to start Streamlit server. Exiting.")
+                return 1
+            servers.append(streamlit_process)
+
+        print("\n" + "=" * 40)
+        print("🎉 Servers started successfully!")
+        print("\n📱 Access your application:")
+        if not args.no_ui:
+            print(f"   • Frontend: http://localhost:{args.ui_port}")
+        print(f"   • API Docs: http://localhost:{args.api_port}/docs")
+        print(f"   • Health Check: http://localhost:{args.api_port}/health")
+        print("\n⏹️  Press Ctrl+C to stop")
+
+        # Keep the script running; if one server dies, take the rest down too
         while True:
-            time.sleep(1)
+            for server in servers:
+                if not server.running():
+                    print(f"❌ {server.name} exited with code {server.process.returncode}")
+                    return 1
+            time.sleep(0.5)
     except KeyboardInterrupt:
         print("\n🛑 Stopping servers...")
-        fastapi_process.terminate()
-        streamlit_process.terminate()
-        print("✅ Servers stopped.")
+        return 0
+    finally:
+        for server in reversed(servers):
+            server.stop(args.graceful_timeout)
+        if servers:
+            print("✅ Servers stopped.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -56,16 +56,6 @@ if 'user_role' not in st.session_state:
 # API configuration
 API_BASE_URL = "http://localhost:8000"
 
-# Add this USERS dictionary near the top of your file (after imports)
-USERS = {
-    "Tony": {"password": "password123", "role": "engineering"},
-    "Bruce": {"password": "securepass", "role": "marketing"},
-    "Sam": {"password": "financepass", "role": "finance"},
-    "Peter": {"password": "pete123", "role": "engineering"},
-    "Sid": {"password": "sidpass123", "role": "marketing"},
-    "Natasha": {"password": "hrpass123", "role": "hr"},
-}
-
 def login(username, password):
     """Login to the API and get access token and role"""
     try:
@@ -82,20 +72,29 @@ def login(username, password):
         return None, None, f"Connection error: {str(e)}"
 
 def send_message(message, token):
-    """Send message to the API"""
+    """Send message to the streaming API, yielding (event, data) pairs as they arrive"""
     try:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/chat/query",
+        headers = {"Authorization": f"Bearer {token}", "Accept": "text/event-stream"}
+        with requests.post(
+            f"{API_BASE_URL}/api/v1/chat/query/stream",
             headers=headers,
-            json={"message": message}
-        )
-        if response.status_code == 200:
-            return response.json(), "success"
-        else:
-            return None, f"Error: {response.text}"
+            json={"message": message},
+            stream=True,
+            timeout=(5, 60)
+        ) as response:
+            if response.status_code != 200:
+                yield "error", {"detail": response.text}
+                return
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    yield event, json.loads(line[len("data:"):].strip())
     except Exception as e:
-        return None, f"Connection error: {str(e)}"
+        yield "error", {"detail": f"Connection error: {str(e)}"}
 
 # Main app
 def main():
@@ -121,10 +120,9 @@ def main():
         
         if st.session_state.token is None:
             st.subheader("Login")
-            username = st.selectbox("Username", list(USERS.keys()))
-            password = st.text_input("Password", type="password", value=USERS[username]["password"])
-            role = USERS[username]["role"]
-            st.info(f"Role: {role}")
+            # Users and roles live in the API's user store; the role comes back with the token
+            username = st.text_input("Username")
+            password = st.text_input("Password", type="password")
 
             if st.button("Login"):
                 token, api_role, message = login(username, password)
@@ -183,27 +181,40 @@ def main():
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Get bot response
+        # Stream bot response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response, error = send_message(prompt, st.session_state.token)
+            placeholder = st.empty()
+            sources_slot = st.empty()
+            bot_response = ""
+            sources = []
+            error = None
+            placeholder.markdown("▌")
+            for event, data in send_message(prompt, st.session_state.token):
+                if event == "sources":
+                    sources = data.get("sources", [])
+                elif event == "token":
+                    bot_response += data.get("content", "")
+                    placeholder.markdown(bot_response + "▌")
+                elif event == "error":
+                    error = data.get("detail", "Unknown error")
+                    break
+
+            if error and not bot_response:
+                placeholder.empty()
+                st.error(f"Error: {error}")
+            else:
+                placeholder.markdown(bot_response or "No response received")
+                if error:
+                    st.warning(error)
+                if sources:
+                    sources_slot.caption(f"Sources: {', '.join(sources)}")
                 
-                if error == "success":
-                    bot_response = response.get("response", "No response received")
-                    sources = response.get("sources", [])
-                    
-                    st.markdown(bot_response)
-                    if sources:
-                        st.caption(f"Sources: {', '.join(sources)}")
-                    
-                    # Add bot message to chat history
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": bot_response,
-                        "sources": sources
-                    })
-                else:
-                    st.error(f"Error: {error}")
+                # Add bot message to chat history
+                st.session_state.messages.append({
+                    "role": "assistant", 
+                    "content": bot_response,
+                    "sources": sources
+                })
     
     # Clear chat button
     if st.session_state.messages and st.button("Clear Chat"):